@@ -8,10 +8,137 @@ class Settings(BaseSettings):
 
     # OpenAI API settings
     openai_default_model: str = "gpt-4o"  # Default model
+    openai_base_url: str = ""  # Empty uses the official API endpoint
+    openai_timeout: float = 120.0  # Seconds
+    openai_max_connections: int = 100  # Shared by every pooled client
+    openai_max_keepalive_connections: int = 20
+    openai_client_cache_size: int = 256  # Clients kept, one per API key
+    openai_client_idle_ttl: float = 15 * 60  # Seconds an unused client is kept
+    openai_chat_model_cache_size: int = 16  # LangChain models kept per client, one per (model, temperature)
+    openai_max_retries: int = 2  # SDK retries with jittered backoff on 429/5xx
+
+    # Model cascade settings (requests with model="auto")
+    auto_small_model: str = "gpt-4o-mini"  # Tool selection steps and short prompts
+    auto_large_model: str = "gpt-4o"  # Final answers, long prompts and escalations
+    auto_simple_prompt_tokens: int = 1000  # Longer chat prompts go straight to the large model
+
+    # Agent settings
+    agent_graph_cache_size: int = 128  # Compiled agent graphs kept for reuse
+    agent_history_tool_tokens: int = 500  # Kept of each tool result the model has read; 0 keeps them whole
+
+    # Agent run budgets (server-side caps; a request may only lower them)
+    agent_max_steps: int = 12  # LLM calls (reasoning steps) per run
+    agent_max_tool_calls: int = 20
+    agent_max_tokens: int = 200000  # Prompt plus completion tokens per run
+    agent_timeout: float = 120.0  # Seconds of wall clock per run, partial answer included
+    agent_finalize_timeout: float = 15.0  # Seconds of the run kept to write the partial answer (at most half)
+
+    # Person lookup fast path settings (targeted LinkedIn searches before the agent)
+    person_lookup_fast_path: bool = True
+    person_lookup_min_score: float = 0.75  # Best profile's score to answer without an LLM
+    person_lookup_min_margin: float = 0.1  # Lead it needs over the runner-up
+    person_lookup_max_candidates: int = 5  # Profiles an LLM picks from when unsure
+
+    # Speculative scrape prefetch settings (websearch agent)
+    prefetch_enabled: bool = False  # Scrape top search results while the model decides
+    prefetch_top_n: int = 3  # Results prefetched per search
+
+    # Local corpus settings (full-text index of scraped pages and search snippets)
+    corpus_sqlite_path: str = ""  # Empty disables the corpus and the local_search tool
+    corpus_max_bytes: int = 512 * 1024 * 1024  # Indexed text kept before evicting
+    corpus_page_ttl: float = 3 * 24 * 60 * 60  # Seconds a scraped page counts as fresh
+    corpus_snippet_ttl: float = 24 * 60 * 60  # Seconds a search snippet counts as fresh
+    corpus_search_limit: int = 5  # Passages returned per local search
+
+    # Scrape agent crawl settings
+    crawl_max_concurrency: int = 5  # Pages of one crawl step scraped at a time
+    crawl_max_pages: int = 20  # Pages scraped per run
+    crawl_max_depth: int = 2  # Links followed away from the starting URL
+
+    # Scraped content reduction settings
+    scrape_max_tokens: int = 4000  # Per tool call; 0 passes pages through unchanged
+    scrape_chunk_tokens: int = 200  # Chunk size for relevance ranking
+
+    # Production server settings (`python run.py --prod`)
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0  # Worker processes; 0 starts one per CPU core
+    server_shutdown_timeout: float = 30.0  # Seconds to drain requests and running jobs
+    warmup_enabled: bool = True  # Preload the LLM and agent libraries after startup
+
+    # Batch endpoint settings
+    batch_max_items: int = 2000
+    batch_max_concurrency: int = 8  # Items of one batch processed at a time
+
+    # Background job settings
+    job_max_concurrency: int = 4  # Agent runs executed at the same time
+    job_max_queue_size: int = 10000
+    job_result_ttl: float = 60 * 60  # Seconds a finished job is kept
+    job_store_path: str = ""  # SQLite path; empty keeps jobs in memory
     
     # Serper API settings
     serper_api_key: str = ""
+    serper_search_url: str = "https://google.serper.dev/search"
+    serper_scrape_url: str = "https://scrape.serper.dev"
     proxycurl_api_key: str = ""
+    proxycurl_api_url: str = "https://nubela.co/proxycurl/api/linkedin/company"
+
+    # Proxycurl company profile cache settings
+    proxycurl_cache_ttl: float = 7 * 24 * 60 * 60  # Freshness window in seconds
+    proxycurl_cache_max_entries: int = 5000  # Profiles kept in memory
+    proxycurl_cache_sqlite_path: str = ""  # Empty disables the on-disk tier
+
+    # Upstream rate limit settings (requests per second; 0 disables a limit)
+    rate_limit_max_wait_ms: int = 2000  # Queueing budget before a call is shed with 429
+    rate_limit_max_clients: int = 10000  # Per-client buckets kept per upstream
+    rate_limit_store_path: str = ""  # SQLite path shared by workers; empty keeps limits per process
+    upstream_max_retries: int = 3  # Retries on Serper/Proxycurl 429/5xx and transport errors
+    upstream_retry_base_delay: float = 0.5  # Seconds, doubled per attempt
+    upstream_retry_max_delay: float = 8.0
+    serper_rate_limit: float = 50
+    serper_rate_burst: int = 100
+    serper_max_in_flight: int = 50
+    serper_client_rate_limit: float = 10  # Per client API key
+    serper_client_rate_burst: int = 20
+    proxycurl_rate_limit: float = 5  # Proxycurl allows 300 requests per minute
+    proxycurl_rate_burst: int = 10
+    proxycurl_max_in_flight: int = 10
+    proxycurl_client_rate_limit: float = 0  # /api/company is not keyed
+    proxycurl_client_rate_burst: int = 1
+    openai_rate_limit: float = 0  # Clients bring their own keys and quotas
+    openai_rate_burst: int = 1
+    openai_max_in_flight: int = 64
+    openai_client_rate_limit: float = 5
+    openai_client_rate_burst: int = 10
+
+    # Response cache settings (final answers of deterministic requests)
+    response_cache_enabled: bool = True
+    response_cache_max_temperature: float = 0.0  # Higher temperatures are never cached
+    response_cache_ttl: float = 60 * 60  # Seconds
+    response_cache_max_entries: int = 10000
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    response_cache_sqlite_path: str = ""  # Empty disables the on-disk tier
+
+    # Tracing settings (requires the opentelemetry packages)
+    otel_enabled: bool = False
+    otel_service_name: str = "scrapify-ai"
+    otel_exporter_otlp_endpoint: str = ""  # Empty keeps an externally configured provider
+
+    # Shared HTTP connection pool settings
+    http2_enabled: bool = True
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0  # Seconds an idle connection is kept open
+    http_timeout: float = 60.0  # Seconds for read/write/pool operations
+    http_connect_timeout: float = 10.0
+
+    # Serper result cache settings
+    serper_cache_enabled: bool = True
+    serper_cache_max_entries: int = 2000
+    serper_cache_max_bytes: int = 64 * 1024 * 1024
+    serper_search_cache_ttl: float = 6 * 60 * 60  # Seconds
+    serper_scrape_cache_ttl: float = 24 * 60 * 60  # Seconds
+    serper_cache_sqlite_path: str = ""  # Empty disables the on-disk tier
 
     class Config:
         env_file = ".env"
@@ -1,6 +1,12 @@
-from typing import Annotated
-from fastapi import FastAPI, HTTPException, Header, Depends
+import asyncio
+import json
+import logging
+import math
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Annotated, AsyncIterator, Optional
+from fastapi import FastAPI, HTTPException, Header, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import Field
 
 from app.models.chat_models import ChatRequest, ChatResponse
@@ -12,14 +18,137 @@ from app.models.company_models import (
     CompanyScrapeRequest,
     CompanyScrapeResponse,
 )
+from app.models.batch_models import (
+    BatchChatRequest,
+    BatchCompanyResponse,
+    BatchCompanyResult,
+    BatchCompanyScrapeRequest,
+    BatchPersonLookupRequest,
+    BatchScrapeRequest,
+    BatchTextResponse,
+    BatchTextResult,
+    BatchWebSearchRequest,
+)
+from app.models.job_models import JobStatusResponse, JobSubmitResponse
+from app.config.settings import get_settings
 from app.services.llm_service import LLMService
-from app.services.agent_service import AgentService
-from app.services.linkedin_scraper_service import LinkedInScraperService
+from app.services.linkedin_scraper_service import (
+    LinkedInScraperService,
+    build_company_profile,
+)
+from app.services.lazy_import_service import lazy_import
+from app.services.lifecycle_service import (
+    close_shared_resources,
+    open_shared_resources,
+)
+from app.services.openai_client_service import (
+    get_openai_client_registry,
+    hash_api_key,
+)
+from app.services.batch_service import run_batch
+from app.services.rate_limit_service import (
+    RateLimitExceeded,
+    UpstreamError,
+    rate_limiter_stats,
+)
+from app.services.metrics_service import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    MetricsMiddleware,
+    StatsCollector,
+)
+from app.services.corpus_service import get_local_corpus
+from app.services.response_cache_service import get_response_cache
+from app.tools.content_tools import count_tokens
+from app.tools.search_tools import get_serper_cache
+from app.services.job_service import (
+    InMemoryJobStore,
+    Job,
+    JobRunner,
+    JobService,
+    JobServiceClosed,
+    SQLiteJobStore,
+)
+
+# LangGraph and the LangChain agent stack are the slowest imports by far; they
+# are loaded by the first agent request or the startup warmup instead
+if TYPE_CHECKING:
+    from app.services.agent_service import AgentBudget, AgentResult, AgentService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Services and the resources they share are created per worker process
+    # at startup rather than at import time
+    open_shared_resources()
+    app.state.llm_service = LLMService()
+    # Created on first use, see `load_agent_service`
+    app.state.agent_service = None
+    app.state.linkedin_scraper_service = LinkedInScraperService()
+    app.state.job_service = JobService(
+        store=(
+            SQLiteJobStore(settings.job_store_path)
+            if settings.job_store_path
+            else InMemoryJobStore()
+        ),
+        max_concurrency=settings.job_max_concurrency,
+        max_queue_size=settings.job_max_queue_size,
+        result_ttl=settings.job_result_ttl,
+    )
+    await app.state.job_service.start()
+    warmup = asyncio.create_task(warm_up(app)) if settings.warmup_enabled else None
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    # The server has stopped accepting requests and drained the open ones;
+    # give background agent runs the same window before cancelling them
+    await app.state.job_service.drain(settings.server_shutdown_timeout)
+    await app.state.job_service.stop()
+    app.state.linkedin_scraper_service.cache.close()
+    await close_shared_resources()
+
+
+# Imported by the warmup in this order; each import runs in a worker thread
+WARMUP_MODULES = (
+    "openai",
+    "instructor",
+    "langchain_openai",
+    "app.services.agent_service",
+)
+
+
+async def warm_up(app: FastAPI) -> None:
+    """
+    Preload the lazily imported dependencies once the server accepts traffic.
+
+    The imports run in a worker thread so requests are still served meanwhile;
+    a request that needs a module before it is loaded simply imports it itself.
+    """
+    try:
+        for module in WARMUP_MODULES:
+            await asyncio.to_thread(lazy_import, module)
+        await asyncio.to_thread(count_tokens, "warmup")
+        get_openai_client_registry()
+        load_agent_service(app)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Startup warmup failed")
+
+
+def load_agent_service(app: FastAPI) -> "AgentService":
+    """Return the app's agent service, importing and creating it on first use."""
+    if app.state.agent_service is None:
+        agent_service = lazy_import("app.services.agent_service")
+        app.state.agent_service = agent_service.AgentService()
+    return app.state.agent_service
+
 
 app = FastAPI(
     title="Scrapify AI",
     description="A service for scraping and processing data using LLMs",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -31,12 +160,116 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize LLM service
-llm_service = LLMService()
-# Initialize agent service
-agent_service = AgentService()
-# Initialize linkedin scraper service
-linkedin_scraper_service = LinkedInScraperService()
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+
+def get_llm_service(request: Request) -> LLMService:
+    return request.app.state.llm_service
+
+
+def get_agent_service(request: Request) -> "AgentService":
+    return load_agent_service(request.app)
+
+
+def get_linkedin_service(request: Request) -> LinkedInScraperService:
+    return request.app.state.linkedin_scraper_service
+
+
+def get_job_service(request: Request) -> JobService:
+    return request.app.state.job_service
+
+
+def cache_stats() -> dict:
+    serper_cache = get_serper_cache()
+    return {
+        "serper": serper_cache.stats.as_dict() if serper_cache is not None else {},
+        "response": get_response_cache().stats().get("total", {}),
+        "proxycurl": app.state.linkedin_scraper_service.cache.stats.as_dict(),
+    }
+
+
+# Expose the services' own counters on /metrics, read at scrape time
+CACHE_COUNTERS = ("hits", "misses", "sets", "evictions", "expirations")
+REGISTRY.register_collector(
+    StatsCollector(
+        "rate_limiter",
+        rate_limiter_stats,
+        label="upstream",
+        counters=("acquired", "shed", "retries", "wait_seconds_total"),
+    )
+)
+REGISTRY.register_collector(
+    StatsCollector("cache", cache_stats, label="cache", counters=CACHE_COUNTERS)
+)
+REGISTRY.register_collector(
+    StatsCollector(
+        "single_flight",
+        lambda: {
+            "agent": (
+                app.state.agent_service.single_flight.stats()
+                if app.state.agent_service is not None
+                else {}
+            ),
+            "chat": app.state.llm_service.single_flight.stats(),
+            "proxycurl": app.state.linkedin_scraper_service.single_flight.stats(),
+        },
+        label="service",
+        counters=("calls", "executions", "collapsed"),
+    )
+)
+REGISTRY.register_collector(
+    StatsCollector(
+        "openai_clients",
+        # Not created until the first LLM call, which imports the OpenAI SDK
+        lambda: (
+            get_openai_client_registry().stats()
+            if get_openai_client_registry.cache_info().currsize
+            else {}
+        ),
+        counters=("created", "reused", "evicted"),
+    )
+)
+REGISTRY.register_collector(
+    StatsCollector("jobs", lambda: app.state.job_service.stats())
+)
+REGISTRY.register_collector(
+    StatsCollector(
+        "corpus",
+        lambda: get_local_corpus().stats() if get_local_corpus() is not None else {},
+        counters=(
+            "hits",
+            "misses",
+            "pages_indexed",
+            "snippets_indexed",
+            "evictions",
+            "compactions",
+        ),
+    )
+)
+app.add_middleware(MetricsMiddleware)
+
+
+def http_error(e: Exception) -> HTTPException:
+    """
+    Map a service error to an HTTP error. Shed or upstream-limited calls
+    become 429 with a Retry-After header, upstreams failing past their
+    retries a 503 (when unavailable) or 502; anything else is a 500.
+    """
+    if isinstance(e, RateLimitExceeded):
+        return HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    if isinstance(e, UpstreamError):
+        logger.warning("Upstream failed: %s", e)
+        return HTTPException(
+            status_code=503 if e.status_code == 503 else 502, detail=str(e)
+        )
+    logger.exception("Request failed", exc_info=e)
+    return HTTPException(status_code=500, detail=str(e))
 
 
 async def get_api_key(x_api_key: str = Header(...)):
@@ -45,8 +278,35 @@ async def get_api_key(x_api_key: str = Header(...)):
     return x_api_key
 
 
+async def use_response_cache(cache_control: str = Header(None)) -> bool:
+    """
+    Requests sent with `Cache-Control: no-cache` (or `no-store`) skip the
+    response cache lookup and get a fresh answer.
+    """
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+    return not directives & {"no-cache", "no-store"}
+
+
+def agent_budget(
+    agent_service: "AgentService",
+    request: WebSearchRequest | ScrapeRequest | PersonLookupRequest,
+) -> "AgentBudget":
+    """The run budget an agent request asked for, within the server's caps."""
+    return agent_service.make_budget(
+        max_steps=request.max_steps,
+        max_tool_calls=request.max_tool_calls,
+        max_tokens=request.max_tokens,
+        timeout=request.timeout,
+    )
+
+
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat_with_llm(request: ChatRequest, api_key: str = Depends(get_api_key)):
+async def chat_with_llm(
+    request: ChatRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    llm_service: LLMService = Depends(get_llm_service),
+):
     """
     Chat with the LLM using OpenAI.
     Requires an API key in the X-API-Key header.
@@ -57,74 +317,210 @@ async def chat_with_llm(request: ChatRequest, api_key: str = Depends(get_api_key
             api_key=api_key,
             model=request.model,
             temperature=request.temperature,
+            use_cache=use_cache,
             response_model=str,
         )
         return ChatResponse(response=response)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[dict]) -> StreamingResponse:
+    """
+    Stream events to the client as server-sent events.
+    A failure after the stream has started is reported as an `error` event.
+    """
+
+    async def body():
+        try:
+            async for event in events:
+                yield format_sse(event["event"], event["data"])
+        except Exception as e:
+            error = http_error(e)
+            yield format_sse(
+                "error", {"status": error.status_code, "detail": error.detail}
+            )
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/chat/stream")
+async def stream_chat_with_llm(
+    request: ChatRequest,
+    api_key: str = Depends(get_api_key),
+    llm_service: LLMService = Depends(get_llm_service),
+):
+    """
+    Chat with the LLM, streaming `token` events as the answer is generated
+    and a `final` event with the full answer.
+    Requires an API key in the X-API-Key header.
+    """
+
+    async def events():
+        answer = []
+        async for content in llm_service.stream_response(
+            query=request.query,
+            api_key=api_key,
+            model=request.model,
+            temperature=request.temperature,
+        ):
+            answer.append(content)
+            yield {"event": "token", "data": {"content": content}}
+        yield {"event": "final", "data": {"response": "".join(answer)}}
+
+    return sse_response(events())
 
 
 @app.post("/api/websearch", response_model=WebSearchResponse)
-async def run_agent(request: WebSearchRequest, api_key: str = Depends(get_api_key)):
+async def run_agent(
+    request: WebSearchRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    agent_service: "AgentService" = Depends(get_agent_service),
+):
     """
     Run a ReAct agent with Google search and web scraping capabilities.
     Requires an API key in the X-API-Key header.
     """
     try:
-        response = await agent_service.run_websearch_agent(
+        result = await agent_service.run_websearch_agent(
             query=request.query,
             api_key=api_key,
             search_instructions=request.search_instructions,
             model=request.model,
             temperature=request.temperature,
+            budget=agent_budget(agent_service, request),
+            use_cache=use_cache,
+        )
+        return WebSearchResponse(
+            response=result.response,
+            partial=result.partial,
+            budget_exceeded=result.budget_exceeded,
         )
-        return WebSearchResponse(response=response)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @app.post("/api/person-lookup", response_model=PersonLookupResponse)
 async def run_person_lookup_agent(
-    request: PersonLookupRequest, api_key: str = Depends(get_api_key)
+    request: PersonLookupRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    agent_service: "AgentService" = Depends(get_agent_service),
 ):
     """
     Run a ReAct agent with Google search and web scraping capabilities for person lookup.
     Requires an API key in the X-API-Key header.
     """
     try:
-        response = await agent_service.run_person_lookup(
+        result = await agent_service.run_person_lookup(
             company_url=request.company_url,
             role=request.role,
             api_key=api_key,
             model=request.model,
             temperature=request.temperature,
+            budget=agent_budget(agent_service, request),
+            use_cache=use_cache,
+        )
+        return PersonLookupResponse(
+            response=result.response,
+            partial=result.partial,
+            budget_exceeded=result.budget_exceeded,
         )
-        return PersonLookupResponse(response=response)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
 
 
 @app.post("/api/scrape", response_model=ScrapeResponse)
-async def scrape_agent(request: ScrapeRequest, api_key: str = Depends(get_api_key)):
+async def scrape_agent(
+    request: ScrapeRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    agent_service: "AgentService" = Depends(get_agent_service),
+):
     """
     Run a web scraping agent using the provided URL and query.
     Requires an API key in the X-API-Key header.
     """
     try:
-        response = await agent_service.run_scrape_agent(
+        result = await agent_service.run_scrape_agent(
             web_url=request.web_url,
             query=request.query,
             api_key=api_key,
             model=request.model,
             temperature=request.temperature,
+            budget=agent_budget(agent_service, request),
+            use_cache=use_cache,
+        )
+        return ScrapeResponse(
+            response=result.response,
+            partial=result.partial,
+            budget_exceeded=result.budget_exceeded,
         )
-        return ScrapeResponse(response=response)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
+
+
+@app.post("/api/websearch/stream")
+async def stream_agent(
+    request: WebSearchRequest,
+    api_key: str = Depends(get_api_key),
+    agent_service: "AgentService" = Depends(get_agent_service),
+):
+    """
+    Run the web search agent, streaming its steps as server-sent events:
+    `token`, `tool_start`, `tool_end` and a closing `final` event.
+    Requires an API key in the X-API-Key header.
+    """
+    return sse_response(
+        agent_service.stream_websearch_agent(
+            query=request.query,
+            api_key=api_key,
+            search_instructions=request.search_instructions,
+            model=request.model,
+            temperature=request.temperature,
+            budget=agent_budget(agent_service, request),
+        )
+    )
+
+
+@app.post("/api/scrape/stream")
+async def stream_scrape_agent(
+    request: ScrapeRequest,
+    api_key: str = Depends(get_api_key),
+    agent_service: "AgentService" = Depends(get_agent_service),
+):
+    """
+    Run the web scraping agent, streaming its steps as server-sent events:
+    `token`, `tool_start` (with the URLs being scraped), `tool_end` and a
+    closing `final` event.
+    Requires an API key in the X-API-Key header.
+    """
+    return sse_response(
+        agent_service.stream_scrape_agent(
+            web_url=request.web_url,
+            query=request.query,
+            api_key=api_key,
+            model=request.model,
+            temperature=request.temperature,
+            budget=agent_budget(agent_service, request),
+        )
+    )
 
 
 @app.post("/api/company", response_model=CompanyScrapeResponse)
-async def scrape_company(request: CompanyScrapeRequest):
+async def scrape_company(
+    request: CompanyScrapeRequest,
+    linkedin_scraper_service: LinkedInScraperService = Depends(get_linkedin_service),
+):
     """
     Scrapes the company LinkedIn page to pull all information found on the page
     and returns a summary of key company information.
@@ -136,26 +532,364 @@ async def scrape_company(request: CompanyScrapeRequest):
             linkedin_url=request.linkedin_url
         )
 
-        company_profile = CompanyProfile(
-            name=company_data["name"],
-            linkedin_internal_id=company_data["linkedin_internal_id"],
-            website=company_data["website"],
-            industry=company_data["industry"],
-            company_size=" - ".join([str(cs) for cs in company_data["company_size"]]),
-            company_size_on_linkedin=company_data["company_size_on_linkedin"],
-            hq_location=company_data["hq"]["city"]
-            + ", "
-            + company_data["hq"]["state"]
-            + ", "
-            + company_data["hq"]["country"],
-            company_type=company_data["company_type"],
-            founded_year=company_data["founded_year"],
-            tagline=company_data["tagline"],
-        )
+        company_profile = build_company_profile(company_data)
 
         return CompanyScrapeResponse(response=company_profile)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise http_error(e)
+
+
+def check_batch_size(items: list):
+    if len(items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(items)} items (max {settings.batch_max_items})",
+        )
+
+
+def to_batch_agent_result(
+    result: Optional["AgentResult"], error: Optional[str]
+) -> BatchTextResult:
+    if result is None:
+        return BatchTextResult(error=error)
+    return BatchTextResult(
+        response=result.response,
+        partial=result.partial,
+        budget_exceeded=result.budget_exceeded,
+    )
+
+
+@app.post("/api/batch/chat", response_model=BatchTextResponse)
+async def batch_chat_with_llm(
+    request: BatchChatRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    llm_service: LLMService = Depends(get_llm_service),
+):
+    """
+    Process many chat requests in one call.
+    Results are returned in request order with per-item errors.
+    Requires an API key in the X-API-Key header.
+    """
+    check_batch_size(request.items)
+
+    async def handle(item: ChatRequest) -> str:
+        return await llm_service.generate_response(
+            query=item.query,
+            api_key=api_key,
+            model=item.model,
+            temperature=item.temperature,
+            use_cache=use_cache,
+            response_model=str,
+        )
+
+    results = await run_batch(request.items, handle, settings.batch_max_concurrency)
+    return BatchTextResponse(
+        results=[BatchTextResult(response=r, error=e) for r, e in results]
+    )
+
+
+@app.post("/api/batch/websearch", response_model=BatchTextResponse)
+async def batch_run_agent(
+    request: BatchWebSearchRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    agent_service: "AgentService" = Depends(get_agent_service),
+):
+    """
+    Run the web search agent for many queries in one call.
+    Results are returned in request order with per-item errors.
+    Requires an API key in the X-API-Key header.
+    """
+    check_batch_size(request.items)
+
+    async def handle(item: WebSearchRequest) -> "AgentResult":
+        return await agent_service.run_websearch_agent(
+            query=item.query,
+            api_key=api_key,
+            search_instructions=item.search_instructions,
+            model=item.model,
+            temperature=item.temperature,
+            budget=agent_budget(agent_service, item),
+            use_cache=use_cache,
+        )
+
+    results = await run_batch(request.items, handle, settings.batch_max_concurrency)
+    return BatchTextResponse(results=[to_batch_agent_result(r, e) for r, e in results])
+
+
+@app.post("/api/batch/person-lookup", response_model=BatchTextResponse)
+async def batch_run_person_lookup_agent(
+    request: BatchPersonLookupRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    agent_service: "AgentService" = Depends(get_agent_service),
+):
+    """
+    Run the person lookup agent for many company/role pairs in one call.
+    Results are returned in request order with per-item errors.
+    Requires an API key in the X-API-Key header.
+    """
+    check_batch_size(request.items)
+
+    async def handle(item: PersonLookupRequest) -> "AgentResult":
+        return await agent_service.run_person_lookup(
+            company_url=item.company_url,
+            role=item.role,
+            api_key=api_key,
+            model=item.model,
+            temperature=item.temperature,
+            budget=agent_budget(agent_service, item),
+            use_cache=use_cache,
+        )
+
+    results = await run_batch(request.items, handle, settings.batch_max_concurrency)
+    return BatchTextResponse(results=[to_batch_agent_result(r, e) for r, e in results])
+
+
+@app.post("/api/batch/scrape", response_model=BatchTextResponse)
+async def batch_scrape_agent(
+    request: BatchScrapeRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    agent_service: "AgentService" = Depends(get_agent_service),
+):
+    """
+    Run the web scraping agent for many URL/query pairs in one call.
+    Results are returned in request order with per-item errors.
+    Requires an API key in the X-API-Key header.
+    """
+    check_batch_size(request.items)
+
+    async def handle(item: ScrapeRequest) -> "AgentResult":
+        return await agent_service.run_scrape_agent(
+            web_url=item.web_url,
+            query=item.query,
+            api_key=api_key,
+            model=item.model,
+            temperature=item.temperature,
+            budget=agent_budget(agent_service, item),
+            use_cache=use_cache,
+        )
+
+    results = await run_batch(request.items, handle, settings.batch_max_concurrency)
+    return BatchTextResponse(results=[to_batch_agent_result(r, e) for r, e in results])
+
+
+@app.post("/api/batch/company", response_model=BatchCompanyResponse)
+async def batch_scrape_company(
+    request: BatchCompanyScrapeRequest,
+    linkedin_scraper_service: LinkedInScraperService = Depends(get_linkedin_service),
+):
+    """
+    Scrape many company LinkedIn pages in one call.
+    Results are returned in request order with per-item errors.
+    """
+    check_batch_size(request.items)
+
+    async def handle(item: CompanyScrapeRequest) -> CompanyProfile:
+        company_data = await linkedin_scraper_service.scrape_company(
+            linkedin_url=item.linkedin_url
+        )
+        return build_company_profile(company_data)
+
+    results = await run_batch(request.items, handle, settings.batch_max_concurrency)
+    return BatchCompanyResponse(
+        results=[BatchCompanyResult(response=r, error=e) for r, e in results]
+    )
+
+
+def submit_job(
+    job_service: JobService, kind: str, api_key: str, runner: JobRunner
+) -> JobSubmitResponse:
+    try:
+        job = job_service.submit(kind, hash_api_key(api_key), runner)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Job queue is full")
+    except JobServiceClosed as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return JobSubmitResponse(job_id=job.id, status=job.status)
+
+
+def get_owned_job(job_service: JobService, job_id: str, api_key: str) -> Job:
+    job = job_service.get(job_id)
+    if job is None or job.owner != hash_api_key(api_key):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def job_progress_callbacks(job: Job, job_service: JobService) -> list:
+    # Imported here: LangChain is only loaded once an agent endpoint is used
+    callback_service = lazy_import("app.services.callback_service")
+    return [callback_service.JobProgressHandler(job, job_service.store)]
+
+
+def to_job_status_response(job: Job) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        progress=job.progress,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        response=job.response,
+        error=job.error,
+        partial=job.budget_exceeded is not None,
+        budget_exceeded=job.budget_exceeded,
+    )
+
+
+@app.post(
+    "/api/jobs/websearch",
+    response_model=JobSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_websearch_job(
+    request: WebSearchRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    agent_service: "AgentService" = Depends(get_agent_service),
+    job_service: JobService = Depends(get_job_service),
+):
+    """
+    Queue a web search agent run and return its job id immediately.
+    Poll `/api/jobs/{job_id}` for progress and the result.
+    Requires an API key in the X-API-Key header.
+    """
+
+    async def runner(job: Job) -> str:
+        result = await agent_service.run_websearch_agent(
+            query=request.query,
+            api_key=api_key,
+            search_instructions=request.search_instructions,
+            model=request.model,
+            temperature=request.temperature,
+            budget=agent_budget(agent_service, request),
+            use_cache=use_cache,
+            callbacks=job_progress_callbacks(job, job_service),
+        )
+        job.budget_exceeded = result.budget_exceeded
+        return result.response
+
+    return submit_job(job_service, "websearch", api_key, runner)
+
+
+@app.post(
+    "/api/jobs/person-lookup",
+    response_model=JobSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_person_lookup_job(
+    request: PersonLookupRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    agent_service: "AgentService" = Depends(get_agent_service),
+    job_service: JobService = Depends(get_job_service),
+):
+    """
+    Queue a person lookup agent run and return its job id immediately.
+    Poll `/api/jobs/{job_id}` for progress and the result.
+    Requires an API key in the X-API-Key header.
+    """
+
+    async def runner(job: Job) -> str:
+        result = await agent_service.run_person_lookup(
+            company_url=request.company_url,
+            role=request.role,
+            api_key=api_key,
+            model=request.model,
+            temperature=request.temperature,
+            budget=agent_budget(agent_service, request),
+            use_cache=use_cache,
+            callbacks=job_progress_callbacks(job, job_service),
+        )
+        job.budget_exceeded = result.budget_exceeded
+        return result.response
+
+    return submit_job(job_service, "person-lookup", api_key, runner)
+
+
+@app.post(
+    "/api/jobs/scrape",
+    response_model=JobSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_scrape_job(
+    request: ScrapeRequest,
+    api_key: str = Depends(get_api_key),
+    use_cache: bool = Depends(use_response_cache),
+    agent_service: "AgentService" = Depends(get_agent_service),
+    job_service: JobService = Depends(get_job_service),
+):
+    """
+    Queue a web scraping agent run and return its job id immediately.
+    Poll `/api/jobs/{job_id}` for progress and the result.
+    Requires an API key in the X-API-Key header.
+    """
+
+    async def runner(job: Job) -> str:
+        result = await agent_service.run_scrape_agent(
+            web_url=request.web_url,
+            query=request.query,
+            api_key=api_key,
+            model=request.model,
+            temperature=request.temperature,
+            budget=agent_budget(agent_service, request),
+            use_cache=use_cache,
+            callbacks=job_progress_callbacks(job, job_service),
+        )
+        job.budget_exceeded = result.budget_exceeded
+        return result.response
+
+    return submit_job(job_service, "scrape", api_key, runner)
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(
+    job_id: str,
+    api_key: str = Depends(get_api_key),
+    job_service: JobService = Depends(get_job_service),
+):
+    """
+    Get a job's status, progress and, once finished, its result or error.
+    Requires the API key that submitted the job in the X-API-Key header.
+    """
+    return to_job_status_response(get_owned_job(job_service, job_id, api_key))
+
+
+@app.delete("/api/jobs/{job_id}", response_model=JobStatusResponse)
+async def cancel_job(
+    job_id: str,
+    api_key: str = Depends(get_api_key),
+    job_service: JobService = Depends(get_job_service),
+):
+    """
+    Cancel a queued or running job. A running job stops at its next await
+    point, so its status may still read "running" in this response.
+    Requires the API key that submitted the job in the X-API-Key header.
+    """
+    get_owned_job(job_service, job_id, api_key)
+    return to_job_status_response(job_service.cancel(job_id))
+
+
+@app.get("/api/rate-limits")
+async def get_rate_limits():
+    """
+    Upstream limiter metrics: queue depth, in-flight calls, shed calls,
+    retries and time spent waiting for a token or slot.
+    """
+    return rate_limiter_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Metrics in the Prometheus text format: request, tool call, LLM and agent
+    run latencies, upstream status codes, token usage, and the counters of
+    the rate limiters, caches and job queue.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/health")
@@ -0,0 +1,70 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from app.models.chat_models import ChatRequest
+from app.models.company_models import CompanyProfile, CompanyScrapeRequest
+from app.models.person_lookup_models import PersonLookupRequest
+from app.models.scrape_models import ScrapeRequest
+from app.models.websearch_models import WebSearchRequest
+
+
+class BatchChatRequest(BaseModel):
+    items: List[ChatRequest] = Field(..., description="The chat requests to process")
+
+
+class BatchWebSearchRequest(BaseModel):
+    items: List[WebSearchRequest] = Field(
+        ..., description="The web search requests to process"
+    )
+
+
+class BatchScrapeRequest(BaseModel):
+    items: List[ScrapeRequest] = Field(
+        ..., description="The scrape requests to process"
+    )
+
+
+class BatchPersonLookupRequest(BaseModel):
+    items: List[PersonLookupRequest] = Field(
+        ..., description="The person lookup requests to process"
+    )
+
+
+class BatchCompanyScrapeRequest(BaseModel):
+    items: List[CompanyScrapeRequest] = Field(
+        ..., description="The company scrape requests to process"
+    )
+
+
+class BatchTextResult(BaseModel):
+    response: Optional[str] = Field(
+        None, description="The LLM's response, if the item succeeded"
+    )
+    error: Optional[str] = Field(None, description="The error, if the item failed")
+    partial: bool = Field(
+        False,
+        description="True when a budget cut the run short and the response is the best partial answer",
+    )
+    budget_exceeded: Optional[str] = Field(
+        None,
+        description="The budget that was hit (steps, tool_calls, tokens or time), if any",
+    )
+
+
+class BatchTextResponse(BaseModel):
+    results: List[BatchTextResult] = Field(
+        ..., description="One result per request item, in request order"
+    )
+
+
+class BatchCompanyResult(BaseModel):
+    response: Optional[CompanyProfile] = Field(
+        None, description="The scraped company profile, if the item succeeded"
+    )
+    error: Optional[str] = Field(None, description="The error, if the item failed")
+
+
+class BatchCompanyResponse(BaseModel):
+    results: List[BatchCompanyResult] = Field(
+        ..., description="One result per request item, in request order"
+    )
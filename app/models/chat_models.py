@@ -6,7 +6,7 @@ class ChatRequest(BaseModel):
     query: str = Field(..., description="The user's query to process")
     model: Optional[str] = Field(
         default="gpt-4o",
-        description="The OpenAI model to use (defaults to gpt-4o if not specified)",
+        description='The OpenAI model to use, or "auto" to route each call between a small and a large model (defaults to gpt-4o if not specified)',
     )
     temperature: Optional[float] = Field(
         0.5,
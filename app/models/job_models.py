@@ -0,0 +1,42 @@
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str = Field(..., description="Identifier used to poll the job")
+    status: JobStatus = Field(..., description="The job's status after submission")
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str = Field(..., description="The job identifier")
+    kind: str = Field(..., description="The kind of agent run (e.g. websearch)")
+    status: JobStatus = Field(..., description="The job's current status")
+    progress: Optional[str] = Field(
+        None, description="The latest agent step, while the job is running"
+    )
+    created_at: float = Field(..., description="Submission time (Unix seconds)")
+    started_at: Optional[float] = Field(None, description="Start time (Unix seconds)")
+    finished_at: Optional[float] = Field(
+        None, description="Completion time (Unix seconds)"
+    )
+    response: Optional[str] = Field(
+        None, description="The agent's response, once the job has succeeded"
+    )
+    error: Optional[str] = Field(None, description="The error, if the job failed")
+    partial: bool = Field(
+        False,
+        description="True when a budget cut the run short and the response is the best partial answer",
+    )
+    budget_exceeded: Optional[str] = Field(
+        None,
+        description="The budget that was hit (steps, tool_calls, tokens or time), if any",
+    )
@@ -13,7 +13,7 @@ class PersonLookupRequest(BaseModel):
     )
     model: Optional[str] = Field(
         default="gpt-4o",
-        description="The OpenAI model to use (defaults to gpt-4o if not specified)",
+        description='The OpenAI model to use, or "auto" to route each call between a small and a large model (defaults to gpt-4o if not specified)',
     )
     temperature: Optional[float] = Field(
         0,
@@ -25,7 +25,35 @@ class PersonLookupRequest(BaseModel):
         None,
         description="Optional specific instructions for the web search (e.g., time range, site restrictions)",
     )
+    max_steps: Optional[int] = Field(
+        None,
+        description="Maximum agent reasoning steps (LLM calls); capped by the server",
+        ge=1,
+    )
+    max_tool_calls: Optional[int] = Field(
+        None,
+        description="Maximum tool calls (searches and scrapes); capped by the server",
+        ge=0,
+    )
+    max_tokens: Optional[int] = Field(
+        None,
+        description="Maximum prompt plus completion tokens; capped by the server",
+        ge=1,
+    )
+    timeout: Optional[float] = Field(
+        None,
+        description="Wall-clock deadline in seconds; capped by the server",
+        gt=0,
+    )
 
 
 class PersonLookupResponse(BaseModel):
     response: str = Field(..., description="The LLM's response to the query")
+    partial: bool = Field(
+        False,
+        description="True when a budget cut the run short and the response is the best partial answer",
+    )
+    budget_exceeded: Optional[str] = Field(
+        None,
+        description="The budget that was hit (steps, tool_calls, tokens or time), if any",
+    )
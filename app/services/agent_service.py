@@ -1,104 +1,822 @@
-from typing import Dict, Any
-from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
-from langchain_core.tools import tool
-from app.tools.search_tools import search_google, scrape_website
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from contextlib import aclosing
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Any, List, Optional, Sequence, Tuple
+from langgraph.prebuilt import ToolNode, create_react_agent
+from langgraph.prebuilt.tool_node import TOOL_CALL_ERROR_TEMPLATE
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.runnables import Runnable, RunnableConfig, ensure_config
+from langchain_core.runnables.config import merge_configs
+from langchain_core.tools import BaseTool, tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from app.tools.content_tools import count_tokens, reduce_content
+from app.tools.crawl_tools import CrawlFrontier, crawl_pages
+from app.tools.person_search_tools import (
+    company_name_from_url,
+    confident_match,
+    merge_candidates,
+    person_search_queries,
+    rank_profiles,
+)
+from app.tools.prefetch_tools import ScrapePrefetcher, top_result_links
+from app.tools.search_tools import asearch_google, ascrape_website
+from app.tools.url_tools import canonicalize_url
 from app.config.settings import get_settings
+from app.services.callback_service import (
+    CASCADE_DRAFT_TAG,
+    BudgetHandler,
+    RunMetricsHandler,
+)
+from app.services.corpus_service import get_local_corpus
+from app.services.llm_service import LLMService
+from app.services.metrics_service import (
+    AGENT_BUDGET_EXCEEDED,
+    PERSON_LOOKUPS,
+    SCRAPE_PREFETCHES,
+    SCRAPE_PREFETCH_SAVED_SECONDS,
+)
+from app.services.model_router_service import get_model_router
+from app.services.openai_client_service import (
+    as_rate_limit_exceeded,
+    get_openai_client_registry,
+    hash_api_key,
+)
+from app.services.rate_limit_service import (
+    RateLimitExceeded,
+    UpstreamError,
+    get_rate_limiter,
+)
+from app.services.response_cache_service import get_response_cache
+from app.services.singleflight_service import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# System prompts are constant so that every run of an agent sends the same
+# leading bytes, which OpenAI serves from its prompt cache. Per-run values
+# (the starting URL, request instructions) go after them.
+WEBSEARCH_PROMPT = """You are a helpful research assistant.
+Your goal is to provide accurate, detailed information to the user's questions.
+
+First, search Google to find relevant information about the user's query.
+If the Google search results don't provide enough information, scrape specific websites
+mentioned in the search results to get more detailed information.
+
+You may need to perform multiple searches and scrapes to gather sufficient information.
+Always analyze the information you get critically and provide a coherent, comprehensive answer.
+
+Remember to cite your sources in your final answer."""
+
+WEBSEARCH_LOCAL_SEARCH_PROMPT = """
+
+Before searching Google, try local_search: it searches pages and search results fetched
+in earlier research and answers in milliseconds. Search Google and scrape websites only
+when it returns nothing relevant, or not enough to answer."""
+
+SCRAPE_PROMPT = """You are a specialized web scraping assistant.
+Your goal is to extract and analyze information from websites to answer the user's questions.
+
+You will start by scraping the initial URL given at the end of these instructions.
+
+After scraping a page, look for relevant links within the content that might contain additional
+information needed to answer the query. You can follow these links by scraping them as well.
+The crawler scrapes several pages at once, so request all promising pages in a single call.
+
+Follow these guidelines:
+1. First scrape the initial URL provided
+2. Analyze the content to find relevant information
+3. Identify links to other pages within the same domain that might contain more relevant information
+4. Scrape those additional pages together in one crawler call when necessary
+5. Continue until you have gathered sufficient information to answer the query
+6. Prioritize depth over breadth - focus on the most promising paths
+
+Always provide a comprehensive answer based on the scraped content and cite the specific URLs
+you used to gather information."""
+
+SCRAPE_LOCAL_SEARCH_PROMPT = """
+
+Before scraping, try local_search: it searches pages of this website scraped in earlier
+research and answers in milliseconds. Scrape only when it returns nothing relevant,
+or not enough to answer."""
+
+ADDITIONAL_INSTRUCTIONS_PROMPT = """
+
+Additional Instruction:
+{instructions}"""
+
+COMPACTED_TOOL_RESULT = """[Already read; cut down to its passages most relevant to the question]
+{content}"""
+
+PARTIAL_ANSWER_PROMPT = """Your research budget for this question is used up, so no more searches or scrapes can be made.
+Answer the question above now, in the format you were asked for, using only the tool results below.
+If they are not enough for a complete answer, give your best partial answer.
+
+Tool results:
+{notes}"""
+
+PERSON_PICK_PROMPT = """Which of these LinkedIn profiles belongs to the person who currently works at {company} with the role of {role}?
+
+{candidates}
+
+Reply with the number of the matching profile, or 0 if none of them matches."""
+
+
+@dataclass(frozen=True)
+class AgentBudget:
+    """Limits of one agent run; hitting one ends the run with a partial answer."""
+
+    max_steps: int  # LLM calls
+    max_tool_calls: int
+    max_tokens: int  # Prompt plus completion tokens over every LLM call
+    timeout: float  # Seconds of wall clock
+
+
+@dataclass
+class AgentResult:
+    """An agent's answer and, when the run was cut short, the budget it hit."""
+
+    response: str
+    budget_exceeded: Optional[str] = None
+
+    @property
+    def partial(self) -> bool:
+        return self.budget_exceeded is not None
+
+
+def get_api_key(config: RunnableConfig) -> str:
+    api_key = config.get("configurable", {}).get("openai_api_key")
+    if not api_key:
+        raise ValueError("Missing 'openai_api_key' in the runtime config")
+    return api_key
+
+
+def get_client_key(config: RunnableConfig) -> str:
+    """Identify the client of a run for per-client rate limits."""
+    return hash_api_key(get_api_key(config))
+
+
+def handle_tool_error(e: Exception) -> str:
+    """
+    Report a failed tool call back to the model, except when an upstream is
+    shedding load: that aborts the run so the client is told to retry later.
+    """
+    if isinstance(e, RateLimitExceeded):
+        raise e
+    return TOOL_CALL_ERROR_TEMPLATE.format(error=repr(e))
+
+
+async def until_deadline(events: AsyncIterator, deadline: float) -> AsyncIterator:
+    """
+    Yield from an async iterator until the event loop clock reaches `deadline`.
+
+    Raises TimeoutError at the deadline, after closing the iterator (which
+    cancels a graph run still in progress).
+    """
+    async with aclosing(events):
+        while True:
+            try:
+                async with asyncio.timeout_at(deadline):
+                    event = await anext(events)
+            except StopAsyncIteration:
+                return
+            yield event
+
+
+def _total_tokens(message: BaseMessage) -> int:
+    return (getattr(message, "usage_metadata", None) or {}).get("total_tokens", 0)
+
+
+@lru_cache(maxsize=256)
+def _compact_text(
+    content: str, query: Optional[str], max_tokens: int, chunk_tokens: int
+) -> str:
+    return COMPACTED_TOOL_RESULT.format(
+        content=reduce_content(content, query, max_tokens, chunk_tokens)
+    )
+
+
+def compact_tool_messages(
+    messages: Sequence[BaseMessage],
+    query: Optional[str],
+    max_tokens: int,
+    chunk_tokens: int = 200,
+) -> List[BaseMessage]:
+    """
+    Cut down the tool results the model has already answered to.
+
+    Tool results before the latest AI message are reduced to their passages
+    most relevant to the query; the ones the model has not seen yet are kept
+    whole. A result is therefore sent whole once and compacted from the next
+    step on, so consecutive steps share their history only up to the AI
+    message that requested the newest compacted results. The reduction only
+    depends on the message, so everything before that point is sent with the
+    same bytes at every step and stays in the upstream prompt cache.
+
+    Args:
+        messages: The conversation so far
+        query: The question of the run (optional)
+        max_tokens: Tokens kept of each read tool result
+        chunk_tokens: Chunk size for relevance ranking
+
+    Returns:
+        The messages to send to the model; the run's state is left untouched
+    """
+    last_reply = max(
+        (i for i, m in enumerate(messages) if isinstance(m, AIMessage)), default=-1
+    )
+    compacted = []
+    for i, message in enumerate(messages):
+        if (
+            i < last_reply
+            and isinstance(message, ToolMessage)
+            and isinstance(message.content, str)
+            and count_tokens(message.content) > max_tokens
+        ):
+            message = message.model_copy(
+                update={
+                    "content": _compact_text(
+                        message.content, query, max_tokens, chunk_tokens
+                    )
+                }
+            )
+        compacted.append(message)
+    return compacted
+
+
+class RuntimeChatOpenAI(Runnable):
+    """
+    Chat model whose OpenAI API key is read from the runtime config.
+
+    Lets a compiled agent graph be shared by every request: the caller passes
+    its key as `config["configurable"]["openai_api_key"]` and the pooled
+    `ChatOpenAI` client for that key is resolved per invocation.
+
+    With `model="auto"`, each step is routed by the model router: tool
+    selection runs on the small model, and a step is redone on the large
+    model when the small one writes the final answer or makes an invalid
+    tool call. Calls without tools (partial answers) use the large model.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        temperature: float,
+        tools: Optional[Sequence[BaseTool]] = None,
+    ):
+        self.model = model
+        self.temperature = temperature
+        self.tools = list(tools or [])
+        # Converted once so binding per invocation is cheap
+        self.tool_schemas = [convert_to_openai_tool(t) for t in self.tools]
+
+    def bind_tools(
+        self, tools: Sequence[BaseTool], **kwargs: Any
+    ) -> "RuntimeChatOpenAI":
+        return RuntimeChatOpenAI(self.model, self.temperature, tools)
+
+    def _resolve(self, config: RunnableConfig, model: str) -> Runnable:
+        llm = get_openai_client_registry().get_chat_model(
+            get_api_key(config), model, self.temperature
+        )
+        return llm.bind_tools(self.tool_schemas) if self.tool_schemas else llm
+
+    def invoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> BaseMessage:
+        config = ensure_config(config)
+        router = get_model_router()
+        # Synchronous calls are not routed step by step
+        model = router.large_model if router.is_auto(self.model) else self.model
+        return self._resolve(config, model).invoke(input, config, **kwargs)
+
+    async def ainvoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> BaseMessage:
+        config = ensure_config(config)
+        if get_model_router().is_auto(self.model):
+            return await self._ainvoke_auto(input, config, **kwargs)
+        return await self._ainvoke(self.model, input, config, **kwargs)
+
+    async def _ainvoke(
+        self, model: str, input: Any, config: RunnableConfig, **kwargs: Any
+    ) -> BaseMessage:
+        try:
+            async with get_rate_limiter("openai").acquire(get_client_key(config)):
+                return await self._resolve(config, model).ainvoke(
+                    input, config, **kwargs
+                )
+        except Exception as e:
+            rate_limit_error = as_rate_limit_exceeded(e)
+            if rate_limit_error is None:
+                raise
+            raise rate_limit_error from e
+
+    async def _ainvoke_auto(
+        self, input: Any, config: RunnableConfig, **kwargs: Any
+    ) -> BaseMessage:
+        router = get_model_router()
+        endpoint = config.get("metadata", {}).get("agent") or "agent"
+        reason = "synthesis"
+        if self.tools:
+            start = time.perf_counter()
+            draft = await self._ainvoke(
+                router.small_model,
+                input,
+                merge_configs(config, {"tags": [CASCADE_DRAFT_TAG]}),
+                **kwargs,
+            )
+            reason = router.step_escalation(draft, [t.name for t in self.tools])
+            router.record(
+                endpoint,
+                router.small_model,
+                "tool_step" if reason is None else "escalated",
+                time.perf_counter() - start,
+                _total_tokens(draft),
+            )
+            if reason is None:
+                return draft
+
+        start = time.perf_counter()
+        reply = await self._ainvoke(router.large_model, input, config, **kwargs)
+        router.record(
+            endpoint,
+            router.large_model,
+            reason,
+            time.perf_counter() - start,
+            _total_tokens(reply),
+        )
+        return reply
 
 
 class AgentService:
     def __init__(self):
-        self.agent = None
         self.settings = get_settings()
+        self.llm_service = LLMService()
+        self.response_cache = get_response_cache()
+        # Identical concurrent runs (e.g. a recalculating sheet) share one execution,
+        # which is cancelled if every caller goes away
+        self.single_flight = SingleFlight(cancel_abandoned=True)
+        # Compiled agent graphs keyed by (agent type, model, temperature, instructions hash)
+        self._agents: "OrderedDict[tuple, Any]" = OrderedDict()
 
-    def create_websearch_agent(
+    def _get_or_create_agent(self, key: tuple, factory) -> Any:
+        agent = self._agents.get(key)
+        if agent is not None:
+            self._agents.move_to_end(key)
+            return agent
+
+        agent = factory()
+        self._agents[key] = agent
+        if len(self._agents) > self.settings.agent_graph_cache_size:
+            self._agents.popitem(last=False)
+        return agent
+
+    def _reduce_content(self, markdown: str, config: RunnableConfig) -> str:
+        """Cut a scraped page down to the passages relevant to the run's query"""
+        if not self.settings.scrape_max_tokens:
+            return markdown
+        return reduce_content(
+            markdown,
+            config.get("configurable", {}).get("query"),
+            self.settings.scrape_max_tokens,
+            self.settings.scrape_chunk_tokens,
+        )
+
+    async def _local_search(self, query: str, site: Optional[str] = None) -> str:
+        """Search the local corpus and list the passages found for the model"""
+        passages = await asyncio.to_thread(
+            get_local_corpus().search, query, self.settings.corpus_search_limit, site
+        )
+        if not passages:
+            return "No fresh local results. Get this information from the web instead."
+        return "\n\n".join(
+            f"[{i}] {p.url} ({p.kind}, fetched "
+            f"{time.strftime('%Y-%m-%d', time.gmtime(p.fetched_at))})\n{p.content}"
+            for i, p in enumerate(passages, 1)
+        )
+
+    @staticmethod
+    def _instructions_hash(instructions: Optional[str]) -> str:
+        return hashlib.sha256((instructions or "").encode("utf-8")).hexdigest()
+
+    def make_budget(
+        self,
+        max_steps: Optional[int] = None,
+        max_tool_calls: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> AgentBudget:
+        """
+        Build a run's budget from the limits a request asked for.
+
+        Limits left unset take the server's caps, and no limit may exceed them.
+        """
+
+        def capped(requested, cap):
+            return cap if requested is None else min(requested, cap)
+
+        return AgentBudget(
+            max_steps=capped(max_steps, self.settings.agent_max_steps),
+            max_tool_calls=capped(max_tool_calls, self.settings.agent_max_tool_calls),
+            max_tokens=capped(max_tokens, self.settings.agent_max_tokens),
+            timeout=capped(timeout, self.settings.agent_timeout),
+        )
+
+    @staticmethod
+    def _budget_handler(budget: AgentBudget) -> BudgetHandler:
+        return BudgetHandler(budget.max_steps, budget.max_tool_calls, budget.max_tokens)
+
+    @staticmethod
+    def _run_config(
+        name: str, configurable: Dict[str, Any], budget: AgentBudget, callbacks: list
+    ) -> RunnableConfig:
+        return {
+            "configurable": configurable,
+            "callbacks": callbacks,
+            # Names the run's model="auto" routing decisions
+            "metadata": {"agent": name},
+            # The step budget ends runs first; the graph's own limit (three
+            # graph steps per LLM call: history compaction, model, tools) is
+            # only a backstop
+            "recursion_limit": 3 * budget.max_steps + 2,
+        }
+
+    def _deadlines(self, budget: AgentBudget) -> Tuple[float, float]:
+        """
+        Event loop times at which a run's graph is stopped and at which its
+        partial answer must be written.
+
+        The run's `timeout` covers both: up to `agent_finalize_timeout`
+        seconds of it, and at most half, are kept for the partial answer.
+        """
+        end = asyncio.get_running_loop().time() + budget.timeout
+        reserved = min(self.settings.agent_finalize_timeout, budget.timeout / 2)
+        return end - reserved, end
+
+    async def _run_agent(
         self,
+        agent: Any,
+        name: str,
+        query: str,
+        configurable: Dict[str, Any],
+        budget: AgentBudget,
+        model: str,
+        temperature: float,
+        callbacks: list = None,
+    ) -> AgentResult:
+        """Run an agent graph within its budget, answering partially if it runs out"""
+        handler = self._budget_handler(budget)
+        config = self._run_config(
+            name,
+            configurable,
+            budget,
+            [RunMetricsHandler(name), handler] + (callbacks or []),
+        )
+        state = None
+        exceeded = None
+        deadline, finalize_deadline = self._deadlines(budget)
+        try:
+            async for state in until_deadline(
+                agent.astream(
+                    {"messages": [("user", query)]}, config, stream_mode="values"
+                ),
+                deadline,
+            ):
+                exceeded = handler.exceeded()
+                if exceeded is not None:
+                    break
+        except TimeoutError:
+            exceeded = "time"
+        finally:
+            self._close_prefetcher(configurable)
+
+        if exceeded is None:
+            return AgentResult(state["messages"][-1].content)
+        logger.info("Agent %s run hit its %s budget", name, exceeded)
+        AGENT_BUDGET_EXCEEDED.inc(name, exceeded)
+        response = await self._partial_answer(
+            name,
+            handler,
+            configurable["openai_api_key"],
+            model,
+            temperature,
+            finalize_deadline,
+        )
+        return AgentResult(response, exceeded)
+
+    @staticmethod
+    def _close_prefetcher(configurable: Dict[str, Any]) -> None:
+        """Cancel a run's unused prefetches and record how its prefetches fared"""
+        prefetcher = configurable.get("scrape_prefetcher")
+        if prefetcher is None:
+            return
+        prefetcher.close()
+        SCRAPE_PREFETCHES.inc("hit", amount=prefetcher.hits)
+        SCRAPE_PREFETCHES.inc("failed", amount=prefetcher.failed)
+        SCRAPE_PREFETCHES.inc("unused", amount=prefetcher.unused)
+        SCRAPE_PREFETCH_SAVED_SECONDS.inc(amount=prefetcher.saved_seconds)
+
+    async def _partial_answer(
+        self,
+        name: str,
+        handler: BudgetHandler,
         api_key: str,
+        model: str,
+        temperature: float,
+        deadline: float,
+    ) -> str:
+        """
+        Answer from what a run cut short by a budget gathered so far.
+
+        One last LLM call without tools is given the run's instructions, the
+        question and every tool result. It must finish by `deadline` (event
+        loop time) and within `agent_finalize_timeout`. Should it fail, the
+        latest text the model wrote during the run is returned instead.
+        """
+        messages = handler.messages
+        question = next((m for m in messages if isinstance(m, HumanMessage)), None)
+        fallback = next(
+            (
+                m.content
+                for m in reversed(messages)
+                if isinstance(m, AIMessage) and isinstance(m.content, str) and m.content
+            ),
+            "",
+        )
+        if question is None:
+            return fallback
+
+        notes = "\n\n".join(
+            f"[{m.name or 'tool'}]\n{m.content}"
+            for m in messages
+            if isinstance(m, ToolMessage)
+        )
+        prompt = [m for m in messages if isinstance(m, SystemMessage)] + [
+            question,
+            HumanMessage(content=PARTIAL_ANSWER_PROMPT.format(notes=notes or "(none)")),
+        ]
+        try:
+            loop_time = asyncio.get_running_loop().time()
+            finalize_by = min(
+                deadline, loop_time + self.settings.agent_finalize_timeout
+            )
+            async with asyncio.timeout_at(finalize_by):
+                reply = await RuntimeChatOpenAI(model, temperature).ainvoke(
+                    prompt,
+                    {
+                        "configurable": {"openai_api_key": api_key},
+                        "callbacks": [RunMetricsHandler(name)],
+                        "metadata": {"agent": name},
+                    },
+                )
+            return reply.content
+        except Exception:
+            logger.warning("Could not write a partial answer", exc_info=True)
+            return fallback
+
+    def _history_compactor(self) -> Optional[Any]:
+        """
+        Return the agents' pre-model hook sending the model a compacted
+        history (see `compact_tool_messages`), or None when it is disabled.
+        """
+        max_tokens = self.settings.agent_history_tool_tokens
+        if not max_tokens:
+            return None
+
+        def compact_history(
+            state: Dict[str, Any], config: RunnableConfig
+        ) -> Dict[str, Any]:
+            return {
+                "llm_input_messages": compact_tool_messages(
+                    state["messages"],
+                    config.get("configurable", {}).get("query"),
+                    max_tokens,
+                    self.settings.scrape_chunk_tokens,
+                )
+            }
+
+        return compact_history
+
+    def get_websearch_agent(
+        self,
+        model: str = "gpt-4o",
+        temperature: float = 0,
+        search_instructions: str = None,
+    ) -> Any:
+        """Return the cached websearch agent graph, compiling it on first use"""
+        key = (
+            "websearch",
+            model,
+            temperature,
+            self._instructions_hash(search_instructions),
+        )
+        return self._get_or_create_agent(
+            key,
+            lambda: self.create_websearch_agent(
+                model, temperature, search_instructions
+            ),
+        )
+
+    def get_scrape_agent(
+        self,
+        model: str = "gpt-4o",
+        temperature: float = 0,
+        search_instructions: str = None,
+    ) -> Any:
+        """Return the cached scrape agent graph, compiling it on first use"""
+        key = (
+            "scrape",
+            model,
+            temperature,
+            self._instructions_hash(search_instructions),
+        )
+        return self._get_or_create_agent(
+            key,
+            lambda: self.create_scrape_agent(model, temperature, search_instructions),
+        )
+
+    def create_websearch_agent(
+        self,
         model: str = "gpt-4o",
         temperature: float = 0,
         search_instructions: str = None,
     ) -> Any:
-        """Create a ReAct agent with search and scraping tools"""
+        """
+        Create a ReAct agent with search and scraping tools.
+
+        The OpenAI API key is supplied per run via `configurable.openai_api_key`;
+        `configurable.query` is used to keep the relevant parts of scraped pages.
+        When `configurable.scrape_prefetcher` is set, each search starts
+        scraping its top results and the scraper takes pages from it. With the
+        local corpus enabled, a `local_search` tool over earlier results comes first.
+        Tool results the model has read are compacted before each step.
+        """
 
         # Define the tools
         @tool
-        def google_search(query: str) -> Dict[str, Any]:
+        async def google_search(query: str, config: RunnableConfig) -> Dict[str, Any]:
             """Search Google for information about a topic."""
-            return search_google(query, self.settings.serper_api_key)
+            results = await asearch_google(
+                query, self.settings.serper_api_key, get_client_key(config)
+            )
+            prefetcher = config.get("configurable", {}).get("scrape_prefetcher")
+            if prefetcher is not None:
+                prefetcher.prefetch(
+                    top_result_links(results, self.settings.prefetch_top_n)
+                )
+            return results
 
         @tool
-        def website_scraper(url: str) -> str:
+        async def website_scraper(url: str, config: RunnableConfig) -> str:
             """Scrape content from a website URL and return as markdown."""
-            return scrape_website(url, self.settings.serper_api_key)
+            prefetcher = config.get("configurable", {}).get("scrape_prefetcher")
+            markdown = await prefetcher.get(url) if prefetcher is not None else None
+            if markdown is None:
+                markdown = await ascrape_website(
+                    url, self.settings.serper_api_key, get_client_key(config)
+                )
+            return self._reduce_content(markdown, config)
 
-        llm = ChatOpenAI(api_key=api_key, model=model, temperature=temperature)
+        llm = RuntimeChatOpenAI(model=model, temperature=temperature)
         tools = [google_search, website_scraper]
-        system_prompt = f"""You are a helpful research assistant.
-        Your goal is to provide accurate, detailed information to the user's questions.
-        
-        First, search Google to find relevant information about the user's query.
-        If the Google search results don't provide enough information, scrape specific websites 
-        mentioned in the search results to get more detailed information.
-        
-        You may need to perform multiple searches and scrapes to gather sufficient information.
-        Always analyze the information you get critically and provide a coherent, comprehensive answer.
-        
-        Remember to cite your sources in your final answer."""
+        system_prompt = WEBSEARCH_PROMPT
+        if get_local_corpus() is not None:
+
+            @tool
+            async def local_search(query: str) -> str:
+                """Search pages and Google results fetched in earlier research, best passages first.
+                Answers in milliseconds, so try it before searching Google."""
+                return await self._local_search(query)
+
+            tools.insert(0, local_search)
+            system_prompt += WEBSEARCH_LOCAL_SEARCH_PROMPT
 
         if search_instructions:
-            system_prompt += f"""
-            
-            Additional Instruction:
-            {search_instructions}"""
+            system_prompt += ADDITIONAL_INSTRUCTIONS_PROMPT.format(
+                instructions=search_instructions
+            )
 
-        self.agent = create_react_agent(llm, tools, prompt=system_prompt)
-        return self.agent
+        return create_react_agent(
+            llm,
+            ToolNode(tools, handle_tool_errors=handle_tool_error),
+            prompt=system_prompt,
+            pre_model_hook=self._history_compactor(),
+        )
 
     def create_scrape_agent(
         self,
-        api_key: str,
-        web_url: str,
         model: str = "gpt-4o",
         temperature: float = 0,
         search_instructions: str = None,
     ) -> Any:
-        """Create a ReAct agent focused on website scraping with ability to crawl links"""
+        """
+        Create a ReAct agent focused on website scraping with ability to crawl links.
+
+        The OpenAI API key, the starting URL and the run's crawl state are
+        supplied per run via `configurable.openai_api_key`,
+        `configurable.web_url` and `configurable.crawl_frontier`. With the
+        local corpus enabled, a `local_search` tool over pages of the site
+        scraped before comes first. The system prompt is the same for every
+        run up to the starting URL, which is appended to it, and tool results
+        the model has read are compacted before each step.
+        """
 
         # Define the tools
         @tool
-        def website_scraper(url: str) -> str:
-            """Scrape content from a website URL and return as markdown."""
-            return scrape_website(url, self.settings.serper_api_key)
-
-        llm = ChatOpenAI(api_key=api_key, model=model, temperature=temperature)
-        tools = [website_scraper]
-        system_prompt = f"""You are a specialized web scraping assistant.
-        Your goal is to extract and analyze information from websites to answer the user's questions.
-        
-        You will start by scraping the initial URL: {web_url}
-        
-        After scraping a page, look for relevant links within the content that might contain additional 
-        information needed to answer the query. You can follow these links by scraping them as well.
-        
-        Follow these guidelines:
-        1. First scrape the initial URL provided
-        2. Analyze the content to find relevant information
-        3. Identify links to other pages within the same domain that might contain more relevant information
-        4. Scrape those additional pages when necessary
-        5. Continue until you have gathered sufficient information to answer the query
-        6. Prioritize depth over breadth - focus on the most promising paths
-        
-        Always provide a comprehensive answer based on the scraped content and cite the specific URLs 
-        you used to gather information."""
+        async def website_crawler(urls: List[str], config: RunnableConfig) -> str:
+            """Scrape one or more pages of the website concurrently and return each as markdown.
+            Pass every page you want to read next in a single call."""
+            frontier = config.get("configurable", {}).get("crawl_frontier")
+            if frontier is None:
+                raise ValueError("Missing 'crawl_frontier' in the runtime config")
+            client_key = get_client_key(config)
 
-        if search_instructions:
-            system_prompt += f"""
-            
-            Additional Instruction:
-            {search_instructions}"""
+            async def scrape(url: str) -> str:
+                return await ascrape_website(
+                    url, self.settings.serper_api_key, client_key
+                )
+
+            return await crawl_pages(
+                urls,
+                frontier,
+                scrape,
+                self.settings.crawl_max_concurrency,
+                query=config.get("configurable", {}).get("query"),
+                max_tokens=self.settings.scrape_max_tokens,
+                chunk_tokens=self.settings.scrape_chunk_tokens,
+            )
+
+        llm = RuntimeChatOpenAI(model=model, temperature=temperature)
+        tools = [website_crawler]
+        use_local_search = get_local_corpus() is not None
+        if use_local_search:
+
+            @tool
+            async def local_search(query: str, config: RunnableConfig) -> str:
+                """Search pages of this website scraped in earlier research, best passages first.
+                Answers in milliseconds, so try it before scraping."""
+                frontier = config.get("configurable", {}).get("crawl_frontier")
+                site = frontier.site if frontier is not None else None
+                return await self._local_search(query, site)
 
-        self.agent = create_react_agent(llm, tools, prompt=system_prompt)
-        return self.agent
+            tools.insert(0, local_search)
+
+        instructions = SCRAPE_PROMPT
+        if use_local_search:
+            instructions += SCRAPE_LOCAL_SEARCH_PROMPT
+
+        def prompt(state: Dict[str, Any], config: RunnableConfig) -> list:
+            web_url = config.get("configurable", {}).get("web_url")
+            system_prompt = f"{instructions}\n\nInitial URL: {web_url}"
+            if search_instructions:
+                system_prompt += ADDITIONAL_INSTRUCTIONS_PROMPT.format(
+                    instructions=search_instructions
+                )
+            return [SystemMessage(content=system_prompt)] + state["messages"]
+
+        return create_react_agent(
+            llm,
+            ToolNode(tools, handle_tool_errors=handle_tool_error),
+            prompt=prompt,
+            pre_model_hook=self._history_compactor(),
+        )
+
+    def _scrape_configurable(
+        self, api_key: str, web_url: str, query: str
+    ) -> Dict[str, Any]:
+        """Runtime config of one scrape agent run, with a fresh crawl frontier"""
+        return {
+            "openai_api_key": api_key,
+            "web_url": web_url,
+            "query": query,
+            "crawl_frontier": CrawlFrontier(
+                web_url,
+                max_pages=self.settings.crawl_max_pages,
+                max_depth=self.settings.crawl_max_depth,
+            ),
+        }
+
+    def _websearch_configurable(self, api_key: str, query: str) -> Dict[str, Any]:
+        """Runtime config of one websearch agent run, with a fresh prefetch store when enabled"""
+        configurable = {"openai_api_key": api_key, "query": query}
+        if self.settings.prefetch_enabled:
+            client_key = hash_api_key(api_key)
+            configurable["scrape_prefetcher"] = ScrapePrefetcher(
+                lambda url: ascrape_website(
+                    url, self.settings.serper_api_key, client_key
+                )
+            )
+        return configurable
 
     async def run_websearch_agent(
         self,
@@ -107,14 +825,34 @@ class AgentService:
         model: str = "gpt-4o",
         temperature: float = 0.5,
         search_instructions: str = None,
-    ) -> str:
-        """Run the agent with a user query"""
-        agent = self.create_websearch_agent(
-            api_key, model, temperature, search_instructions
+        callbacks: list = None,
+        use_cache: bool = True,
+        budget: Optional[AgentBudget] = None,
+    ) -> AgentResult:
+        """Run the agent with a user query, within `budget` (the server's caps by default)"""
+        budget = budget or self.make_budget()
+
+        async def run() -> Dict[str, Any]:
+            agent = self.get_websearch_agent(model, temperature, search_instructions)
+            logger.info("Running agent with query: %s", query)
+            result = await self._run_agent(
+                agent,
+                "websearch",
+                query,
+                self._websearch_configurable(api_key, query),
+                budget,
+                model,
+                temperature,
+                callbacks,
+            )
+            return asdict(result)
+
+        key = self.response_cache.make_key(
+            "websearch", api_key, model, temperature, query, search_instructions
+        )
+        return await self._get_or_run(
+            key, temperature, budget, run, use_cache, callbacks
         )
-        print(f"Running agent with query: {query}")
-        response = await agent.ainvoke({"messages": [("user", query)]})
-        return response["messages"][-1].content
 
     async def run_scrape_agent(
         self,
@@ -124,14 +862,289 @@ class AgentService:
         model: str = "gpt-4o",
         temperature: float = 0.5,
         search_instructions: str = None,
-    ) -> str:
-        """Run the scraping agent with a user query and starting web URL"""
-        agent = self.create_scrape_agent(
-            api_key, web_url, model, temperature, search_instructions
+        callbacks: list = None,
+        use_cache: bool = True,
+        budget: Optional[AgentBudget] = None,
+    ) -> AgentResult:
+        """Run the scraping agent with a user query and starting web URL, within `budget`"""
+        budget = budget or self.make_budget()
+
+        async def run() -> Dict[str, Any]:
+            agent = self.get_scrape_agent(model, temperature, search_instructions)
+            logger.info(
+                "Running scrape agent with query: %s on website: %s", query, web_url
+            )
+            result = await self._run_agent(
+                agent,
+                "scrape",
+                query,
+                self._scrape_configurable(api_key, web_url, query),
+                budget,
+                model,
+                temperature,
+                callbacks,
+            )
+            return asdict(result)
+
+        key = self.response_cache.make_key(
+            "scrape",
+            api_key,
+            model,
+            temperature,
+            canonicalize_url(web_url),
+            query,
+            search_instructions,
+        )
+        return await self._get_or_run(
+            key, temperature, budget, run, use_cache, callbacks
+        )
+
+    async def _get_or_run(
+        self,
+        key: str,
+        temperature: float,
+        budget: AgentBudget,
+        run,
+        use_cache: bool,
+        callbacks: list = None,
+    ) -> AgentResult:
+        """
+        Serve a run from the response cache or a shared execution of it.
+
+        Only complete answers are cached. Identical runs are only shared when
+        their budgets match, so no caller waits on a larger budget than its own.
+        A run with callbacks (e.g. a job's progress handler) always gets its
+        own execution, since a shared one only reports to its first caller's.
+        """
+
+        async def execute() -> Dict[str, Any]:
+            if callbacks:
+                return await run()
+            return await self.single_flight.do((key, budget), run)
+
+        result = await self.response_cache.get_or_run(
+            key,
+            temperature,
+            execute,
+            use_cache,
+            cacheable=lambda result: result["budget_exceeded"] is None,
         )
-        print(f"Running scrape agent with query: {query} on website: {web_url}")
-        response = await agent.ainvoke({"messages": [("user", query)]})
-        return response["messages"][-1].content
+        return AgentResult(**result)
+
+    async def stream_websearch_agent(
+        self,
+        query: str,
+        api_key: str,
+        model: str = "gpt-4o",
+        temperature: float = 0.5,
+        search_instructions: str = None,
+        budget: Optional[AgentBudget] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run the agent with a user query, yielding step events as they happen"""
+        agent = self.get_websearch_agent(model, temperature, search_instructions)
+        logger.info("Streaming agent with query: %s", query)
+        async for event in self._stream_agent_events(
+            agent,
+            "websearch",
+            query,
+            self._websearch_configurable(api_key, query),
+            budget or self.make_budget(),
+            model,
+            temperature,
+        ):
+            yield event
+
+    async def stream_scrape_agent(
+        self,
+        web_url: str,
+        query: str,
+        api_key: str,
+        model: str = "gpt-4o",
+        temperature: float = 0.5,
+        search_instructions: str = None,
+        budget: Optional[AgentBudget] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run the scraping agent, yielding step events as they happen"""
+        agent = self.get_scrape_agent(model, temperature, search_instructions)
+        logger.info(
+            "Streaming scrape agent with query: %s on website: %s", query, web_url
+        )
+        async for event in self._stream_agent_events(
+            agent,
+            "scrape",
+            query,
+            self._scrape_configurable(api_key, web_url, query),
+            budget or self.make_budget(),
+            model,
+            temperature,
+        ):
+            yield event
+
+    async def _stream_agent_events(
+        self,
+        agent: Any,
+        name: str,
+        query: str,
+        configurable: Dict[str, Any],
+        budget: AgentBudget,
+        model: str,
+        temperature: float,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Translate LangGraph's event stream into compact client events.
+
+        Yields dicts with an `event` name and its `data`:
+            step: the agent started a new LLM call (reasoning step)
+            token: a chunk of LLM output text
+            tool_start: a tool call, with the tool name and its input (e.g. the URLs being scraped)
+            tool_end: a tool call finished, with the size of its output
+            final: the agent's final answer, flagged `partial` (with the
+                `budget_exceeded`) when a budget cut the run short
+
+        Only the text of the current LLM call is buffered, so memory stays flat
+        regardless of how long the run is.
+        """
+        answer = []
+        step = 0
+        handler = self._budget_handler(budget)
+        exceeded = None
+        deadline, finalize_deadline = self._deadlines(budget)
+        try:
+            async for event in until_deadline(
+                agent.astream_events(
+                    {"messages": [("user", query)]},
+                    config=self._run_config(
+                        name, configurable, budget, [RunMetricsHandler(name), handler]
+                    ),
+                    version="v2",
+                ),
+                deadline,
+            ):
+                kind = event["event"]
+                if kind == "on_chat_model_start":
+                    answer = []
+                    step += 1
+                    yield {"event": "step", "data": {"step": step}}
+                elif kind == "on_chat_model_stream":
+                    content = event["data"]["chunk"].content
+                    # A model="auto" draft may be redone by the large model
+                    if content and CASCADE_DRAFT_TAG not in event.get("tags", ()):
+                        answer.append(content)
+                        yield {"event": "token", "data": {"content": content}}
+                elif kind == "on_chat_model_end":
+                    exceeded = handler.exceeded()
+                    if exceeded is not None:
+                        break
+                elif kind == "on_tool_start":
+                    yield {
+                        "event": "tool_start",
+                        "data": {
+                            "tool": event["name"],
+                            "input": event["data"].get("input"),
+                        },
+                    }
+                elif kind == "on_tool_end":
+                    output = event["data"].get("output")
+                    content = getattr(output, "content", output)
+                    yield {
+                        "event": "tool_end",
+                        "data": {
+                            "tool": event["name"],
+                            "output_chars": len(str(content)),
+                        },
+                    }
+        except TimeoutError:
+            exceeded = "time"
+        finally:
+            self._close_prefetcher(configurable)
+
+        if exceeded is None:
+            response = "".join(answer)
+        else:
+            logger.info("Agent %s run hit its %s budget", name, exceeded)
+            AGENT_BUDGET_EXCEEDED.inc(name, exceeded)
+            response = await self._partial_answer(
+                name,
+                handler,
+                configurable["openai_api_key"],
+                model,
+                temperature,
+                finalize_deadline,
+            )
+        yield {
+            "event": "final",
+            "data": {
+                "response": response,
+                "partial": exceeded is not None,
+                "budget_exceeded": exceeded,
+            },
+        }
+
+    async def find_person_profile(
+        self,
+        company_url: str,
+        role: str,
+        api_key: str,
+        model: str = "gpt-4o",
+        use_cache: bool = True,
+    ) -> Optional[str]:
+        """
+        Look a person's LinkedIn profile up with targeted searches instead of an agent run.
+
+        Searches LinkedIn profiles for the company and role, most specific
+        query first, and answers as soon as one profile clearly matches. When
+        profiles were found but none clearly matches, one small LLM call picks
+        among the best few.
+
+        Returns:
+            The profile URL, or None when no profile fits and the agent should search
+        """
+        company = company_name_from_url(company_url)
+        client_key = hash_api_key(api_key)
+        candidates = []
+        for query in person_search_queries(company, role):
+            try:
+                results = await asearch_google(
+                    query, self.settings.serper_api_key, client_key
+                )
+            except UpstreamError as e:
+                # The agent gets its own chance at the search
+                logger.warning("Person lookup search failed: %s", e)
+                break
+            candidates = merge_candidates(
+                candidates, rank_profiles(results, company, role)
+            )
+            match = confident_match(
+                candidates,
+                self.settings.person_lookup_min_score,
+                self.settings.person_lookup_min_margin,
+            )
+            if match is not None:
+                PERSON_LOOKUPS.inc("search")
+                return match.url
+
+        candidates = candidates[: self.settings.person_lookup_max_candidates]
+        if not candidates:
+            return None
+        listing = "\n".join(
+            f"{i}. {c.url}\n   {c.title}\n   {c.snippet}"
+            for i, c in enumerate(candidates, 1)
+        )
+        choice = await self.llm_service.generate_response(
+            query=PERSON_PICK_PROMPT.format(
+                company=company, role=role, candidates=listing
+            ),
+            api_key=api_key,
+            model=model,
+            temperature=0,
+            response_model=int,
+            use_cache=use_cache,
+            endpoint="person_lookup",
+        )
+        if not 1 <= choice <= len(candidates):
+            return None
+        PERSON_LOOKUPS.inc("llm_pick")
+        return candidates[choice - 1].url
 
     async def run_person_lookup(
         self,
@@ -140,10 +1153,33 @@ class AgentService:
         api_key: str,
         model: str = "gpt-4o",
         temperature: float = 0.5,
-    ) -> str:
-        """Run the agent with a user query"""
+        callbacks: list = None,
+        use_cache: bool = True,
+        budget: Optional[AgentBudget] = None,
+    ) -> AgentResult:
+        """
+        Find the LinkedIn profile of the person with a role at a company.
+
+        Tries the search fast path (`find_person_profile`) first and only runs
+        the websearch agent when it finds no profile that fits.
+        """
+        if self.settings.person_lookup_fast_path:
+            profile_url = await self.find_person_profile(
+                company_url, role, api_key, model, use_cache
+            )
+            if profile_url is not None:
+                return AgentResult(profile_url)
+
+        PERSON_LOOKUPS.inc("agent")
         query = f"Find people who work at {company_url} with the role of {role}."
         search_instructions = f"Search for people who work at a specific company with the a specific role and return only their LinkedIn URLs, no pre-amble.  For example, if you found the closest person is Eduardus Tjitrahardja with LinkedIn URL https://id.linkedin.com/in/edutjie, then just return https://id.linkedin.com/in/edutjie. Return the closest person's LinkedIn URL if you aren't 100% confident"
         return await self.run_websearch_agent(
-            query, api_key, model, temperature, search_instructions
+            query,
+            api_key,
+            model,
+            temperature,
+            search_instructions,
+            callbacks,
+            use_cache,
+            budget,
         )
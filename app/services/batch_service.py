@@ -0,0 +1,94 @@
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+
+async def run_batch(
+    items: Sequence[T],
+    handler: Callable[[T], Awaitable[Any]],
+    max_concurrency: int,
+) -> List[Tuple[Optional[Any], Optional[str]]]:
+    """
+    Run a handler over every item with bounded concurrency.
+
+    Args:
+        items: The inputs to process
+        handler: Coroutine function called once per item
+        max_concurrency: Maximum number of handlers running at the same time
+
+    Returns:
+        One (result, error) pair per item, in input order. Exactly one of the
+        two is set: a failing item carries its error message instead of
+        failing the whole batch.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(item: T) -> Tuple[Optional[Any], Optional[str]]:
+        async with semaphore:
+            try:
+                return await handler(item), None
+            except Exception as e:
+                return None, str(e)
+
+    return await asyncio.gather(*(run_one(item) for item in items))
+
+
+async def iter_batch(
+    items: Iterable[T],
+    handler: Callable[[T], Awaitable[Any]],
+    max_concurrency: int,
+) -> AsyncIterator[Tuple[T, Optional[Any], Optional[str]]]:
+    """
+    Run a handler over a stream of items with bounded concurrency.
+
+    Unlike `run_batch`, items are pulled from the iterable only when a
+    handler slot is free and results are yielded as they complete, so memory
+    stays proportional to `max_concurrency` whatever the number of items.
+    Handlers still running when the consumer stops are cancelled.
+
+    Args:
+        items: The inputs to process, read lazily
+        handler: Coroutine function called once per item
+        max_concurrency: Maximum number of handlers running at the same time
+
+    Yields:
+        (item, result, error) triples in completion order, with exactly one
+        of result and error set
+    """
+
+    async def run_one(item: T) -> Tuple[T, Optional[Any], Optional[str]]:
+        try:
+            return item, await handler(item), None
+        except Exception as e:
+            return item, None, str(e)
+
+    iterator = iter(items)
+    running = set()
+    try:
+        while True:
+            for item in iterator:
+                running.add(asyncio.ensure_future(run_one(item)))
+                if len(running) >= max_concurrency:
+                    break
+            if not running:
+                return
+            done, running = await asyncio.wait(
+                running, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in running:
+            task.cancel()
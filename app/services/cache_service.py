@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+
+def make_cache_key(*parts: str) -> str:
+    """Build a content-addressed cache key from its normalized parts."""
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    return f"{parts[0]}:{digest}"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class Cache(ABC):
+    """
+    Interface for the cache tiers.
+
+    Values must be JSON-serializable and are treated as immutable once stored.
+    """
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    def close(self) -> None:
+        """Release the tier's resources (e.g. database connections)."""
+
+
+class MemoryCache(Cache):
+    """
+    In-process LRU cache with per-entry TTL and a total byte budget.
+
+    Entry size is the length of the value's JSON encoding, which is a cheap and
+    stable approximation of its memory footprint.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: Optional[float] = None,
+    ):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.total_bytes = 0
+        # key -> (value, expires_at, size)
+        self._entries: "OrderedDict[str, tuple[Any, Optional[float], int]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self.total_bytes += size
+            self.stats.sets += 1
+
+            while (
+                len(self._entries) > self.max_entries
+                or self.total_bytes > self.max_bytes
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+
+class SQLiteCache(Cache):
+    """
+    On-disk cache tier backed by a single SQLite table.
+
+    Survives restarts and can be shared by several worker processes on the same
+    host. Expired rows are dropped lazily on read and by `purge_expired`.
+    """
+
+    def __init__(self, path: str, default_ttl: Optional[float] = None):
+        super().__init__()
+        self.path = path
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL
+                )
+                """)
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_with_expiry(key)[0]
+
+    def get_with_expiry(self, key: str) -> tuple[Optional[Any], Optional[float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None, None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None, None
+
+            self.stats.hits += 1
+            return json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=str), expires_at),
+            )
+            self._conn.commit()
+            self.stats.sets += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            self._conn.commit()
+            self.stats.expirations += cursor.rowcount
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache(Cache):
+    """
+    Memory tier in front of an optional on-disk tier.
+
+    Disk hits are promoted into the memory tier with their remaining TTL, so hot
+    keys are served from memory after the first lookup.
+    """
+
+    def __init__(self, memory: MemoryCache, disk: Optional[SQLiteCache] = None):
+        super().__init__()
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.hits += 1
+            return value
+
+        if self.disk is not None:
+            value, expires_at = self.disk.get_with_expiry(key)
+            if value is not None:
+                ttl = expires_at - time.time() if expires_at is not None else None
+                self.memory.set(key, value, ttl=ttl)
+                self.stats.hits += 1
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl=ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl=ttl)
+        self.stats.sets += 1
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """`get` for coroutines: a lookup that may read the disk runs in a thread."""
+        if self.disk is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """`set` for coroutines: a write that goes to the disk runs in a thread."""
+        if self.disk is None:
+            self.set(key, value, ttl=ttl)
+        else:
+            await asyncio.to_thread(self.set, key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats_by_tier(self) -> dict:
+        stats = {"total": self.stats.as_dict(), "memory": self.memory.stats.as_dict()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats.as_dict()
+        return stats
@@ -0,0 +1,237 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+from langchain_core.messages import BaseMessage, ToolMessage
+from langchain_core.outputs import LLMResult
+
+from app.services.job_service import Job, JobStore
+from app.services.metrics_service import (
+    AGENT_CACHED_PROMPT_TOKENS,
+    AGENT_RUN_DURATION,
+    AGENT_STEP_PROMPT_TOKENS,
+    AGENT_STEPS,
+    LLM_REQUEST_DURATION,
+    LLM_TIME_TO_FIRST_TOKEN,
+    TOOL_CALL_DURATION,
+    prompt_token_usage,
+    record_token_usage,
+)
+from app.services.tracing_service import get_tracer
+
+# Tags the small model's drafts of model="auto" steps, whose text is not
+# streamed and which the large model redoes when they are escalated
+CASCADE_DRAFT_TAG = "cascade_draft"
+
+
+def starts_agent_step(after_draft: bool, tags: Optional[List[str]]) -> bool:
+    """
+    Whether a chat model call starts a new agent step, rather than being the
+    large model's retry of an escalated draft (`after_draft` tells whether
+    the previous call was a draft with no tool run since).
+    """
+    return not after_draft or CASCADE_DRAFT_TAG in (tags or ())
+
+
+class JobProgressHandler(AsyncCallbackHandler):
+    """Callback handler that records the latest agent step on a job."""
+
+    def __init__(self, job: Job, store: JobStore):
+        self.job = job
+        self.store = store
+
+    async def on_tool_start(
+        self, serialized: Dict[str, Any], input_str: str, **kwargs: Any
+    ) -> None:
+        self.job.progress = f"Calling {serialized.get('name', 'tool')}: {input_str}"
+        self.store.save(self.job)
+
+    async def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        self.job.progress = "Analyzing tool results"
+        self.store.save(self.job)
+
+
+class RunMetricsHandler(BaseCallbackHandler):
+    """
+    Callback handler recording per-run agent metrics and tracing spans.
+
+    One instance is attached to each agent run. It records the run's latency
+    and step count, every LLM call's latency, time to first token (streamed
+    runs), token usage and prompt tokens (with those served from the
+    upstream prompt cache), and every tool call's latency. With tracing
+    enabled, the run, its LLM calls and its tool calls become nested spans.
+    """
+
+    # Runs in the callback's thread/task instead of an executor hop
+    run_inline = True
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.tracer = get_tracer()
+        self.root_run_id: Optional[UUID] = None
+        self.steps = 0
+        self._after_draft = False
+        # run_id -> (start time, label, span)
+        self._started: Dict[UUID, Tuple[float, str, Any]] = {}
+        self._first_token: set = set()
+
+    def _start(self, run_id: UUID, label: str, span_name: str) -> None:
+        span = None
+        if self.tracer is not None:
+            from opentelemetry import trace
+
+            root = self._started.get(self.root_run_id)
+            context = trace.set_span_in_context(root[2]) if root and root[2] else None
+            span = self.tracer.start_span(span_name, context=context)
+        self._started[run_id] = (time.perf_counter(), label, span)
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None):
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return None, None
+        start, label, span = started
+        if span is not None:
+            if error is not None:
+                span.record_exception(error)
+            span.end()
+        return time.perf_counter() - start, label
+
+    def on_chain_start(
+        self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs
+    ):
+        if parent_run_id is None and self.root_run_id is None:
+            self.root_run_id = run_id
+            self._start(run_id, self.agent, f"agent {self.agent}")
+
+    def _end_root(self, run_id: UUID, status: str, error=None) -> None:
+        if run_id != self.root_run_id:
+            return
+        elapsed, _ = self._end(run_id, error)
+        if elapsed is not None:
+            AGENT_RUN_DURATION.observe(elapsed, self.agent, status)
+            AGENT_STEPS.observe(self.steps, self.agent)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end_root(run_id, "ok")
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end_root(run_id, "error", error)
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, tags=None, metadata=None, **kwargs
+    ):
+        if starts_agent_step(self._after_draft, tags):
+            self.steps += 1
+        self._after_draft = CASCADE_DRAFT_TAG in (tags or ())
+        model = (metadata or {}).get("ls_model_name") or "unknown"
+        self._start(run_id, model, f"llm {model}")
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        if run_id in self._first_token or run_id not in self._started:
+            return
+        self._first_token.add(run_id)
+        start, model, _ = self._started[run_id]
+        LLM_TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - start, model)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs):
+        self._first_token.discard(run_id)
+        elapsed, model = self._end(run_id)
+        if elapsed is None:
+            return
+        LLM_REQUEST_DURATION.observe(elapsed, model)
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                record_token_usage(model, usage)
+                prompt, cached = prompt_token_usage(usage)
+                if prompt:
+                    AGENT_STEP_PROMPT_TOKENS.observe(prompt, self.agent)
+                    AGENT_CACHED_PROMPT_TOKENS.inc(self.agent, amount=cached)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._first_token.discard(run_id)
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._after_draft = False
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._start(run_id, name, f"tool {name}")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        elapsed, name = self._end(run_id)
+        if elapsed is not None:
+            TOOL_CALL_DURATION.observe(elapsed, name, "ok")
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        elapsed, name = self._end(run_id, error)
+        if elapsed is not None:
+            TOOL_CALL_DURATION.observe(elapsed, name, "error")
+
+
+class BudgetHandler(BaseCallbackHandler):
+    """
+    Callback handler tracking an agent run's use of its step, tool call and
+    token budgets, and the conversation so far.
+
+    The run's driver checks `exceeded()` between graph steps and stops the
+    run once the model asks for more work than the budgets leave room for.
+    """
+
+    run_inline = True
+
+    def __init__(self, max_steps: int, max_tool_calls: int, max_tokens: int):
+        self.max_steps = max_steps
+        self.max_tool_calls = max_tool_calls
+        self.max_tokens = max_tokens
+        self.steps = 0
+        self.tool_calls = 0
+        self.tokens = 0
+        # Tool calls requested by the latest LLM reply that have not started yet
+        self.pending_tool_calls = 0
+        self._after_draft = False
+        # The latest LLM call's input, its reply and the tool results that followed
+        self.messages: List[BaseMessage] = []
+
+    def exceeded(self) -> Optional[str]:
+        """Return the budget the run has exhausted, if any."""
+        # A reply without tool calls is the final answer: the run is done anyway
+        if not self.pending_tool_calls:
+            return None
+        if self.steps >= self.max_steps:
+            return "steps"
+        if self.tool_calls + self.pending_tool_calls > self.max_tool_calls:
+            return "tool_calls"
+        if self.tokens >= self.max_tokens:
+            return "tokens"
+        return None
+
+    def on_chat_model_start(self, serialized, messages, *, tags=None, **kwargs):
+        if starts_agent_step(self._after_draft, tags):
+            self.steps += 1
+        self._after_draft = CASCADE_DRAFT_TAG in (tags or ())
+        self.pending_tool_calls = 0
+        self.messages = list(messages[0]) if messages else []
+
+    def on_llm_end(self, response: LLMResult, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is None:
+                    continue
+                usage = getattr(message, "usage_metadata", None) or {}
+                self.tokens += usage.get("total_tokens", 0)
+                self.pending_tool_calls = len(
+                    getattr(message, "tool_calls", None) or []
+                )
+                self.messages.append(message)
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self._after_draft = False
+        self.tool_calls += 1
+        self.pending_tool_calls = max(0, self.pending_tool_calls - 1)
+
+    def on_tool_end(self, output, **kwargs):
+        if isinstance(output, ToolMessage):
+            self.messages.append(output)
@@ -0,0 +1,303 @@
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from app.config.settings import get_settings
+from app.tools.content_tools import chunk_markdown, strip_boilerplate
+from app.tools.url_tools import canonicalize_url
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+# Passage rowids are `document id << _ROWID_BITS | passage index`, so the
+# passages of one document are a rowid range
+_ROWID_BITS = 16
+_MAX_PASSAGES = (1 << _ROWID_BITS) - 1
+_MAX_QUERY_TERMS = 32
+# Words that match most passages: they barely change the ranking but make
+# every search score the whole index
+_STOPWORDS = frozenset(
+    "a about an and are as at be by can do does for from has have how i in is it "
+    "its me my of on or our that the their there this to was what when where "
+    "which who why will with you your".split()
+)
+# Eviction frees space down to this share of the size limit, so it does not run on every write
+_EVICT_TO = 0.9
+
+
+@dataclass
+class Passage:
+    url: str
+    content: str
+    kind: str  # "page" or "snippet"
+    fetched_at: float
+    score: float  # BM25, higher is more relevant
+
+
+def _site(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _match_expression(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching any of its terms."""
+    terms = []
+    for term in _TERM_RE.findall(query.lower()):
+        if term not in terms and term not in _STOPWORDS:
+            terms.append(term)
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in terms[:_MAX_QUERY_TERMS])
+
+
+class LocalCorpus:
+    """
+    Persistent full-text index of scraped pages and search result snippets.
+
+    Pages are stored as passages (boilerplate-free markdown chunks) in an
+    SQLite FTS5 table, so a search returns the best passages of every page
+    fetched before, ranked by BM25, in milliseconds. Each document records
+    its URL, site, fetch time and the time it goes stale; stale documents are
+    never returned and are the first to go when the corpus outgrows
+    `max_bytes`, followed by the least recently fetched ones. Evictions end
+    with a compaction of the full-text index and the database file.
+
+    The file can be shared by several worker processes on the same host.
+    """
+
+    def __init__(self, path: str, max_bytes: int, chunk_tokens: int = 200):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.chunk_tokens = chunk_tokens
+        self.hits = 0
+        self.misses = 0
+        self.pages_indexed = 0
+        self.snippets_indexed = 0
+        self.evictions = 0
+        self.compactions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            # Only takes effect on a new database, before its tables exist
+            self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL UNIQUE,
+                    site TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS documents_fetched_at"
+                " ON documents (fetched_at)"
+            )
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS passages"
+                " USING fts5(content, tokenize='porter unicode61')"
+            )
+            self._conn.commit()
+            self.total_bytes = self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM documents"
+        ).fetchone()[0]
+
+    def add_page(self, url: str, markdown: str, ttl: float) -> None:
+        """
+        Index a scraped page, replacing what was stored for its URL.
+
+        Args:
+            url: The URL the page was scraped from
+            markdown: The page content as markdown
+            ttl: Seconds the page counts as fresh
+        """
+        passages = chunk_markdown(strip_boilerplate(markdown), self.chunk_tokens)
+        if passages:
+            self._store(url, "page", passages, ttl)
+            self.pages_indexed += 1
+
+    def add_search_results(self, results: Dict[str, Any], ttl: float) -> None:
+        """
+        Index the organic results of a Serper search as snippet documents.
+
+        A snippet never replaces a fresh page stored for the same URL.
+
+        Args:
+            results: The Serper search response
+            ttl: Seconds the snippets count as fresh
+        """
+        for result in results.get("organic") or []:
+            url = result.get("link")
+            text = "\n".join(
+                part for part in (result.get("title"), result.get("snippet")) if part
+            )
+            if not url or not text:
+                continue
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT kind, expires_at FROM documents WHERE url = ?",
+                    (canonicalize_url(url),),
+                ).fetchone()
+            if row is not None and row[0] == "page" and row[1] > time.time():
+                continue
+            self._store(url, "snippet", [text], ttl)
+            self.snippets_indexed += 1
+
+    def _store(self, url: str, kind: str, passages: List[str], ttl: float) -> None:
+        url = canonicalize_url(url)
+        passages = passages[:_MAX_PASSAGES]
+        size = sum(len(p.encode("utf-8")) for p in passages)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, size FROM documents WHERE url = ?", (url,)
+            ).fetchone()
+            if row is not None:
+                self._delete_passages(row[0])
+                self._conn.execute(
+                    "UPDATE documents SET kind = ?, fetched_at = ?, expires_at = ?,"
+                    " size = ? WHERE id = ?",
+                    (kind, now, now + ttl, size, row[0]),
+                )
+                doc_id = row[0]
+                self.total_bytes += size - row[1]
+            else:
+                doc_id = self._conn.execute(
+                    "INSERT INTO documents (url, site, kind, fetched_at, expires_at, size)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, _site(url), kind, now, now + ttl, size),
+                ).lastrowid
+                self.total_bytes += size
+            self._conn.executemany(
+                "INSERT INTO passages (rowid, content) VALUES (?, ?)",
+                [
+                    ((doc_id << _ROWID_BITS) | i, passage)
+                    for i, passage in enumerate(passages)
+                ],
+            )
+            self._conn.commit()
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _delete_passages(self, doc_id: int) -> None:
+        self._conn.execute(
+            "DELETE FROM passages WHERE rowid BETWEEN ? AND ?",
+            (doc_id << _ROWID_BITS, (doc_id << _ROWID_BITS) | _MAX_PASSAGES),
+        )
+
+    def _evict(self) -> None:
+        """Drop stale, then least recently fetched, documents and compact the index."""
+        # Other workers write to the same file, so resync with what is stored
+        self.total_bytes = self._stored_bytes()
+        target = int(self.max_bytes * _EVICT_TO)
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT id, size FROM documents" " ORDER BY expires_at > ?, fetched_at",
+            (time.time(),),
+        )
+        evicted = []
+        for doc_id, size in rows:
+            if self.total_bytes <= target:
+                break
+            evicted.append(doc_id)
+            self.total_bytes -= size
+        # An unfinished statement would keep the log from being checkpointed
+        rows.close()
+        for doc_id in evicted:
+            self._delete_passages(doc_id)
+        self._conn.executemany(
+            "DELETE FROM documents WHERE id = ?", [(doc_id,) for doc_id in evicted]
+        )
+        self._conn.commit()
+        self.evictions += len(evicted)
+
+        # Merge the index's segments, return the freed pages to the file
+        # system and shrink the write-ahead log
+        self._conn.execute("INSERT INTO passages (passages) VALUES ('optimize')")
+        self._conn.commit()
+        self._conn.execute("PRAGMA incremental_vacuum")
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.compactions += 1
+
+    def search(
+        self, query: str, limit: int = 5, site: Optional[str] = None
+    ) -> List[Passage]:
+        """
+        Return the passages most relevant to a query among fresh documents.
+
+        Args:
+            query: Free-text search query
+            limit: Maximum number of passages
+            site: Only search pages of this host and its subdomains (optional)
+
+        Returns:
+            Passages ranked best first; empty on a miss
+        """
+        expression = _match_expression(query)
+        if expression is None:
+            return []
+
+        sql = (
+            "SELECT d.url, p.content, d.kind, d.fetched_at, -bm25(passages) AS score"
+            " FROM passages p JOIN documents d ON d.id = p.rowid >> ?"
+            " WHERE passages MATCH ? AND d.expires_at > ?"
+        )
+        params: list = [_ROWID_BITS, expression, time.time()]
+        if site:
+            site = site.lower().removeprefix("www.")
+            sql += " AND (d.site = ? OR d.site LIKE ?)"
+            params += [site, f"%.{site}"]
+        sql += " ORDER BY score DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        if rows:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return [Passage(*row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (documents,) = self._conn.execute(
+                "SELECT COUNT(*) FROM documents"
+            ).fetchone()
+        return {
+            "documents": documents,
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "pages_indexed": self.pages_indexed,
+            "snippets_indexed": self.snippets_indexed,
+            "evictions": self.evictions,
+            "compactions": self.compactions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache()
+def get_local_corpus() -> Optional[LocalCorpus]:
+    """Return the shared local corpus, or None when it is disabled."""
+    settings = get_settings()
+    if not settings.corpus_sqlite_path:
+        return None
+    return LocalCorpus(
+        settings.corpus_sqlite_path,
+        settings.corpus_max_bytes,
+        settings.scrape_chunk_tokens,
+    )
@@ -0,0 +1,268 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.models.batch_models import BatchCompanyResult, BatchTextResult
+from app.models.company_models import CompanyScrapeRequest
+from app.models.person_lookup_models import PersonLookupRequest
+from app.models.websearch_models import WebSearchRequest
+from app.services.batch_service import iter_batch
+from app.services.linkedin_scraper_service import (
+    LinkedInScraperService,
+    build_company_profile,
+)
+from app.services.rate_limit_service import RateLimitExceeded
+
+if TYPE_CHECKING:
+    from app.services.agent_service import AgentService
+
+logger = logging.getLogger(__name__)
+
+# The request model each input row is validated against, per task
+ENRICHMENT_TASKS = {
+    "company": CompanyScrapeRequest,
+    "person-lookup": PersonLookupRequest,
+    "websearch": WebSearchRequest,
+}
+# Times a row shed by a rate limiter is retried after the delay it was given
+_MAX_RATE_LIMIT_RETRIES = 5
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read input rows one at a time from a CSV file (with a header row) or a
+    JSONL file (one object per line).
+
+    Empty CSV cells are dropped so the request model's defaults apply.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield {k: v for k, v in row.items() if k and v not in (None, "")}
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+@dataclass
+class EnrichmentCheckpoint:
+    """
+    Progress of a bulk enrichment run, saved so a crashed run can resume.
+
+    Every row before `next_row` has been started, and every started row not
+    in `pending` has its result within the first `output_bytes` of the
+    output file. Resuming truncates the output to that length and redoes
+    only the pending rows and those after `next_row`, so each row ends up in
+    the output exactly once. The pending rows are the ones in flight, so the
+    checkpoint stays small whatever the size of the input.
+    """
+
+    input_path: str
+    task: str
+    next_row: int = 0
+    pending: List[int] = field(default_factory=list)
+    output_bytes: int = 0
+    succeeded: int = 0
+    failed: int = 0
+
+    @classmethod
+    def load(cls, path: str) -> Optional["EnrichmentCheckpoint"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def save(self, path: str) -> None:
+        # Written aside then renamed, so a crash never leaves a torn checkpoint
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp_path, path)
+
+
+class BulkEnricher:
+    """
+    Runs one enrichment task over every row of an input file in-process,
+    without going through the HTTP API.
+
+    Rows are read lazily and processed by a bounded pool of workers, and
+    each result is appended to an NDJSON output file as soon as it is done,
+    so memory stays constant whatever the input size. The upstream calls go
+    through the same rate limiters as the server's; a row shed by a limiter
+    is retried after the delay it was given instead of failing.
+    """
+
+    def __init__(
+        self,
+        task: str,
+        api_key: str,
+        max_concurrency: int,
+        linkedin_scraper_service: Optional[LinkedInScraperService] = None,
+        agent_service: Optional["AgentService"] = None,
+        use_cache: bool = True,
+    ):
+        if task not in ENRICHMENT_TASKS:
+            raise ValueError(f"Unknown enrichment task: {task}")
+        self.task = task
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.linkedin_scraper_service = linkedin_scraper_service
+        self.agent_service = agent_service
+        self.use_cache = use_cache
+
+    async def _call(self, request: BaseModel) -> BaseModel:
+        if self.task == "company":
+            company_data = await self.linkedin_scraper_service.scrape_company(
+                linkedin_url=request.linkedin_url
+            )
+            return BatchCompanyResult(response=build_company_profile(company_data))
+
+        budget = self.agent_service.make_budget(
+            max_steps=request.max_steps,
+            max_tool_calls=request.max_tool_calls,
+            max_tokens=request.max_tokens,
+            timeout=request.timeout,
+        )
+        if self.task == "person-lookup":
+            result = await self.agent_service.run_person_lookup(
+                company_url=request.company_url,
+                role=request.role,
+                api_key=self.api_key,
+                model=request.model,
+                temperature=request.temperature,
+                budget=budget,
+                use_cache=self.use_cache,
+            )
+        else:
+            result = await self.agent_service.run_websearch_agent(
+                query=request.query,
+                api_key=self.api_key,
+                search_instructions=request.search_instructions,
+                model=request.model,
+                temperature=request.temperature,
+                budget=budget,
+                use_cache=self.use_cache,
+            )
+        return BatchTextResult(
+            response=result.response,
+            partial=result.partial,
+            budget_exceeded=result.budget_exceeded,
+        )
+
+    async def _handle(self, item: Tuple[int, Dict[str, Any]]) -> BaseModel:
+        _, row = item
+        request = ENRICHMENT_TASKS[self.task](**row)
+        for attempt in range(_MAX_RATE_LIMIT_RETRIES + 1):
+            try:
+                return await self._call(request)
+            except RateLimitExceeded as e:
+                if attempt == _MAX_RATE_LIMIT_RETRIES:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    async def run(
+        self,
+        input_path: str,
+        output_path: str,
+        checkpoint_path: str,
+        checkpoint_every: int = 50,
+    ) -> EnrichmentCheckpoint:
+        """
+        Enrich every row of the input file, resuming from the checkpoint when
+        one exists. A checkpoint whose output file is gone is discarded and
+        the run starts over.
+
+        Args:
+            input_path: CSV or JSONL file of rows shaped like the task's request
+            output_path: NDJSON file receiving one line per row, in completion
+                order: the row number, the input row and the task's result
+                (`response`, or `error` for a failed row)
+            checkpoint_path: File holding the run's progress
+            checkpoint_every: Rows completed between checkpoints
+
+        Returns:
+            The final checkpoint
+        """
+        checkpoint = EnrichmentCheckpoint.load(checkpoint_path)
+        if checkpoint is not None and not os.path.exists(output_path):
+            logger.warning(
+                "%s is missing: discarding %s and starting over",
+                output_path,
+                checkpoint_path,
+            )
+            checkpoint = None
+        if checkpoint is None:
+            checkpoint = EnrichmentCheckpoint(os.path.abspath(input_path), self.task)
+            output = open(output_path, "wb")
+        else:
+            if (checkpoint.input_path, checkpoint.task) != (
+                os.path.abspath(input_path),
+                self.task,
+            ):
+                raise ValueError(
+                    f"{checkpoint_path} belongs to a {checkpoint.task} run over "
+                    f"{checkpoint.input_path}"
+                )
+            logger.info(
+                "Resuming from row %d (%d rows pending)",
+                checkpoint.next_row,
+                len(checkpoint.pending),
+            )
+            output = open(output_path, "r+b")
+            output.truncate(checkpoint.output_bytes)
+            output.seek(checkpoint.output_bytes)
+
+        redo = set(checkpoint.pending)
+        pending = set(checkpoint.pending)
+
+        def rows_to_run() -> Iterator[Tuple[int, Dict[str, Any]]]:
+            for i, row in enumerate(read_rows(input_path)):
+                if i < checkpoint.next_row and i not in redo:
+                    continue
+                checkpoint.next_row = max(checkpoint.next_row, i + 1)
+                pending.add(i)
+                yield i, row
+
+        def save_checkpoint() -> None:
+            output.flush()
+            os.fsync(output.fileno())
+            checkpoint.output_bytes = output.tell()
+            checkpoint.pending = sorted(pending)
+            checkpoint.save(checkpoint_path)
+
+        start = time.perf_counter()
+        done = 0
+        try:
+            async for (i, row), result, error in iter_batch(
+                rows_to_run(), self._handle, self.max_concurrency
+            ):
+                if result is None:
+                    result = BatchTextResult(error=error)
+                    checkpoint.failed += 1
+                else:
+                    checkpoint.succeeded += 1
+                line = {"row": i, "input": row, **result.model_dump(mode="json")}
+                output.write((json.dumps(line, default=str) + "\n").encode("utf-8"))
+                pending.discard(i)
+                done += 1
+                if done % checkpoint_every == 0:
+                    save_checkpoint()
+                    logger.info(
+                        "%d rows done (%d failed), %.1f rows/s",
+                        checkpoint.succeeded + checkpoint.failed,
+                        checkpoint.failed,
+                        done / (time.perf_counter() - start),
+                    )
+        finally:
+            # Also on a crash or Ctrl-C: the rows still in flight stay pending
+            save_checkpoint()
+            output.close()
+        return checkpoint
@@ -0,0 +1,43 @@
+from typing import Optional
+
+import httpx
+
+from app.config.settings import get_settings
+from app.services.metrics_service import record_upstream_response
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide async HTTP client, creating it on first use.
+
+    The client keeps a pool of keep-alive (HTTP/2 where the upstream supports it)
+    connections so concurrent Serper calls reuse sockets and TLS sessions instead
+    of opening a new connection per request.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        settings = get_settings()
+        _http_client = httpx.AsyncClient(
+            http2=settings.http2_enabled,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                settings.http_timeout,
+                connect=settings.http_connect_timeout,
+            ),
+            event_hooks={"response": [record_upstream_response]},
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the process-wide HTTP client and release its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
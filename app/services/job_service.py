@@ -0,0 +1,359 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.models.job_models import JobStatus
+
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+# Seconds between checks for jobs cancelled through another worker
+CANCEL_POLL_INTERVAL = 1.0
+
+
+class JobServiceClosed(Exception):
+    """Raised when a job is submitted while the service is shutting down."""
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@dataclass
+class Job:
+    kind: str
+    owner: str  # Hash of the submitting API key
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    progress: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    response: Optional[str] = None
+    error: Optional[str] = None
+    budget_exceeded: Optional[str] = None  # Budget that cut the agent run short
+    worker_pid: int = field(default_factory=os.getpid)  # Process executing the job
+
+
+class JobStore(ABC):
+    """Interface for job persistence."""
+
+    # Whether other worker processes read and write the same jobs
+    shared = False
+
+    @abstractmethod
+    def save(self, job: Job) -> None: ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]: ...
+
+    @abstractmethod
+    def purge_finished(self, before: float) -> int:
+        """Delete finished jobs whose `finished_at` is older than `before`."""
+
+    @abstractmethod
+    def fail_unfinished(self, error: str) -> int:
+        """
+        Mark jobs left queued or running by a process that is gone (e.g.
+        before a restart) as failed.
+        """
+
+
+class InMemoryJobStore(JobStore):
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+
+    def save(self, job: Job) -> None:
+        self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def purge_finished(self, before: float) -> int:
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < before
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+    def fail_unfinished(self, error: str) -> int:
+        return 0
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store that persists job records in SQLite.
+
+    Only job metadata and results are stored; the request payload and API key
+    stay in memory with the queued work. Several worker processes can share
+    the database, so any worker can report on or cancel any job.
+    """
+
+    shared = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    finished_at REAL,
+                    data TEXT NOT NULL
+                )
+                """)
+            self._conn.commit()
+
+    def save(self, job: Job) -> None:
+        # A cancellation made through another worker is final: the worker
+        # running the job must not overwrite it with progress or a result
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO jobs (id, status, finished_at, data) VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    status = excluded.status,
+                    finished_at = excluded.finished_at,
+                    data = excluded.data
+                WHERE jobs.status != 'cancelled'
+                """,
+                (job.id, job.status.value, job.finished_at, json.dumps(asdict(job))),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        data["status"] = JobStatus(data["status"])
+        return Job(**data)
+
+    def purge_finished(self, before: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (before,),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def fail_unfinished(self, error: str) -> int:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status IN (?, ?)",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            ).fetchall()
+        failed = 0
+        for (data,) in rows:
+            data = json.loads(data)
+            pid = data.get("worker_pid")
+            # Jobs of live sibling workers are still being executed
+            if pid != os.getpid() and _process_alive(pid):
+                continue
+            data["status"] = JobStatus.FAILED
+            data["error"] = error
+            data["finished_at"] = time.time()
+            self.save(Job(**data))
+            failed += 1
+        return failed
+
+
+JobRunner = Callable[[Job], Awaitable[str]]
+
+
+class JobService:
+    """
+    Background job queue for long agent runs.
+
+    Submitted jobs wait in a bounded queue and are executed by a fixed pool of
+    worker tasks, so the number of concurrent agent runs is capped regardless
+    of how many clients are polling. On shutdown, `drain` lets running jobs
+    finish before `stop` cancels whatever is left.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        max_concurrency: int = 4,
+        max_queue_size: int = 10000,
+        result_ttl: float = 3600,
+    ):
+        self.store = store
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.result_ttl = result_ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._background: list = []
+        self._draining = False
+        self._stopping = False
+
+    async def start(self) -> None:
+        """Start the worker pool and the expiry loop."""
+        self._draining = False
+        self._stopping = False
+        self.store.fail_unfinished("Interrupted by a server restart")
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)
+        ]
+        self._background = [asyncio.create_task(self._expire_loop())]
+        if self.store.shared:
+            self._background.append(asyncio.create_task(self._watch_cancellations()))
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Stop accepting jobs and wait up to `timeout` seconds for the running
+        ones to finish. Jobs still queued are failed instead of started.
+        """
+        self._draining = True
+        running = list(self._running.values())
+        if running:
+            await asyncio.wait(running, timeout=timeout)
+
+    async def stop(self) -> None:
+        """Cancel running jobs and stop the workers."""
+        self._draining = True
+        self._stopping = True
+        for task in list(self._running.values()):
+            task.cancel()
+        for task in self._workers + self._background:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._background = []
+
+        while self._queue is not None and not self._queue.empty():
+            job, _ = self._queue.get_nowait()
+            self._finish(job, JobStatus.FAILED, error="Server shut down")
+
+    def submit(self, kind: str, owner: str, runner: JobRunner) -> Job:
+        """
+        Queue a job for background execution.
+
+        Args:
+            kind: The kind of agent run, reported back to the client
+            owner: Hash of the submitting API key; only it can read the job
+            runner: Coroutine function that executes the job and returns its response
+
+        Returns:
+            The queued job
+
+        Raises:
+            asyncio.QueueFull: If the queue is at capacity
+            JobServiceClosed: If the service is shutting down
+        """
+        if self._draining:
+            raise JobServiceClosed("Server is shutting down")
+        job = Job(kind=kind, owner=owner)
+        self._queue.put_nowait((job, runner))
+        self.store.save(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job. Finished jobs are left unchanged."""
+        job = self.store.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        else:
+            self._finish(job, JobStatus.CANCELLED)
+        return job
+
+    def _finish(
+        self,
+        job: Job,
+        status: JobStatus,
+        response: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        job.status = status
+        job.response = response
+        job.error = error
+        job.progress = None
+        job.finished_at = time.time()
+        self.store.save(job)
+
+    async def _worker(self) -> None:
+        while True:
+            job, runner = await self._queue.get()
+            try:
+                # Skip jobs cancelled while they were waiting in the queue
+                current = self.store.get(job.id)
+                if current is None or current.status != JobStatus.QUEUED:
+                    continue
+                if self._draining:
+                    self._finish(job, JobStatus.FAILED, error="Server shut down")
+                    continue
+
+                job.status = JobStatus.RUNNING
+                job.started_at = time.time()
+                self.store.save(job)
+
+                task = asyncio.create_task(runner(job))
+                self._running[job.id] = task
+                try:
+                    response = await task
+                    self._finish(job, JobStatus.SUCCEEDED, response=response)
+                except asyncio.CancelledError:
+                    self._finish(job, JobStatus.CANCELLED)
+                    if self._stopping:
+                        raise
+                except Exception as e:
+                    self._finish(job, JobStatus.FAILED, error=str(e))
+                finally:
+                    self._running.pop(job.id, None)
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": len(self._running),
+            "workers": len(self._workers),
+        }
+
+    async def _watch_cancellations(self) -> None:
+        # A job cancelled through another worker is only marked in the store;
+        # stop the run here once that is seen
+        while True:
+            await asyncio.sleep(CANCEL_POLL_INTERVAL)
+            for job_id, task in list(self._running.items()):
+                job = self.store.get(job_id)
+                if job is not None and job.status == JobStatus.CANCELLED:
+                    task.cancel()
+
+    async def _expire_loop(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.result_ttl, 60))
+            self.store.purge_finished(time.time() - self.result_ttl)
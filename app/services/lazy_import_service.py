@@ -0,0 +1,15 @@
+import importlib
+import threading
+from types import ModuleType
+
+# The startup warmup imports the heavy SDKs in a worker thread while requests
+# may already need them. A package imported by two threads at the same time
+# can be seen half initialized by one of them, so every lazy import of these
+# packages goes through this lock.
+_import_lock = threading.RLock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import a module on first use, one lazy import at a time."""
+    with _import_lock:
+        return importlib.import_module(name)
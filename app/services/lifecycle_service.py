@@ -0,0 +1,57 @@
+from app.services.corpus_service import get_local_corpus
+from app.services.http_service import close_http_client, get_http_client
+from app.services.openai_client_service import get_openai_client_registry
+from app.services.rate_limit_service import (
+    UPSTREAMS,
+    get_bucket_store,
+    get_rate_limiter,
+)
+from app.services.response_cache_service import get_response_cache
+from app.tools.search_tools import get_serper_cache
+
+# Accessors of the process-wide resources, reset on shutdown so the next
+# startup (e.g. another app instance in the same process) gets fresh ones
+# bound to its own event loop
+_ACCESSORS = (
+    get_openai_client_registry,
+    get_serper_cache,
+    get_response_cache,
+    get_rate_limiter,
+    get_bucket_store,
+    get_local_corpus,
+)
+
+
+def open_shared_resources() -> None:
+    """
+    Create the process-wide resources shared by every request: the upstream
+    connection pools, the caches, the local corpus and the rate limiters.
+
+    Called from the app's lifespan, so they exist in every worker process
+    before its first request instead of being built by it. The OpenAI client
+    registry is left to the first LLM call or the startup warmup, since
+    creating it imports the OpenAI SDK.
+    """
+    get_http_client()
+    get_serper_cache()
+    get_response_cache()
+    get_local_corpus()
+    for upstream in UPSTREAMS:
+        get_rate_limiter(upstream)
+
+
+async def close_shared_resources() -> None:
+    """Close the pooled connections and cache and corpus databases, then drop the resources."""
+    await close_http_client()
+    if get_openai_client_registry.cache_info().currsize:
+        await get_openai_client_registry().aclose()
+
+    for cache in (get_serper_cache(), get_response_cache().cache, get_local_corpus()):
+        if cache is not None:
+            cache.close()
+    bucket_store = get_bucket_store()
+    if bucket_store is not None:
+        bucket_store.close()
+
+    for accessor in _ACCESSORS:
+        accessor.cache_clear()
@@ -1,19 +1,85 @@
 import json
-import requests
 from app.config.settings import get_settings
+from app.models.company_models import CompanyProfile
+from app.services.cache_service import (
+    MemoryCache,
+    SQLiteCache,
+    TieredCache,
+    make_cache_key,
+)
+from app.services.http_service import get_http_client
 from app.services.llm_service import LLMService
+from app.services.rate_limit_service import (
+    get_rate_limiter,
+    raise_for_upstream_status,
+)
+from app.services.singleflight_service import SingleFlight
+from app.tools.url_tools import canonicalize_linkedin_company_url
+
+
+def build_company_profile(company_data: dict) -> CompanyProfile:
+    """
+    Build the company profile returned to clients from raw Proxycurl data.
+    """
+    return CompanyProfile(
+        name=company_data["name"],
+        linkedin_internal_id=company_data["linkedin_internal_id"],
+        website=company_data["website"],
+        industry=company_data["industry"],
+        company_size=" - ".join([str(cs) for cs in company_data["company_size"]]),
+        company_size_on_linkedin=company_data["company_size_on_linkedin"],
+        hq_location=company_data["hq"]["city"]
+        + ", "
+        + company_data["hq"]["state"]
+        + ", "
+        + company_data["hq"]["country"],
+        company_type=company_data["company_type"],
+        founded_year=company_data["founded_year"],
+        tagline=company_data["tagline"],
+    )
 
 
 class LinkedInScraperService:
     def __init__(self):
-        self.proxycurl_api_endpoint = "https://nubela.co/proxycurl/api/linkedin/company"
         self.settings = get_settings()
+        self.proxycurl_api_endpoint = self.settings.proxycurl_api_url
         self.llm_service = LLMService()
+        self.cache = TieredCache(
+            MemoryCache(max_entries=self.settings.proxycurl_cache_max_entries),
+            (
+                SQLiteCache(self.settings.proxycurl_cache_sqlite_path)
+                if self.settings.proxycurl_cache_sqlite_path
+                else None
+            ),
+        )
+        # Collapses concurrent lookups of the same company into one Proxycurl call
+        self.single_flight = SingleFlight()
 
     async def scrape_company(self, linkedin_url: str):
         """
-        Scrape a company's LinkedIn page using Proxycurl API
+        Scrape a company's LinkedIn page using Proxycurl API.
+
+        Profiles are cached by canonical company URL for the configured
+        freshness window, and concurrent requests for the same company share a
+        single upstream fetch.
         """
+        canonical_url = canonicalize_linkedin_company_url(linkedin_url)
+        cache_key = make_cache_key("proxycurl-company", canonical_url)
+
+        cached = await self.cache.aget(cache_key)
+        if cached is not None:
+            return cached
+
+        async def fetch():
+            company_data = await self._fetch_company(canonical_url)
+            await self.cache.aset(
+                cache_key, company_data, ttl=self.settings.proxycurl_cache_ttl
+            )
+            return company_data
+
+        return await self.single_flight.do(cache_key, fetch)
+
+    async def _fetch_company(self, linkedin_url: str):
         headers = {"Authorization": f"Bearer {self.settings.proxycurl_api_key}"}
         params = {
             "url": linkedin_url,
@@ -26,11 +92,12 @@ class LinkedInScraperService:
             "fallback_to_cache": "on-error",
         }
 
-        response = requests.get(
-            self.proxycurl_api_endpoint, params=params, headers=headers
+        response = await get_rate_limiter("proxycurl").request(
+            lambda: get_http_client().get(
+                self.proxycurl_api_endpoint, params=params, headers=headers
+            )
         )
 
-        if response.status_code != 200:
-            raise Exception(f"Failed to scrape LinkedIn company: {response.text}")
+        raise_for_upstream_status("proxycurl", response)
 
         return json.loads(response.text)
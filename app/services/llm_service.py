@@ -1,6 +1,23 @@
-from openai import AsyncOpenAI
+import time
+from typing import AsyncIterator, Optional
 from app.config.settings import get_settings
-import instructor
+from app.services.metrics_service import (
+    LLM_REQUEST_DURATION,
+    LLM_TIME_TO_FIRST_TOKEN,
+    metered_tokens,
+    record_token_usage,
+)
+from app.services.model_router_service import get_model_router
+from app.services.openai_client_service import (
+    OpenAIClientRegistry,
+    as_rate_limit_exceeded,
+    get_openai_client_registry,
+    hash_api_key,
+    is_validation_error,
+)
+from app.services.rate_limit_service import RateLimitExceeded, get_rate_limiter
+from app.services.response_cache_service import get_response_cache
+from app.services.singleflight_service import SingleFlight
 from pydantic import BaseModel
 
 
@@ -8,6 +25,15 @@ class LLMService:
     def __init__(self):
         self.settings = get_settings()
         self.default_model = self.settings.openai_default_model
+        self.rate_limiter = get_rate_limiter("openai")
+        self.response_cache = get_response_cache()
+        self.single_flight = SingleFlight(cancel_abandoned=True)
+        self.router = get_model_router()
+
+    @property
+    def client_registry(self) -> OpenAIClientRegistry:
+        # Looked up on use: creating the registry imports the OpenAI SDK
+        return get_openai_client_registry()
 
     async def generate_response(
         self,
@@ -16,6 +42,8 @@ class LLMService:
         model: str = None,
         temperature: float = 0.7,
         response_model: BaseModel | str | int | float | bool = str,
+        use_cache: bool = True,
+        endpoint: str = "chat",
     ) -> BaseModel | str | int | float | bool:
         """
         Generate a response from the LLM using OpenAI.
@@ -23,27 +51,184 @@ class LLMService:
         Args:
             query: The user's query
             api_key: OpenAI API key from request header
-            model: The OpenAI model to use (optional, defaults to settings)
+            model: The OpenAI model to use, or "auto" to start on the small model
+                and escalate when needed (optional, defaults to settings)
             temperature: Sampling temperature (optional, defaults to 0.7)
             response_model: The pydantic model or primitive type to use for the response (optional, defaults to str)
+            use_cache: Whether a cached response may be returned (optional, defaults to True)
+            endpoint: Name "auto" routing decisions are recorded under (optional, defaults to "chat")
 
         Returns:
             The LLM's response as a pydantic model instance or primitive type.
         """
-        try:
-            client = AsyncOpenAI(api_key=api_key)
-            client = instructor.from_openai(client)
-            model_to_use = model or self.default_model
-            completion = await client.chat.completions.create(
-                model=model_to_use,
-                response_model=response_model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": query},
-                ],
-                temperature=temperature,
+        model_to_use = model or self.default_model
+
+        async def run():
+            if self.router.is_auto(model_to_use):
+                return await self._generate_auto(
+                    query, api_key, temperature, response_model, endpoint
+                )
+            return await self._generate(
+                query, api_key, model_to_use, temperature, response_model
             )
 
+        # Only primitive responses are cached or shared; pydantic models are not JSON values
+        if response_model not in (str, int, float, bool):
+            return await run()
+
+        key = self.response_cache.make_key(
+            "chat", api_key, model_to_use, temperature, response_model.__name__, query
+        )
+        return await self.response_cache.get_or_run(
+            key, temperature, lambda: self.single_flight.do(key, run), use_cache
+        )
+
+    async def _generate_auto(
+        self,
+        query: str,
+        api_key: str,
+        temperature: float,
+        response_model: BaseModel | str | int | float | bool,
+        endpoint: str,
+    ) -> BaseModel | str | int | float | bool:
+        """
+        Answer on the small model when the prompt is short, escalating to the
+        large model when its response fails validation or reads as unsure.
+        """
+        model, reason = self.router.route_prompt(query)
+        if model == self.router.small_model:
+            start = time.perf_counter()
+            try:
+                with metered_tokens() as tokens:
+                    completion = await self._generate(
+                        query, api_key, model, temperature, response_model
+                    )
+            except Exception as e:
+                # Only a reply that fails validation is worth a retry on the
+                # large model; API errors and rate limits fail the request
+                if not is_validation_error(e.__cause__):
+                    raise
+                completion = None
+                reason = "validation_failed"
+            if completion is not None and self.router.is_confident(completion):
+                self.router.record(
+                    endpoint, model, reason, time.perf_counter() - start, tokens.total
+                )
+                return completion
+            if completion is not None:
+                reason = "low_confidence"
+            model = self.router.large_model
+
+        start = time.perf_counter()
+        with metered_tokens() as tokens:
+            completion = await self._generate(
+                query, api_key, model, temperature, response_model
+            )
+        self.router.record(
+            endpoint, model, reason, time.perf_counter() - start, tokens.total
+        )
+        return completion
+
+    async def _generate(
+        self,
+        query: str,
+        api_key: str,
+        model: str,
+        temperature: float,
+        response_model: BaseModel | str | int | float | bool,
+    ) -> BaseModel | str | int | float | bool:
+        try:
+            client = self.client_registry.get_instructor_client(api_key)
+            async with self.rate_limiter.acquire(hash_api_key(api_key)):
+                start = time.perf_counter()
+                completion = await client.chat.completions.create(
+                    model=model,
+                    response_model=response_model,
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant."},
+                        {"role": "user", "content": query},
+                    ],
+                    temperature=temperature,
+                )
+                # Token usage is recorded by the client's completion hook
+                LLM_REQUEST_DURATION.observe(time.perf_counter() - start, model)
+
             return completion
+        except RateLimitExceeded:
+            raise
+        except Exception as e:
+            raise as_rate_limit_exceeded(e) or Exception(
+                f"Error generating LLM response: {str(e)}"
+            ) from e
+
+    async def stream_response(
+        self,
+        query: str,
+        api_key: str,
+        model: str = None,
+        temperature: float = 0.7,
+        endpoint: str = "chat",
+    ) -> AsyncIterator[str]:
+        """
+        Stream a plain-text response from the LLM as it is generated.
+
+        Args:
+            query: The user's query
+            api_key: OpenAI API key from request header
+            model: The OpenAI model to use, or "auto" to pick one by prompt size
+                (optional, defaults to settings)
+            temperature: Sampling temperature (optional, defaults to 0.7)
+            endpoint: Name "auto" routing decisions are recorded under (optional, defaults to "chat")
+
+        Yields:
+            Chunks of the LLM's response text, in order.
+        """
+        try:
+            client = self.client_registry.get_openai_client(api_key)
+            model_to_use = model or self.default_model
+            # A streamed answer cannot be taken back, so "auto" never escalates here
+            route: Optional[str] = None
+            if self.router.is_auto(model_to_use):
+                model_to_use, route = self.router.route_prompt(query)
+            # The in-flight slot is held until the stream is fully consumed
+            async with self.rate_limiter.acquire(hash_api_key(api_key)):
+                start = time.perf_counter()
+                first_token = True
+                stream = await client.chat.completions.create(
+                    model=model_to_use,
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant."},
+                        {"role": "user", "content": query},
+                    ],
+                    temperature=temperature,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                tokens = 0
+                async for chunk in stream:
+                    # The closing chunk has no choices, only the token usage
+                    if chunk.usage is not None:
+                        record_token_usage(model_to_use, chunk.usage)
+                        tokens = chunk.usage.total_tokens
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if first_token:
+                            first_token = False
+                            LLM_TIME_TO_FIRST_TOKEN.observe(
+                                time.perf_counter() - start, model_to_use
+                            )
+                        yield chunk.choices[0].delta.content
+                LLM_REQUEST_DURATION.observe(time.perf_counter() - start, model_to_use)
+                if route is not None:
+                    self.router.record(
+                        endpoint,
+                        model_to_use,
+                        route,
+                        time.perf_counter() - start,
+                        tokens,
+                    )
+        except RateLimitExceeded:
+            raise
         except Exception as e:
-            raise Exception(f"Error generating LLM response: {str(e)}")
+            raise as_rate_limit_exceeded(e) or Exception(
+                f"Error generating LLM response: {str(e)}"
+            ) from e
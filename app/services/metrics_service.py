@@ -0,0 +1,376 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.tracing_service import get_tracer
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)  # fmt: skip
+STEP_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 25)
+TOKEN_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+
+Samples = List[Tuple[str, Dict[str, str], float]]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            k, str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        for k, v in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with positional label values."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Samples:
+        return [
+            (f"{self.name}_total", dict(zip(self.labelnames, labels)), value)
+            for labels, value in self._values.items()
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with positional label values."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def samples(self) -> Samples:
+        samples = []
+        for labels, (counts, total, count) in self._values.items():
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        {**base, "le": _format_value(bound)},
+                        cumulative,
+                    )
+                )
+            samples.append((f"{self.name}_sum", base, total))
+            samples.append((f"{self.name}_count", base, count))
+        return samples
+
+
+class StatsCollector:
+    """
+    Exposes an existing `stats()` dict as metrics at scrape time.
+
+    Each field becomes `<prefix>_<field>`; fields listed in `counters` are
+    typed as counters (with a `_total` suffix), the rest as gauges. When
+    `label` is set, `source` returns `{label value: stats}` instead of a
+    single stats dict.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        source: Callable[[], Dict[str, Any]],
+        label: Optional[str] = None,
+        counters: Iterable[str] = (),
+    ):
+        self.prefix = prefix
+        self.source = source
+        self.label = label
+        self.counters = set(counters)
+
+    def collect(self) -> List[Tuple[str, str, str, Samples]]:
+        stats = self.source()
+        rows = stats.items() if self.label else [(None, stats)]
+
+        families: Dict[str, Tuple[str, Samples]] = {}
+        for label_value, fields in rows:
+            labels = {self.label: label_value} if self.label else {}
+            for field, value in fields.items():
+                if not isinstance(value, (int, float)):
+                    continue
+                name = f"{self.prefix}_{field}".removesuffix("_total")
+                kind = "counter" if field in self.counters else "gauge"
+                sample = f"{name}_total" if kind == "counter" else name
+                families.setdefault(name, (kind, []))[1].append((sample, labels, value))
+        return [
+            (name, kind, f"{self.prefix} {name[len(self.prefix) + 1:]}", samples)
+            for name, (kind, samples) in families.items()
+        ]
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: List[StatsCollector] = []
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        metric = Counter(name, documentation, tuple(labelnames))
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        metric = Histogram(name, documentation, tuple(labelnames), buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: StatsCollector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        families = [
+            (m.name, m.type, m.documentation, m.samples()) for m in self._metrics
+        ]
+        for collector in self._collectors:
+            families.extend(collector.collect())
+
+        lines = []
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample, labels, value in samples:
+                lines.append(f"{sample}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route and status",
+    ("method", "route", "status"),
+)
+UPSTREAM_RESPONSES = REGISTRY.counter(
+    "upstream_responses",
+    "Responses received from upstream APIs by host and status code",
+    ("host", "status"),
+)
+TOOL_CALL_DURATION = REGISTRY.histogram(
+    "tool_call_duration_seconds",
+    "Agent tool call latency by tool and outcome",
+    ("tool", "status"),
+)
+LLM_REQUEST_DURATION = REGISTRY.histogram(
+    "llm_request_duration_seconds", "LLM call latency by model", ("model",)
+)
+LLM_TIME_TO_FIRST_TOKEN = REGISTRY.histogram(
+    "llm_time_to_first_token_seconds",
+    "Time until the first streamed token by model",
+    ("model",),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens", "LLM token usage by model and kind", ("model", "kind")
+)
+AGENT_RUN_DURATION = REGISTRY.histogram(
+    "agent_run_duration_seconds",
+    "Agent run latency by agent and outcome",
+    ("agent", "status"),
+)
+AGENT_STEPS = REGISTRY.histogram(
+    "agent_steps", "LLM calls (reasoning steps) per agent run", ("agent",), STEP_BUCKETS
+)
+PERSON_LOOKUPS = REGISTRY.counter(
+    "person_lookups",
+    "Person lookups by how they were answered (search, llm_pick or agent)",
+    ("path",),
+)
+SCRAPE_PREFETCHES = REGISTRY.counter(
+    "scrape_prefetches",
+    "Speculative scrapes of top search results by outcome (hit, failed or unused)",
+    ("outcome",),
+)
+SCRAPE_PREFETCH_SAVED_SECONDS = REGISTRY.counter(
+    "scrape_prefetch_saved_seconds",
+    "Scrape time that ran while the model was still deciding, summed over hits",
+)
+MODEL_ROUTES = REGISTRY.counter(
+    "model_routes",
+    'Routing decisions of model="auto" calls by endpoint, chosen model and reason',
+    ("endpoint", "model", "reason"),
+)
+MODEL_ROUTE_TOKENS = REGISTRY.counter(
+    "model_route_tokens",
+    'Tokens used by model="auto" calls by endpoint and model',
+    ("endpoint", "model"),
+)
+AGENT_STEP_PROMPT_TOKENS = REGISTRY.histogram(
+    "agent_step_prompt_tokens",
+    "Prompt tokens per agent LLM call (reasoning step)",
+    ("agent",),
+    TOKEN_BUCKETS,
+)
+AGENT_CACHED_PROMPT_TOKENS = REGISTRY.counter(
+    "agent_cached_prompt_tokens",
+    "Prompt tokens of agent LLM calls served from the upstream prompt cache",
+    ("agent",),
+)
+AGENT_BUDGET_EXCEEDED = REGISTRY.counter(
+    "agent_budget_exceeded",
+    "Agent runs cut short by a budget, answered with a partial answer",
+    ("agent", "budget"),
+)
+
+
+class TokenMeter:
+    """Token total of the LLM calls made within a `metered_tokens()` block."""
+
+    def __init__(self):
+        self.total = 0
+
+
+_token_meter: ContextVar[Optional[TokenMeter]] = ContextVar("token_meter", default=None)
+
+
+@contextmanager
+def metered_tokens() -> Iterator[TokenMeter]:
+    """
+    Count the tokens `record_token_usage` records in the current task.
+
+    Lets a caller attribute the usage reported by a client-wide hook (e.g.
+    instructor's completion hook) to its own call.
+    """
+    meter = TokenMeter()
+    token = _token_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _token_meter.reset(token)
+
+
+def _usage_dict(usage: Any) -> Dict[str, Any]:
+    if isinstance(usage, dict):
+        return usage
+    return usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+
+
+def prompt_token_usage(usage: Any) -> Tuple[int, int]:
+    """
+    Return the prompt tokens of an OpenAI `usage` object or LangChain
+    `usage_metadata` dict, and how many of them the upstream served from its
+    prompt cache.
+    """
+    if usage is None:
+        return 0, 0
+    usage = _usage_dict(usage)
+    prompt = usage.get("prompt_tokens", usage.get("input_tokens")) or 0
+    details = (
+        usage.get("prompt_tokens_details") or usage.get("input_token_details") or {}
+    )
+    cached = details.get("cached_tokens", details.get("cache_read")) or 0
+    return prompt, cached
+
+
+def record_token_usage(model: str, usage: Any) -> None:
+    """
+    Count the tokens of an OpenAI `usage` object or LangChain `usage_metadata` dict.
+    """
+    if usage is None:
+        return
+    usage = _usage_dict(usage)
+
+    prompt, cached = prompt_token_usage(usage)
+    completion = usage.get("completion_tokens", usage.get("output_tokens")) or 0
+    LLM_TOKENS.inc(model, "prompt", amount=prompt)
+    LLM_TOKENS.inc(model, "completion", amount=completion)
+    if cached:
+        LLM_TOKENS.inc(model, "cached_prompt", amount=cached)
+    meter = _token_meter.get()
+    if meter is not None:
+        meter.total += prompt + completion
+
+
+async def record_upstream_response(response: Any) -> None:
+    """httpx response event hook counting upstream status codes."""
+    UPSTREAM_RESPONSES.inc(response.request.url.host, str(response.status_code))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template, and
+    wrapping each request in a tracing span when tracing is enabled.
+    Streaming responses are measured until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        tracer = get_tracer()
+        try:
+            if tracer is None:
+                await self.app(scope, receive, send_wrapper)
+            else:
+                name = f"{scope['method']} {scope['path']}"
+                with tracer.start_as_current_span(name) as span:
+                    await self.app(scope, receive, send_wrapper)
+                    span.set_attribute("http.status_code", status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            )
@@ -0,0 +1,111 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Tuple
+
+from app.config.settings import get_settings
+from app.services.metrics_service import MODEL_ROUTE_TOKENS, MODEL_ROUTES
+from app.tools.content_tools import count_tokens
+
+logger = logging.getLogger(__name__)
+
+AUTO_MODEL = "auto"
+
+# Answers that say the model could not answer, worth a second try on the large model
+_HEDGE_RE = re.compile(
+    r"\b(i (?:don't|do not|cannot|can't) (?:know|answer|help|determine)"
+    r"|i(?:'m| am) (?:not sure|unable to)"
+    r"|as an ai)\b",
+    re.IGNORECASE,
+)
+
+
+class ModelRouter:
+    """
+    Routes the LLM calls of `model="auto"` requests between a small and a
+    large model.
+
+    Short prompts and intermediate agent steps (picking the next tool call)
+    start on the small model. A call is escalated to the large model when it
+    writes a final agent answer, when its prompt is long, or when the small
+    model's reply fails validation or reads as unsure. Every decision is
+    counted per endpoint, with the tokens it used, and logged with its latency.
+    """
+
+    def __init__(self, small_model: str, large_model: str, simple_prompt_tokens: int):
+        self.small_model = small_model
+        self.large_model = large_model
+        self.simple_prompt_tokens = simple_prompt_tokens
+
+    @staticmethod
+    def is_auto(model: Optional[str]) -> bool:
+        return model == AUTO_MODEL
+
+    def route_prompt(self, prompt: str) -> Tuple[str, str]:
+        """
+        Pick the model a single prompt starts on.
+
+        Returns:
+            The model and the reason for the choice
+        """
+        if count_tokens(prompt) <= self.simple_prompt_tokens:
+            return self.small_model, "simple_prompt"
+        return self.large_model, "long_prompt"
+
+    @staticmethod
+    def is_confident(response: Any) -> bool:
+        """Whether a small model's answer can be returned without escalating."""
+        if not isinstance(response, str):
+            # Structured responses were already validated against their model
+            return True
+        return bool(response.strip()) and not _HEDGE_RE.search(response)
+
+    @staticmethod
+    def step_escalation(reply: Any, tool_names: Sequence[str]) -> Optional[str]:
+        """
+        Check a small model's agent step.
+
+        Returns:
+            Why the step must be redone on the large model, or None when its
+            tool calls can be used as they are
+        """
+        if getattr(reply, "invalid_tool_calls", None):
+            return "invalid_tool_call"
+        tool_calls = getattr(reply, "tool_calls", None) or []
+        if not tool_calls:
+            # The model is done researching: the answer is written by the large model
+            return "final_synthesis"
+        if any(call["name"] not in tool_names for call in tool_calls):
+            return "unknown_tool"
+        return None
+
+    def record(
+        self,
+        endpoint: str,
+        model: str,
+        reason: str,
+        elapsed: float,
+        tokens: int = 0,
+    ) -> None:
+        """Count and log one routing decision."""
+        MODEL_ROUTES.inc(endpoint, model, reason)
+        if tokens:
+            MODEL_ROUTE_TOKENS.inc(endpoint, model, amount=tokens)
+        logger.info(
+            "Routed %s call to %s (%s): %.2fs, %d tokens",
+            endpoint,
+            model,
+            reason,
+            elapsed,
+            tokens,
+        )
+
+
+@lru_cache()
+def get_model_router() -> ModelRouter:
+    settings = get_settings()
+    return ModelRouter(
+        settings.auto_small_model,
+        settings.auto_large_model,
+        settings.auto_simple_prompt_tokens,
+    )
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import httpx
+from pydantic import ValidationError
+
+from app.config.settings import get_settings
+from app.services.lazy_import_service import lazy_import
+from app.services.metrics_service import record_token_usage, record_upstream_response
+from app.services.rate_limit_service import RateLimitExceeded, parse_retry_after
+
+# The OpenAI SDK, instructor and LangChain take about a second to import, so
+# they are only loaded once an LLM client is actually needed
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+    from openai import AsyncOpenAI
+
+
+def hash_api_key(api_key: str) -> str:
+    """Hash an API key so it can be used as a lookup key without being stored."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def as_rate_limit_exceeded(e: Exception) -> Optional[RateLimitExceeded]:
+    """
+    Translate an OpenAI 429 into `RateLimitExceeded`, or return None.
+
+    The SDK has already retried the call by the time it raises; instructor
+    may additionally wrap the error in an `InstructorRetryException`.
+    """
+    openai = lazy_import("openai")
+    InstructorRetryException = lazy_import(
+        "instructor.exceptions"
+    ).InstructorRetryException
+
+    if isinstance(e, InstructorRetryException) and e.args:
+        e = e.args[0]
+    if not isinstance(e, openai.RateLimitError):
+        return None
+    return RateLimitExceeded("openai", parse_retry_after(e.response.headers) or 1.0)
+
+
+def is_validation_error(e: Optional[BaseException]) -> bool:
+    """
+    Whether an instructor call failed because the model's reply could not be
+    parsed into the response model, rather than because the call itself failed.
+
+    instructor retries every error and wraps the last one in an
+    `InstructorRetryException`, so API and transport errors arrive wrapped too.
+    """
+    exceptions = lazy_import("instructor.exceptions")
+
+    if isinstance(e, exceptions.InstructorRetryException) and e.args:
+        e = e.args[0]
+    return isinstance(
+        e,
+        (ValidationError, json.JSONDecodeError, exceptions.IncompleteOutputException),
+    )
+
+
+def warm_response_models() -> None:
+    """
+    Serialize a dummy completion once on the calling thread.
+
+    pydantic builds serializers lazily, and `ChatOpenAI` dumps responses in a
+    thread pool; several first-time dumps racing each other can return a
+    partial dict (surfacing as `KeyError: 'choices'`). Warming up front avoids
+    the race under concurrent first requests.
+    """
+    ChatCompletion = lazy_import("openai.types.chat").ChatCompletion
+
+    ChatCompletion.model_validate(
+        {
+            "id": "warmup",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "warmup",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "tool_calls",
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "tool_calls": [
+                            {
+                                "id": "call_warmup",
+                                "type": "function",
+                                "function": {"name": "warmup", "arguments": "{}"},
+                            }
+                        ],
+                    },
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+    ).model_dump()
+
+
+@dataclass
+class ClientEntry:
+    openai: "AsyncOpenAI"
+    instructor: Any
+    # LangChain models by (model, temperature), least recently used first
+    chat_models: "OrderedDict[tuple, ChatOpenAI]" = field(default_factory=OrderedDict)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class OpenAIClientRegistry:
+    """
+    Bounded, LRU-evicted registry of long-lived OpenAI clients keyed by API key hash.
+
+    Every client shares one httpx connection pool, so a warm request reuses an
+    open connection no matter which key it carries. Clients that have not been
+    used for `idle_ttl` seconds are dropped on the next lookup.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.max_clients = self.settings.openai_client_cache_size
+        self.idle_ttl = self.settings.openai_client_idle_ttl
+        self.max_chat_models = self.settings.openai_chat_model_cache_size
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._entries: "OrderedDict[str, ClientEntry]" = OrderedDict()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        warm_response_models()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = lazy_import("openai").DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=self.settings.openai_max_connections,
+                    max_keepalive_connections=self.settings.openai_max_keepalive_connections,
+                    keepalive_expiry=self.settings.http_keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    self.settings.openai_timeout,
+                    connect=self.settings.http_connect_timeout,
+                ),
+                event_hooks={"response": [record_upstream_response]},
+            )
+        return self._http_client
+
+    def _evict_idle(self, now: float) -> None:
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry.last_used < self.idle_ttl:
+                break
+            del self._entries[key]
+            self.evicted += 1
+
+    def _get_entry(self, api_key: str) -> ClientEntry:
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        key = hash_api_key(api_key)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry.last_used = now
+            self.reused += 1
+            return entry
+
+        instructor = lazy_import("instructor")
+        AsyncOpenAI = lazy_import("openai").AsyncOpenAI
+
+        client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=self.settings.openai_base_url or None,
+            max_retries=self.settings.openai_max_retries,
+            http_client=self._get_http_client(),
+        )
+        instructor_client = instructor.from_openai(client)
+        instructor_client.on(
+            "completion:response",
+            lambda completion: record_token_usage(completion.model, completion.usage),
+        )
+        entry = ClientEntry(openai=client, instructor=instructor_client)
+        self._entries[key] = entry
+        self.created += 1
+
+        if len(self._entries) > self.max_clients:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+        return entry
+
+    def get_openai_client(self, api_key: str) -> "AsyncOpenAI":
+        """Return the pooled `AsyncOpenAI` client for an API key."""
+        return self._get_entry(api_key).openai
+
+    def get_instructor_client(self, api_key: str) -> Any:
+        """Return the pooled `instructor` wrapper for an API key."""
+        return self._get_entry(api_key).instructor
+
+    def get_chat_model(
+        self, api_key: str, model: str, temperature: float
+    ) -> "ChatOpenAI":
+        """
+        Return a LangChain `ChatOpenAI` backed by the pooled client for an API key.
+
+        Each client keeps its `max_chat_models` most recently used models, since
+        callers choose the temperature freely.
+        """
+        entry = self._get_entry(api_key)
+        key = (model, temperature)
+        chat_model = entry.chat_models.get(key)
+        if chat_model is not None:
+            entry.chat_models.move_to_end(key)
+        else:
+            ChatOpenAI = lazy_import("langchain_openai").ChatOpenAI
+
+            chat_model = ChatOpenAI(
+                api_key=api_key,
+                model=model,
+                temperature=temperature,
+                # Report token usage on streamed runs too
+                stream_usage=True,
+                root_async_client=entry.openai,
+                async_client=entry.openai.chat.completions,
+            )
+            entry.chat_models[key] = chat_model
+            if len(entry.chat_models) > self.max_chat_models:
+                entry.chat_models.popitem(last=False)
+        return chat_model
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "clients": len(self._entries),
+            "created": self.created,
+            "reused": self.reused,
+            "evicted": self.evicted,
+        }
+
+    async def aclose(self) -> None:
+        """Drop every client and close the shared connection pool."""
+        self._entries.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+@lru_cache()
+def get_openai_client_registry() -> OpenAIClientRegistry:
+    return OpenAIClientRegistry()
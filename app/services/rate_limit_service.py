@@ -0,0 +1,482 @@
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import httpx
+
+from app.config.settings import get_settings
+
+UPSTREAMS = ("serper", "proxycurl", "openai")
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call would have to queue longer than the limiter allows."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        self.upstream = upstream
+        self.retry_after = retry_after
+        super().__init__(
+            f"Rate limit exceeded for {upstream}, retry after {retry_after:.1f}s"
+        )
+
+
+class UpstreamError(Exception):
+    """Raised when an upstream still answers with an error once retries are exhausted."""
+
+    def __init__(self, upstream: str, status_code: int, detail: str = ""):
+        self.upstream = upstream
+        self.status_code = status_code
+        super().__init__(
+            f"{upstream} failed with status {status_code}"
+            + (f": {detail[:200]}" if detail else "")
+        )
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Return the `Retry-After` delay in seconds, if the header holds a number."""
+    value = headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def raise_for_upstream_status(upstream: str, response: Any) -> None:
+    """
+    Raise the typed error for an upstream response that is not a success.
+
+    Raises:
+        RateLimitExceeded: On a 429, carrying the upstream's `Retry-After`
+        UpstreamError: On any other error status
+    """
+    if response.status_code == 429:
+        raise RateLimitExceeded(upstream, parse_retry_after(response.headers) or 1.0)
+    if response.status_code >= 400:
+        raise UpstreamError(upstream, response.status_code, response.text)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second, holding at most `burst`.
+
+    Callers reserve a token before they wait for it, which may take the balance
+    below zero; each caller then sleeps until its own token has been refilled,
+    so queued calls are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token reserved at `now` becomes available."""
+        if now > self.updated:
+            elapsed = now - self.updated
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def reserve(self) -> None:
+        self.tokens -= 1
+
+    def refund(self) -> None:
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class SQLiteBucketStore:
+    """
+    Token bucket balances kept in a SQLite file, shared by every worker
+    process on the host.
+
+    A call's tokens are checked and taken in one short `BEGIN IMMEDIATE`
+    transaction, so concurrent workers serialize on the database lock instead
+    of overshooting the rate. The store's methods block, so async callers run
+    them in a thread.
+
+    Balances are refilled using wall-clock time, which unlike the monotonic
+    clock is comparable between processes.
+    """
+
+    def __init__(self, path: str, idle_ttl: float = 24 * 60 * 60):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+                """)
+            # Drop the buckets of clients that have not called in a while
+            self._conn.execute(
+                "DELETE FROM buckets WHERE updated < ?", (time.time() - idle_ttl,)
+            )
+
+    def _refilled(self, bucket: "SharedTokenBucket", now: float) -> Tuple[float, float]:
+        row = self._conn.execute(
+            "SELECT tokens, updated FROM buckets WHERE key = ?", (bucket.key,)
+        ).fetchone()
+        if row is None:
+            return float(bucket.burst), now
+        tokens, updated = row
+        refilled = tokens + max(0.0, now - updated) * bucket.rate
+        return min(bucket.burst, refilled), max(now, updated)
+
+    def _apply(
+        self, buckets: Sequence["SharedTokenBucket"], change: float, max_wait: float
+    ) -> float:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                balances = [self._refilled(b, now) for b in buckets]
+                delay = max(
+                    max(0.0, (1 - tokens) / b.rate)
+                    for b, (tokens, _) in zip(buckets, balances)
+                )
+                if change > 0 or delay <= max_wait:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                        [
+                            (b.key, min(b.burst, tokens + change), updated)
+                            for b, (tokens, updated) in zip(buckets, balances)
+                        ],
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return delay
+
+    def reserve(self, buckets: Sequence["SharedTokenBucket"], max_wait: float) -> float:
+        """
+        Refill the buckets up to now and take a token from each, all in one
+        transaction, unless the wait for them would exceed `max_wait`, in
+        which case no token is taken.
+
+        Returns:
+            Seconds until the reserved tokens become available
+        """
+        return self._apply(buckets, -1, max_wait)
+
+    def refund(self, buckets: Sequence["SharedTokenBucket"]) -> None:
+        """Give back a token to each of the buckets."""
+        self._apply(buckets, 1, 0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SharedTokenBucket:
+    """
+    `TokenBucket` whose balance lives in a `SQLiteBucketStore`, which reserves
+    and refunds its tokens.
+    """
+
+    def __init__(self, store: SQLiteBucketStore, key: str, rate: float, burst: int):
+        self.store = store
+        self.key = key
+        self.rate = rate
+        self.burst = max(burst, 1)
+
+
+class RateLimiter:
+    """
+    Rate and concurrency limits for one upstream API.
+
+    Every call takes a token from the upstream's bucket and, when a client key
+    is given, from that client's own bucket, then holds one of `max_in_flight`
+    slots while it runs. A call queues for at most `max_wait` seconds; if it
+    would have to wait longer it is shed with `RateLimitExceeded`.
+
+    With a `store`, the token buckets are shared by every worker process using
+    it; in-flight slots always apply per process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = 0,
+        burst: int = 1,
+        max_in_flight: int = 0,
+        client_rate: float = 0,
+        client_burst: int = 1,
+        max_wait: float = 2.0,
+        max_clients: int = 10000,
+        max_retries: int = 3,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 8.0,
+        store: Optional[SQLiteBucketStore] = None,
+    ):
+        self.name = name
+        self.store = store
+        self.bucket = self._new_bucket(name, rate, burst) if rate > 0 else None
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_wait = max_wait
+        self.max_clients = max_clients
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._client_buckets: "OrderedDict[str, Any]" = OrderedDict()
+        self._slots = asyncio.Semaphore(max_in_flight) if max_in_flight > 0 else None
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.acquired = 0
+        self.shed = 0
+        self.retries = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _new_bucket(self, key: str, rate: float, burst: int) -> Any:
+        if self.store is not None:
+            return SharedTokenBucket(self.store, key, rate, burst)
+        return TokenBucket(rate, burst)
+
+    def _client_bucket(self, client_key: Optional[str]) -> Optional[Any]:
+        if client_key is None or self.client_rate <= 0:
+            return None
+
+        bucket = self._client_buckets.get(client_key)
+        if bucket is not None:
+            self._client_buckets.move_to_end(client_key)
+            return bucket
+
+        bucket = self._new_bucket(
+            f"{self.name}:{client_key}", self.client_rate, self.client_burst
+        )
+        self._client_buckets[client_key] = bucket
+        if len(self._client_buckets) > self.max_clients:
+            self._client_buckets.popitem(last=False)
+        return bucket
+
+    def _shed(self, retry_after: float) -> RateLimitExceeded:
+        self.shed += 1
+        return RateLimitExceeded(self.name, retry_after)
+
+    async def _acquire_slot(self, deadline: float) -> None:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise self._shed(self.max_wait or 1.0)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), remaining)
+        except asyncio.TimeoutError:
+            raise self._shed(self.max_wait or 1.0)
+
+    async def _reserve(self, buckets: List[Any], now: float) -> float:
+        """
+        Take a token from every bucket, or from none if the wait would exceed
+        `max_wait`, and return the wait.
+        """
+        if not buckets:
+            return 0.0
+        if self.store is None:
+            # No await in between, so no other call can take the tokens
+            delay = max(b.delay(now) for b in buckets)
+            if delay <= self.max_wait:
+                for bucket in buckets:
+                    bucket.reserve()
+            return delay
+
+        # The store's transaction runs off the event loop and is shielded from
+        # cancellation: a reservation made after the caller gave up is refunded
+        def refund_late(f: "asyncio.Future[float]") -> None:
+            if not f.cancelled() and f.exception() is None:
+                if f.result() <= self.max_wait:
+                    self._refund(buckets)
+
+        reservation = asyncio.ensure_future(
+            asyncio.to_thread(self.store.reserve, buckets, self.max_wait)
+        )
+        try:
+            return await asyncio.shield(reservation)
+        except asyncio.CancelledError:
+            reservation.add_done_callback(refund_late)
+            raise
+
+    def _refund(self, buckets: List[Any]) -> None:
+        if not buckets:
+            return
+        if self.store is None:
+            for bucket in buckets:
+                bucket.refund()
+            return
+        # Not awaited, so a refund never holds up the cancellation that caused it
+        asyncio.get_running_loop().run_in_executor(None, self.store.refund, buckets)
+
+    @asynccontextmanager
+    async def acquire(self, client_key: Optional[str] = None) -> AsyncIterator[None]:
+        """
+        Wait for a token and an in-flight slot, holding the slot for the block.
+
+        Args:
+            client_key: Identifies the calling client (e.g. an API key hash);
+                None only applies the upstream-wide limits
+
+        Raises:
+            RateLimitExceeded: If the call would wait longer than `max_wait`
+        """
+        start = time.monotonic()
+        buckets = [
+            b for b in (self.bucket, self._client_bucket(client_key)) if b is not None
+        ]
+        delay = await self._reserve(buckets, start)
+        if delay > self.max_wait:
+            raise self._shed(delay)
+
+        self.waiting += 1
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self._slots is not None:
+                await self._acquire_slot(start + self.max_wait)
+        except BaseException:
+            # The call never reached the upstream, so give the tokens back
+            self._refund(buckets)
+            raise
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before retry number `attempt` (0-based).
+
+        Honors the upstream's `Retry-After` when given, otherwise uses full
+        jitter over an exponentially growing window.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.retry_max_delay)
+        window = min(self.retry_max_delay, self.retry_base_delay * 2**attempt)
+        return random.uniform(0, window)
+
+    async def request(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        client_key: Optional[str] = None,
+    ) -> httpx.Response:
+        """
+        Send an HTTP request through the limiter, retrying on 429, 5xx and
+        transport errors (connect or read timeouts, dropped connections).
+
+        Args:
+            send: Coroutine function that performs the request
+            client_key: Identifies the calling client for per-client limits
+
+        Returns:
+            The first non-retryable response, or the last one once retries
+            are exhausted
+
+        Raises:
+            UpstreamError: With status 503, if the request still fails to
+                get a response once retries are exhausted
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.acquire(client_key):
+                    response = await send()
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    detail = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                    raise UpstreamError(self.name, 503, detail) from e
+                self.retries += 1
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            if (
+                response.status_code not in RETRYABLE_STATUS_CODES
+                or attempt == self.max_retries
+            ):
+                return response
+
+            self.retries += 1
+            await asyncio.sleep(
+                self.backoff(attempt, parse_retry_after(response.headers))
+            )
+        return response
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "acquired": self.acquired,
+            "shed": self.shed,
+            "retries": self.retries,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+            "clients": len(self._client_buckets),
+        }
+
+
+@lru_cache()
+def get_bucket_store() -> Optional[SQLiteBucketStore]:
+    """Return the cross-worker bucket store, or None to keep limits per process."""
+    path = get_settings().rate_limit_store_path
+    return SQLiteBucketStore(path) if path else None
+
+
+@lru_cache()
+def get_rate_limiter(upstream: str) -> RateLimiter:
+    """Return the shared limiter for an upstream in `UPSTREAMS`."""
+    settings = get_settings()
+    return RateLimiter(
+        name=upstream,
+        rate=getattr(settings, f"{upstream}_rate_limit"),
+        burst=getattr(settings, f"{upstream}_rate_burst"),
+        max_in_flight=getattr(settings, f"{upstream}_max_in_flight"),
+        client_rate=getattr(settings, f"{upstream}_client_rate_limit"),
+        client_burst=getattr(settings, f"{upstream}_client_rate_burst"),
+        max_wait=settings.rate_limit_max_wait_ms / 1000,
+        max_clients=settings.rate_limit_max_clients,
+        max_retries=settings.upstream_max_retries,
+        retry_base_delay=settings.upstream_retry_base_delay,
+        retry_max_delay=settings.upstream_retry_max_delay,
+        store=get_bucket_store(),
+    )
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, float]]:
+    """Return the counters of every upstream limiter, keyed by upstream."""
+    return {upstream: get_rate_limiter(upstream).stats() for upstream in UPSTREAMS}
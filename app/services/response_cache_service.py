@@ -0,0 +1,134 @@
+import unicodedata
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Optional
+
+from app.config.settings import get_settings
+from app.services.cache_service import (
+    MemoryCache,
+    SQLiteCache,
+    TieredCache,
+    make_cache_key,
+)
+from app.services.openai_client_service import hash_api_key
+
+
+def normalize_prompt(text: Optional[str]) -> str:
+    """Normalize Unicode and collapse whitespace; case is kept as it can matter to the model."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """
+    Cache of final LLM and agent answers for deterministic requests.
+
+    Only requests at or below `max_temperature` are cached. Entries are
+    scoped to the caller's API key, so one client's answers are never served
+    to another. Without a backing cache every request is passed through.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[TieredCache],
+        ttl: float,
+        max_temperature: float = 0.0,
+    ):
+        self.cache = cache
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+
+    def is_cacheable(self, temperature: Optional[float]) -> bool:
+        return (
+            self.cache is not None
+            and temperature is not None
+            and temperature <= self.max_temperature
+        )
+
+    @staticmethod
+    def make_key(
+        endpoint: str,
+        api_key: str,
+        model: str,
+        temperature: Optional[float],
+        *texts: Optional[str],
+    ) -> str:
+        """
+        Build the cache key of a request.
+
+        Args:
+            endpoint: The kind of request (e.g. "chat", "websearch")
+            api_key: The caller's OpenAI API key
+            model: The model answering the request
+            temperature: The sampling temperature
+            texts: The prompt and any instructions or URLs shaping the answer
+
+        Returns:
+            The cache key
+        """
+        return make_cache_key(
+            f"response-{endpoint}",
+            hash_api_key(api_key),
+            model,
+            repr(float(temperature)) if temperature is not None else "default",
+            *(normalize_prompt(text) for text in texts),
+        )
+
+    async def get_or_run(
+        self,
+        key: str,
+        temperature: Optional[float],
+        run: Callable[[], Awaitable[Any]],
+        use_cache: bool = True,
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Return the cached answer for a request, or run it and cache the result.
+
+        Args:
+            key: The request's cache key from `make_key`
+            temperature: The sampling temperature; non-deterministic requests bypass the cache
+            run: Coroutine function producing the answer
+            use_cache: False skips the lookup (the fresh answer is still stored)
+            cacheable: Optional check of a fresh answer; answers it rejects are not stored
+
+        Returns:
+            The answer
+        """
+        if not self.is_cacheable(temperature):
+            return await run()
+
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = await run()
+        if cacheable is None or cacheable(result):
+            self.cache.set(key, result, ttl=self.ttl)
+        return result
+
+    def stats(self) -> dict:
+        return self.cache.stats_by_tier() if self.cache is not None else {}
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """Return the shared response cache; it passes everything through when disabled."""
+    settings = get_settings()
+    if not settings.response_cache_enabled:
+        return ResponseCache(None, ttl=settings.response_cache_ttl)
+
+    memory = MemoryCache(
+        max_entries=settings.response_cache_max_entries,
+        max_bytes=settings.response_cache_max_bytes,
+    )
+    disk = (
+        SQLiteCache(settings.response_cache_sqlite_path)
+        if settings.response_cache_sqlite_path
+        else None
+    )
+    return ResponseCache(
+        TieredCache(memory, disk),
+        ttl=settings.response_cache_ttl,
+        max_temperature=settings.response_cache_max_temperature,
+    )
@@ -0,0 +1,74 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is in flight await the same task and share its result or
+    exception. Each caller awaits through `asyncio.shield`, so cancelling one
+    caller (e.g. a client disconnect) does not cancel the shared work.
+
+    With `cancel_abandoned`, the work is cancelled once every caller waiting
+    on it has been cancelled, instead of running to completion unobserved.
+    """
+
+    def __init__(self, cancel_abandoned: bool = False):
+        self.cancel_abandoned = cancel_abandoned
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `fn` unless a call with the same key is already in flight.
+
+        Args:
+            key: Identifies equivalent calls
+            fn: Coroutine function performing the work
+
+        Returns:
+            The (shared) result of `fn`
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.create_task(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        else:
+            self.collapsed += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self.cancel_abandoned and self._waiters[task] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _on_done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._in_flight),
+        }
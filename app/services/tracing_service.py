@@ -0,0 +1,55 @@
+import logging
+from functools import lru_cache
+from typing import Any, Optional
+
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def get_tracer() -> Optional[Any]:
+    """
+    Return the OpenTelemetry tracer, or None when tracing is disabled.
+
+    OpenTelemetry is optional: tracing needs `otel_enabled` and the
+    `opentelemetry-api` package. When `otel_exporter_otlp_endpoint` is set (and
+    `opentelemetry-sdk` plus the OTLP exporter are installed) spans are
+    exported there; otherwise the globally configured tracer provider is used,
+    e.g. the one set up by `opentelemetry-instrument`.
+    """
+    settings = get_settings()
+    if not settings.otel_enabled:
+        return None
+
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        logger.warning("otel_enabled is set but opentelemetry is not installed")
+        return None
+
+    if settings.otel_exporter_otlp_endpoint:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+            provider = TracerProvider(
+                resource=Resource.create({"service.name": settings.otel_service_name})
+            )
+            provider.add_span_processor(
+                BatchSpanProcessor(
+                    OTLPSpanExporter(endpoint=settings.otel_exporter_otlp_endpoint)
+                )
+            )
+            trace.set_tracer_provider(provider)
+        except ImportError:
+            logger.warning(
+                "otel_exporter_otlp_endpoint is set but opentelemetry-sdk or "
+                "opentelemetry-exporter-otlp-proto-http is not installed"
+            )
+
+    return trace.get_tracer("scrapify-ai")
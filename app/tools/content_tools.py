@@ -0,0 +1,250 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from app.services.lazy_import_service import lazy_import
+
+# Lines that are almost always page chrome rather than content
+_BOILERPLATE_RE = re.compile(
+    r"cookie|consent|accept all|privacy policy|terms of (use|service)|"
+    r"all rights reserved|©|subscribe to our newsletter|sign up for our newsletter|"
+    r"skip to (main )?content|back to top|follow us on",
+    re.IGNORECASE,
+)
+_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_HEADING_RE = re.compile(r"^#{1,6}\s")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# BM25 parameters
+_K1 = 1.5
+_B = 0.75
+
+
+@lru_cache()
+def _get_encoding(encoding_name: str) -> Optional[Any]:
+    # tiktoken downloads its BPE files on first use; without them (e.g. no
+    # network access) token counts fall back to an estimate
+    try:
+        return lazy_import("tiktoken").get_encoding(encoding_name)
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, encoding_name: str = "o200k_base") -> int:
+    """
+    Count the tokens of a text with tiktoken.
+
+    Args:
+        text: The text to measure
+        encoding_name: The tiktoken encoding (o200k_base is used by gpt-4o models)
+
+    Returns:
+        The token count, or an estimate of 4 characters per token when the
+        encoding is unavailable
+    """
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(
+    text: str, max_tokens: int, encoding_name: str = "o200k_base"
+) -> str:
+    """Cut a text down to at most `max_tokens` tokens."""
+    encoding = _get_encoding(encoding_name)
+    if encoding is None:
+        return text[: max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    return encoding.decode(tokens[:max_tokens])
+
+
+def _is_boilerplate(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped:
+        return False
+    if _IMAGE_RE.sub("", stripped).strip(" -*|") == "":
+        return True
+    if _BOILERPLATE_RE.search(stripped) and len(stripped) < 300:
+        return True
+
+    # Navigation: lines that are (almost) only links
+    links = _LINK_RE.findall(stripped)
+    if links:
+        text = _LINK_RE.sub("", stripped).strip(" -*|·•>/")
+        if len(text) < 20 and (len(links) >= 2 or len(stripped) < 80):
+            return True
+    return False
+
+
+def strip_boilerplate(markdown: str) -> str:
+    """
+    Remove page chrome from scraped markdown.
+
+    Drops image-only lines, link-only navigation lines, and short cookie,
+    consent, newsletter and footer lines, then collapses the blank lines left
+    behind.
+
+    Args:
+        markdown: The page content as markdown
+
+    Returns:
+        The markdown without boilerplate lines
+    """
+    lines = [line for line in markdown.splitlines() if not _is_boilerplate(line)]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def dedupe_blocks(blocks: List[str]) -> List[str]:
+    """Drop blocks that repeat an earlier block, ignoring case and whitespace."""
+    seen = set()
+    unique = []
+    for block in blocks:
+        normalized = " ".join(block.lower().split())
+        digest = hashlib.sha1(normalized.encode("utf-8")).digest()
+        if digest not in seen:
+            seen.add(digest)
+            unique.append(block)
+    return unique
+
+
+def chunk_markdown(markdown: str, chunk_tokens: int = 200) -> List[str]:
+    """
+    Split markdown into chunks of roughly `chunk_tokens` tokens.
+
+    Chunks are built from whole paragraphs and a new chunk is started at every
+    heading, so a chunk does not mix sections. Duplicate paragraphs are
+    dropped. A single oversized paragraph becomes its own chunk.
+
+    Args:
+        markdown: The page content as markdown
+        chunk_tokens: Target chunk size
+
+    Returns:
+        The chunks in document order
+    """
+    blocks = dedupe_blocks(
+        [b.strip() for b in re.split(r"\n\s*\n", markdown) if b.strip()]
+    )
+
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for block in blocks:
+        tokens = count_tokens(block)
+        starts_section = bool(_HEADING_RE.match(block))
+        if current and (starts_section or current_tokens + tokens > chunk_tokens):
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(block)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _terms(text: str) -> List[str]:
+    return [t for t in _WORD_RE.findall(text.lower()) if len(t) > 1]
+
+
+def bm25_scores(query: str, chunks: List[str]) -> List[float]:
+    """
+    Score chunks against a query with Okapi BM25.
+
+    Args:
+        query: The search query
+        chunks: The texts to rank
+
+    Returns:
+        One score per chunk, higher is more relevant
+    """
+    docs = [Counter(_terms(chunk)) for chunk in chunks]
+    if not docs:
+        return []
+    lengths = [sum(doc.values()) for doc in docs]
+    avg_length = (sum(lengths) / len(lengths)) or 1
+    query_terms = set(_terms(query))
+
+    idf = {}
+    for term in query_terms:
+        df = sum(1 for doc in docs if term in doc)
+        idf[term] = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+
+    scores = []
+    for doc, length in zip(docs, lengths):
+        score = 0.0
+        for term in query_terms:
+            tf = doc.get(term, 0)
+            if tf:
+                norm = tf + _K1 * (1 - _B + _B * length / avg_length)
+                score += idf[term] * tf * (_K1 + 1) / norm
+        scores.append(score)
+    return scores
+
+
+def reduce_content(
+    markdown: str,
+    query: Optional[str] = None,
+    max_tokens: int = 4000,
+    chunk_tokens: int = 200,
+) -> str:
+    """
+    Shrink scraped markdown to what is worth sending to the LLM.
+
+    Boilerplate and repeated blocks are removed first. If the page still
+    exceeds `max_tokens`, it is chunked and the chunks most relevant to the
+    query (BM25) are kept, in their original order, until the budget is
+    spent. Without a query the leading chunks are kept.
+
+    Args:
+        markdown: The page content as markdown
+        query: The question the page is being read for (optional)
+        max_tokens: Token budget for the returned content
+        chunk_tokens: Target chunk size when the page has to be cut down
+
+    Returns:
+        The reduced markdown; omitted stretches are marked with "[...]"
+    """
+    cleaned = "\n\n".join(
+        dedupe_blocks(re.split(r"\n\s*\n", strip_boilerplate(markdown)))
+    )
+    if count_tokens(cleaned) <= max_tokens:
+        return cleaned
+
+    chunks = chunk_markdown(cleaned, chunk_tokens)
+    if query:
+        scores = bm25_scores(query, chunks)
+        ranked = sorted(range(len(chunks)), key=lambda i: (-scores[i], i))
+    else:
+        ranked = list(range(len(chunks)))
+
+    selected = []
+    budget = max_tokens - 4  # Trailing "[...]" marker
+    for i in ranked:
+        # Leave room for the separator and a possible "[...]" marker
+        tokens = count_tokens(chunks[i]) + 4
+        if tokens <= budget:
+            selected.append(i)
+            budget -= tokens
+        if budget < chunk_tokens // 4:
+            break
+
+    if not selected:
+        # Even the best chunk is over budget
+        return truncate_tokens(chunks[ranked[0]], max_tokens - 4) + "\n\n[...]"
+
+    parts = []
+    previous = -1
+    for i in sorted(selected):
+        if i != previous + 1:
+            parts.append("[...]")
+        parts.append(chunks[i])
+        previous = i
+    if previous != len(chunks) - 1:
+        parts.append("[...]")
+    return "\n\n".join(parts)
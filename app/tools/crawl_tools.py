@@ -0,0 +1,213 @@
+import asyncio
+import re
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from app.services.rate_limit_service import RateLimitExceeded
+from app.tools.content_tools import reduce_content
+from app.tools.url_tools import canonicalize_url
+
+# Markdown link targets and bare http(s) URLs
+_LINK_RE = re.compile(
+    r"\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)|(https?://[^\s)\]>\"']+)"
+)
+_SKIPPED_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico",
+    ".css", ".js", ".zip", ".mp4", ".mp3",
+)  # fmt: skip
+_MAX_LISTED_LINKS = 50
+
+
+def _site(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _page_key(url: str) -> str:
+    # `www.` and bare hosts almost always serve the same pages
+    return url.replace("://www.", "://", 1)
+
+
+def extract_links(markdown: str, base_url: str) -> List[str]:
+    """
+    Extract the http(s) links of a scraped page, resolved against its URL.
+
+    Args:
+        markdown: The page content as markdown
+        base_url: The URL the page was scraped from
+
+    Returns:
+        Absolute link URLs in order of appearance, without duplicates
+    """
+    links = []
+    seen = set()
+    for match in _LINK_RE.finditer(markdown):
+        target = match.group(1) or match.group(2)
+        if target.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        url = urljoin(base_url, target)
+        if urlsplit(url).scheme not in ("http", "https"):
+            continue
+        if urlsplit(url).path.lower().endswith(_SKIPPED_EXTENSIONS):
+            continue
+        url = canonicalize_url(url)
+        if url not in seen:
+            seen.add(url)
+            links.append(url)
+    return links
+
+
+class CrawlFrontier:
+    """
+    Per-run crawl state for the scrape agent.
+
+    Tracks which pages were already scraped, limits the crawl to the starting
+    site (and its subdomains), and enforces page and link-depth budgets. The
+    starting URL has depth 0; links found on a page at depth d get depth d + 1.
+    URLs the model asks for without them having been seen on a page are
+    treated as one level below the start. A page whose scrape fails is
+    released, so it neither uses up the page budget nor blocks a retry.
+    """
+
+    def __init__(self, root_url: str, max_pages: int = 20, max_depth: int = 2):
+        self.root_url = canonicalize_url(root_url)
+        self.site = _site(self.root_url)
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        # Both keyed by `_page_key`
+        self.visited: Set[str] = set()
+        self.depths: Dict[str, int] = {_page_key(self.root_url): 0}
+
+    @property
+    def pages_left(self) -> int:
+        return max(0, self.max_pages - len(self.visited))
+
+    def in_scope(self, url: str) -> bool:
+        site = _site(url)
+        return site == self.site or site.endswith("." + self.site)
+
+    def admit(self, urls: List[str]) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Reserve pages to scrape from a batch of requested URLs.
+
+        Args:
+            urls: URLs requested by the model
+
+        Returns:
+            The canonical URLs to scrape, and the requested URLs that were
+            skipped mapped to the reason
+        """
+        admitted = []
+        skipped = {}
+        for url in urls:
+            canonical = canonicalize_url(url)
+            key = _page_key(canonical)
+            if key in self.visited:
+                skipped[url] = "already scraped"
+            elif not self.in_scope(canonical):
+                skipped[url] = f"outside {self.site}"
+            elif self.depths.get(key, 1) > self.max_depth:
+                skipped[url] = f"deeper than {self.max_depth} links from the start"
+            elif not self.pages_left:
+                skipped[url] = f"page budget of {self.max_pages} used up"
+            else:
+                self.visited.add(key)
+                self.depths.setdefault(key, 1)
+                admitted.append(canonical)
+        return admitted, skipped
+
+    def release(self, url: str) -> None:
+        """Give back a page admitted by `admit` that could not be scraped."""
+        self.visited.discard(_page_key(url))
+
+    def discover(self, page_url: str, markdown: str) -> List[str]:
+        """
+        Record the in-scope links of a scraped page.
+
+        Returns:
+            The links that can still be crawled (unvisited and within depth)
+        """
+        depth = self.depths.get(_page_key(page_url), 0) + 1
+        links = []
+        for link in extract_links(markdown, page_url):
+            key = _page_key(link)
+            if not self.in_scope(link) or key in self.visited:
+                continue
+            self.depths[key] = min(self.depths.get(key, depth), depth)
+            if self.depths[key] <= self.max_depth:
+                links.append(link)
+        return links
+
+
+async def crawl_pages(
+    urls: List[str],
+    frontier: CrawlFrontier,
+    scrape: Callable[[str], Awaitable[str]],
+    max_concurrency: int = 5,
+    query: Optional[str] = None,
+    max_tokens: int = 0,
+    chunk_tokens: int = 200,
+) -> str:
+    """
+    Scrape a batch of pages concurrently within the frontier's budgets.
+
+    Args:
+        urls: URLs requested by the model
+        frontier: The run's crawl state
+        scrape: Coroutine function returning a page's markdown
+        max_concurrency: Pages scraped at the same time
+        query: The question being answered, used to keep relevant passages
+        max_tokens: Token budget shared by the returned pages (0 for no limit)
+        chunk_tokens: Chunk size used when a page has to be cut down
+
+    Returns:
+        Each page's content under a heading with its URL, followed by the
+        skipped URLs and the unvisited links found on the scraped pages
+    """
+    admitted, skipped = frontier.admit(urls)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(url: str) -> Tuple[str, Optional[str], Optional[str]]:
+        async with semaphore:
+            try:
+                return url, await scrape(url), None
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                return url, None, str(e)
+
+    results = await asyncio.gather(
+        *(fetch(url) for url in admitted), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            # The model gets none of the batch, so all of it can be asked for again
+            for url in admitted:
+                frontier.release(url)
+            raise result
+
+    page_tokens = max_tokens // max(1, len(results))
+    sections = []
+    new_links: List[str] = []
+    for url, markdown, error in results:
+        if error is not None:
+            frontier.release(url)
+            sections.append(f"## Page: {url}\n\nError: {error}")
+            continue
+        # Links are collected before reduction drops the navigation
+        for link in frontier.discover(url, markdown):
+            if link not in new_links:
+                new_links.append(link)
+        if page_tokens:
+            markdown = reduce_content(markdown, query, page_tokens, chunk_tokens)
+        sections.append(f"## Page: {url}\n\n{markdown}")
+
+    if skipped:
+        lines = "\n".join(f"- {url}: {reason}" for url, reason in skipped.items())
+        sections.append(f"## Skipped\n\n{lines}")
+    if new_links and frontier.pages_left:
+        lines = "\n".join(f"- {link}" for link in new_links[:_MAX_LISTED_LINKS])
+        sections.append(
+            f"## Unvisited links ({frontier.pages_left} pages left)\n\n{lines}"
+        )
+    return "\n\n".join(sections)
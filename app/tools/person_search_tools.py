@@ -0,0 +1,236 @@
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from app.tools.url_tools import canonicalize_url
+
+_PROFILE_PATH_RE = re.compile(r"^/in/([^/]+)")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Words that say the person no longer holds the role
+_PAST_ROLE_RE = re.compile(r"\b(former|formerly|ex|previously|past|retired)\b")
+# Company name words that do not identify a company
+_COMPANY_STOPWORDS = {
+    "inc",
+    "llc",
+    "ltd",
+    "limited",
+    "corp",
+    "corporation",
+    "co",
+    "company",
+    "gmbh",
+    "plc",
+    "pt",
+    "tbk",
+    "the",
+}
+# Common role abbreviations, expanded so either spelling matches
+_ROLE_ABBREVIATIONS = {
+    "ceo": "chief executive officer",
+    "cto": "chief technology officer",
+    "cfo": "chief financial officer",
+    "coo": "chief operating officer",
+    "cmo": "chief marketing officer",
+    "cpo": "chief product officer",
+    "cio": "chief information officer",
+    "vp": "vice president",
+    "svp": "senior vice president",
+    "evp": "executive vice president",
+    "hr": "human resources",
+    "swe": "software engineer",
+}
+
+
+@dataclass
+class ProfileCandidate:
+    url: str
+    title: str
+    snippet: str
+    score: float
+
+
+def _words(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", text or "").casefold()
+    return _WORD_RE.findall(text)
+
+
+def _expand_role(words: List[str]) -> List[str]:
+    expanded = []
+    for word in words:
+        expanded.extend(_ROLE_ABBREVIATIONS.get(word, word).split())
+    return expanded
+
+
+def _coverage(terms: List[str], words: List[str]) -> float:
+    """Share of the distinct `terms` that appear in `words`."""
+    terms = set(terms)
+    if not terms:
+        return 0.0
+    return len(terms & set(words)) / len(terms)
+
+
+def company_name_from_url(company_url: str) -> str:
+    """
+    Guess a company's name from its LinkedIn company URL or website.
+
+    Args:
+        company_url: A LinkedIn company URL, a website URL or a plain name
+
+    Returns:
+        The name to search for (e.g. "acme robotics" for `/company/acme-robotics`)
+    """
+    if "." not in company_url and "/" not in company_url:
+        return company_url.strip()
+
+    parts = urlsplit(canonicalize_url(company_url))
+    segments = [s for s in parts.path.split("/") if s]
+    host = parts.hostname or ""
+    if host.endswith("linkedin.com") and len(segments) >= 2:
+        # Company slugs often end in a disambiguating number (e.g. acme-inc-123)
+        name = re.sub(r"[-_]+\d+$", "", segments[1])
+    else:
+        labels = [label for label in host.split(".") if label != "www"]
+        name = labels[0] if labels else company_url
+    return re.sub(r"[-_]+", " ", name).strip()
+
+
+def person_search_queries(company: str, role: str) -> List[str]:
+    """
+    Build the Serper queries for a person lookup, most specific first.
+
+    Args:
+        company: The company name
+        role: The role or job title
+
+    Returns:
+        The queries to try in order
+    """
+    return [
+        f'site:linkedin.com/in "{company}" "{role}"',
+        f"site:linkedin.com/in {company} {role}",
+    ]
+
+
+def canonicalize_profile_url(url: str) -> Optional[str]:
+    """
+    Normalize a LinkedIn profile URL to `https://www.linkedin.com/in/<id>`.
+
+    Country subdomains (e.g. `id.linkedin.com`) serve the same profile, so
+    they are dropped, and the id is lowercased since LinkedIn ignores its
+    case. Returns None for URLs that are not `linkedin.com/in/<id>` profiles.
+    """
+    parts = urlsplit(canonicalize_url(url))
+    host = parts.hostname or ""
+    if host != "linkedin.com" and not host.endswith(".linkedin.com"):
+        return None
+    match = _PROFILE_PATH_RE.match(parts.path)
+    if match is None:
+        return None
+    return f"https://www.linkedin.com/in/{match.group(1).lower()}"
+
+
+def rank_profiles(
+    results: Dict[str, Any], company: str, role: str
+) -> List[ProfileCandidate]:
+    """
+    Extract LinkedIn profiles from Serper search results and score them.
+
+    A profile scores by how much of the company name and of the role appears
+    in its result title (LinkedIn titles read "Name - Role - Company") and,
+    with less weight, its snippet. Roles mentioned as past ones are penalized
+    and higher-ranked results get a small bonus.
+
+    Args:
+        results: The Serper search response
+        company: The company name
+        role: The role or job title
+
+    Returns:
+        One candidate per profile, best first, with scores between 0 and 1
+    """
+    company_terms = [
+        w for w in _words(company) if w not in _COMPANY_STOPWORDS
+    ] or _words(company)
+    role_terms = _expand_role(_words(role))
+    organic = results.get("organic") or []
+
+    candidates = []
+    for rank, result in enumerate(organic):
+        url = canonicalize_profile_url(result.get("link") or "")
+        if url is None:
+            continue
+        title = result.get("title") or ""
+        snippet = result.get("snippet") or ""
+        title_words = _expand_role(_words(title))
+        snippet_words = _expand_role(_words(snippet))
+
+        company_match = max(
+            _coverage(company_terms, title_words),
+            0.6 * _coverage(company_terms, snippet_words),
+        )
+        role_match = max(
+            _coverage(role_terms, title_words),
+            0.6 * _coverage(role_terms, snippet_words),
+        )
+        score = 0.45 * company_match + 0.45 * role_match
+        score += 0.1 * (1 - rank / len(organic))
+        if _PAST_ROLE_RE.search(f"{title} {snippet}".casefold()):
+            score -= 0.2
+
+        score = max(0.0, min(1.0, score))
+        candidates.append(ProfileCandidate(url, title, snippet, score))
+
+    # A profile can show up more than once (e.g. on country subdomains),
+    # which canonicalization has mapped to the same URL
+    return merge_candidates(candidates)
+
+
+def merge_candidates(
+    *rankings: List[ProfileCandidate],
+) -> List[ProfileCandidate]:
+    """
+    Merge rankings from several searches into one candidate per profile.
+
+    Candidates are keyed on their canonical profile URL, so the same person
+    found on several country subdomains becomes one candidate, keeping its
+    best score and title and the distinct snippets of all its results.
+    """
+    merged: Dict[str, ProfileCandidate] = {}
+    for ranking in rankings:
+        for candidate in ranking:
+            url = canonicalize_profile_url(candidate.url) or candidate.url
+            current = merged.get(url)
+            if current is None:
+                merged[url] = ProfileCandidate(
+                    url, candidate.title, candidate.snippet, candidate.score
+                )
+                continue
+            snippet = current.snippet
+            if candidate.snippet not in snippet:
+                snippet = " | ".join(s for s in (snippet, candidate.snippet) if s)
+            best = candidate if candidate.score > current.score else current
+            merged[url] = ProfileCandidate(url, best.title, snippet, best.score)
+    return sorted(merged.values(), key=lambda c: c.score, reverse=True)
+
+
+def confident_match(
+    candidates: List[ProfileCandidate], min_score: float, min_margin: float
+) -> Optional[ProfileCandidate]:
+    """
+    Return the best candidate if it clearly matches, otherwise None.
+
+    Args:
+        candidates: Ranked candidates from `rank_profiles`
+        min_score: Score the best candidate must reach
+        min_margin: Lead the best candidate must have over the runner-up
+
+    Returns:
+        The confident match, if any
+    """
+    if not candidates or candidates[0].score < min_score:
+        return None
+    if len(candidates) > 1 and candidates[0].score - candidates[1].score < min_margin:
+        return None
+    return candidates[0]
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.tools.url_tools import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+def top_result_links(results: Dict[str, Any], n: int) -> List[str]:
+    """
+    Return the links of the first `n` organic results of a Serper search.
+
+    Args:
+        results: The Serper search response
+        n: Number of results to take
+
+    Returns:
+        The result URLs in rank order, without duplicates
+    """
+    links = []
+    for result in results.get("organic") or []:
+        link = result.get("link")
+        if link and link.startswith(("http://", "https://")) and link not in links:
+            links.append(link)
+        if len(links) >= n:
+            break
+    return links
+
+
+class ScrapePrefetcher:
+    """
+    Per-run store of speculative scrapes for the websearch agent.
+
+    When a search returns, its top result pages start scraping in the
+    background while the model decides what to do next. A later scrape of
+    one of those pages takes the prefetched result (waiting for it if it is
+    still in flight) instead of starting its own request. Prefetches the run
+    never used are cancelled by `close()` when the run ends.
+    """
+
+    def __init__(self, scrape: Callable[[str], Awaitable[str]]):
+        self.scrape = scrape
+        # Keyed by canonical URL: (task, start time)
+        self._pending: Dict[str, tuple] = {}
+        self._done_at: Dict[str, float] = {}
+        self.started = 0
+        self.hits = 0
+        self.failed = 0
+        self.unused = 0
+        self.saved_seconds = 0.0
+
+    def prefetch(self, urls: List[str]) -> None:
+        """Start scraping the pages in the background, skipping ones already started."""
+        for url in urls:
+            key = canonicalize_url(url)
+            if key in self._pending:
+                continue
+            task = asyncio.create_task(self.scrape(url))
+            task.add_done_callback(
+                lambda _, key=key: self._done_at.setdefault(key, time.perf_counter())
+            )
+            self._pending[key] = (task, time.perf_counter())
+            self.started += 1
+
+    async def get(self, url: str) -> Optional[str]:
+        """
+        Return the prefetched content of a page.
+
+        Returns:
+            The scraped content, or None when the page was not prefetched or
+            its prefetch failed (the caller then scrapes it itself)
+        """
+        key = canonicalize_url(url)
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return None
+        task, started_at = entry
+        requested_at = time.perf_counter()
+        try:
+            content = await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            self.failed += 1
+            return None
+        except Exception as e:
+            logger.info("Prefetch of %s failed: %r", url, e)
+            self.failed += 1
+            return None
+
+        self.hits += 1
+        # The part of the scrape that ran before the model asked for the page
+        done_at = self._done_at.pop(key, requested_at)
+        self.saved_seconds += min(requested_at, done_at) - started_at
+        return content
+
+    def close(self) -> None:
+        """Cancel the prefetches that were never used."""
+        for task, _ in self._pending.values():
+            if task.done():
+                # Retrieve the outcome so a failed prefetch is not logged as unhandled
+                if not task.cancelled():
+                    task.exception()
+            else:
+                task.cancel()
+            self.unused += 1
+        self._pending.clear()
+        self._done_at.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "failed": self.failed,
+            "unused": self.unused,
+            "saved_seconds": self.saved_seconds,
+        }
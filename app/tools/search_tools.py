@@ -1,6 +1,113 @@
-import requests
+import asyncio
 import json
-from typing import Dict, Any
+import logging
+from functools import lru_cache
+from typing import Dict, Any, Optional
+
+from app.config.settings import get_settings
+from app.services.cache_service import (
+    MemoryCache,
+    SQLiteCache,
+    TieredCache,
+    make_cache_key,
+)
+from app.services.corpus_service import get_local_corpus
+from app.services.http_service import get_http_client
+from app.services.rate_limit_service import (
+    get_rate_limiter,
+    raise_for_upstream_status,
+)
+from app.tools.url_tools import canonicalize_url, normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def get_serper_cache() -> Optional[TieredCache]:
+    """Return the shared Serper result cache, or None when caching is disabled."""
+    settings = get_settings()
+    if not settings.serper_cache_enabled:
+        return None
+
+    memory = MemoryCache(
+        max_entries=settings.serper_cache_max_entries,
+        max_bytes=settings.serper_cache_max_bytes,
+    )
+    disk = (
+        SQLiteCache(settings.serper_cache_sqlite_path)
+        if settings.serper_cache_sqlite_path
+        else None
+    )
+    return TieredCache(memory, disk)
+
+
+def _search_cache_key(query: str) -> str:
+    return make_cache_key("serper-search", normalize_query(query))
+
+
+def _scrape_cache_key(url: str) -> str:
+    return make_cache_key("serper-scrape", canonicalize_url(url))
+
+
+def _cache_get(key: str) -> Optional[Any]:
+    cache = get_serper_cache()
+    return cache.get(key) if cache is not None else None
+
+
+def _cache_set(key: str, value: Any, ttl: float) -> None:
+    cache = get_serper_cache()
+    if cache is not None:
+        cache.set(key, value, ttl=ttl)
+
+
+async def _acache_get(key: str) -> Optional[Any]:
+    cache = get_serper_cache()
+    return await cache.aget(key) if cache is not None else None
+
+
+async def _acache_set(key: str, value: Any, ttl: float) -> None:
+    cache = get_serper_cache()
+    if cache is not None:
+        await cache.aset(key, value, ttl=ttl)
+
+
+def _index_page(url: str, markdown: str) -> None:
+    """Add a scraped page to the local corpus, when it is enabled."""
+    corpus = get_local_corpus()
+    if corpus is None:
+        return
+    try:
+        corpus.add_page(url, markdown, get_settings().corpus_page_ttl)
+    except Exception:
+        logger.warning("Could not index %s in the local corpus", url, exc_info=True)
+
+
+def _index_search_results(results: Dict[str, Any]) -> None:
+    """Add the snippets of a search to the local corpus, when it is enabled."""
+    corpus = get_local_corpus()
+    if corpus is None:
+        return
+    try:
+        corpus.add_search_results(results, get_settings().corpus_snippet_ttl)
+    except Exception:
+        logger.warning(
+            "Could not index search results in the local corpus", exc_info=True
+        )
+
+
+def _serper_headers(api_key: str = None) -> Dict[str, str]:
+    return {
+        "X-API-KEY": api_key,
+        "Content-Type": "application/json",
+    }
+
+
+def _parse_scrape_response(text: str) -> Optional[str]:
+    try:
+        data = json.loads(text)
+        return data["markdown"]
+    except Exception:
+        return None
 
 
 def search_google(query: str, api_key: str = None) -> Dict[str, Any]:
@@ -13,18 +120,31 @@ def search_google(query: str, api_key: str = None) -> Dict[str, Any]:
 
     Returns:
         Search results as a dictionary
+
+    Raises:
+        RateLimitExceeded: If Serper still answers 429 after the retries
+        UpstreamError: If Serper still answers with another error
     """
-    url = "https://google.serper.dev/search"
+    # Only the legacy sync helpers use requests, so the API never imports it
+    import requests
 
-    payload = json.dumps({"q": query})
+    cache_key = _search_cache_key(query)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
 
-    headers = {
-        "X-API-KEY": api_key,
-        "Content-Type": "application/json",
-    }
+    url = get_settings().serper_search_url
 
-    response = requests.request("POST", url, headers=headers, data=payload)
-    return json.loads(response.text)
+    payload = json.dumps({"q": query})
+
+    response = requests.request(
+        "POST", url, headers=_serper_headers(api_key), data=payload
+    )
+    raise_for_upstream_status("serper", response)
+    results = json.loads(response.text)
+    _cache_set(cache_key, results, get_settings().serper_search_cache_ttl)
+    _index_search_results(results)
+    return results
 
 
 def scrape_website(url: str, api_key: str = None) -> str:
@@ -37,19 +157,109 @@ def scrape_website(url: str, api_key: str = None) -> str:
 
     Returns:
         Website content as markdown string
+
+    Raises:
+        RateLimitExceeded: If Serper still answers 429 after the retries
+        UpstreamError: If Serper still answers with another error
     """
-    api_url = "https://scrape.serper.dev"
+    import requests
+
+    cache_key = _scrape_cache_key(url)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    api_url = get_settings().serper_scrape_url
 
     payload = json.dumps({"url": url, "includeMarkdown": True})
 
-    headers = {
-        "X-API-KEY": api_key,
-        "Content-Type": "application/json",
-    }
+    response = requests.request(
+        "POST", api_url, headers=_serper_headers(api_key), data=payload
+    )
+    raise_for_upstream_status("serper", response)
+    markdown = _parse_scrape_response(response.text)
+    if markdown is None:
+        return response.text
+    _cache_set(cache_key, markdown, get_settings().serper_scrape_cache_ttl)
+    _index_page(url, markdown)
+    return markdown
 
-    response = requests.request("POST", api_url, headers=headers, data=payload)
-    try:
-        data = json.loads(response.text)
-        return data["markdown"]
-    except Exception:
+
+async def asearch_google(
+    query: str, api_key: str = None, client_key: str = None
+) -> Dict[str, Any]:
+    """
+    Search Google using the Serper API without blocking the event loop
+
+    Args:
+        query: The search query
+        api_key: Serper API key (optional)
+        client_key: Identifies the calling client for per-client rate limits (optional)
+
+    Returns:
+        Search results as a dictionary
+
+    Raises:
+        RateLimitExceeded: If Serper still answers 429 after the retries
+        UpstreamError: If Serper still answers with another error
+    """
+    cache_key = _search_cache_key(query)
+    cached = await _acache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    url = get_settings().serper_search_url
+
+    response = await get_rate_limiter("serper").request(
+        lambda: get_http_client().post(
+            url, headers=_serper_headers(api_key), json={"q": query}
+        ),
+        client_key,
+    )
+    raise_for_upstream_status("serper", response)
+    results = json.loads(response.text)
+    await _acache_set(cache_key, results, get_settings().serper_search_cache_ttl)
+    if get_local_corpus() is not None:
+        await asyncio.to_thread(_index_search_results, results)
+    return results
+
+
+async def ascrape_website(url: str, api_key: str = None, client_key: str = None) -> str:
+    """
+    Scrape a website using the Serper API without blocking the event loop
+
+    Args:
+        url: The URL to scrape
+        api_key: Serper API key (optional)
+        client_key: Identifies the calling client for per-client rate limits (optional)
+
+    Returns:
+        Website content as markdown string
+
+    Raises:
+        RateLimitExceeded: If Serper still answers 429 after the retries
+        UpstreamError: If Serper still answers with another error
+    """
+    cache_key = _scrape_cache_key(url)
+    cached = await _acache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    api_url = get_settings().serper_scrape_url
+
+    response = await get_rate_limiter("serper").request(
+        lambda: get_http_client().post(
+            api_url,
+            headers=_serper_headers(api_key),
+            json={"url": url, "includeMarkdown": True},
+        ),
+        client_key,
+    )
+    raise_for_upstream_status("serper", response)
+    markdown = _parse_scrape_response(response.text)
+    if markdown is None:
         return response.text
+    await _acache_set(cache_key, markdown, get_settings().serper_scrape_cache_ttl)
+    if get_local_corpus() is not None:
+        await asyncio.to_thread(_index_page, url, markdown)
+    return markdown
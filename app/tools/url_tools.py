@@ -0,0 +1,75 @@
+import re
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so equivalent spellings map to the same string.
+
+    Lowercases the scheme and host, drops default ports, fragments and empty
+    query parameters, sorts the query string and strips a trailing slash from
+    the path. URLs without a scheme are assumed to be https.
+
+    Args:
+        url: The URL to canonicalize
+
+    Returns:
+        The canonical URL
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if v))
+
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a free-text search query for use as a cache key.
+
+    Args:
+        query: The search query
+
+    Returns:
+        The query case-folded with Unicode and whitespace normalized
+    """
+    query = unicodedata.normalize("NFKC", query).casefold()
+    return _WHITESPACE_RE.sub(" ", query).strip()
+
+
+def canonicalize_linkedin_company_url(url: str) -> str:
+    """
+    Normalize a LinkedIn company URL to `https://www.linkedin.com/company/<slug>`.
+
+    Country subdomains (e.g. `id.linkedin.com`), sub-pages such as `/about`,
+    query strings and letter case are all dropped. URLs that do not look like
+    company pages are returned in their generic canonical form.
+
+    Args:
+        url: The LinkedIn company URL
+
+    Returns:
+        The canonical company URL
+    """
+    canonical = canonicalize_url(url)
+    parts = urlsplit(canonical)
+    segments = [s for s in parts.path.split("/") if s]
+    if not parts.hostname or not parts.hostname.endswith("linkedin.com"):
+        return canonical
+    if len(segments) < 2 or segments[0] not in ("company", "school", "showcase"):
+        return canonical
+
+    return f"https://www.linkedin.com/{segments[0]}/{segments[1].lower()}"
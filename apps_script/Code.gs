@@ -1,4 +1,6 @@
 const BASE_URL = "https://scrapify-ai.onrender.com";
+// Items per batch request; the chunks of a range are sent in parallel
+const BATCH_CHUNK_SIZE = 50;
 
 function onInstall(e) {
   onOpen(e);
@@ -53,56 +55,223 @@ function postRequest_(endpoint, payload) {
   return json.response || "";
 }
 
-function CHAT(query) {
-  return postRequest_("/api/chat", {
+/**
+ * Sends `items` to a batch endpoint in chunks of `BATCH_CHUNK_SIZE`, all at
+ * once with `UrlFetchApp.fetchAll`, and returns their results in item order.
+ * Every item of a chunk whose request failed gets that chunk's error.
+ */
+function postBatchRequest_(endpoint, items) {
+  const apiKey = getApiKey_();
+  const chunks = [];
+  for (let start = 0; start < items.length; start += BATCH_CHUNK_SIZE) {
+    chunks.push(items.slice(start, start + BATCH_CHUNK_SIZE));
+  }
+  const requests = chunks.map((chunk) => ({
+    url: BASE_URL + endpoint,
+    method: "post",
+    contentType: "application/json",
+    headers: {
+      "x-api-key": apiKey,
+    },
+    payload: JSON.stringify({ items: chunk }),
+    muteHttpExceptions: true,
+  }));
+
+  const responses = UrlFetchApp.fetchAll(requests);
+  return responses.reduce((results, res, k) => {
+    let json;
+    try {
+      json = JSON.parse(res.getContentText());
+    } catch (e) {
+      json = { detail: "HTTP " + res.getResponseCode() };
+    }
+    if (!json.results) {
+      const error = JSON.stringify(json.detail || json);
+      return results.concat(chunks[k].map(() => ({ error })));
+    }
+    return results.concat(json.results);
+  }, []);
+}
+
+/**
+ * Sends the non-empty cells of a range argument to a batch endpoint.
+ * `args` holds the custom function's arguments; the first one must be a range
+ * and the others are either ranges of the same shape or single values.
+ * Returns the results laid out like the first range, with "Error: ..." in
+ * cells whose item failed.
+ */
+function batchOverRange_(batchEndpoint, args, buildPayload, formatResult) {
+  const range = args[0];
+  const cells = [];
+  const items = [];
+  range.forEach((row, i) =>
+    row.forEach((value, j) => {
+      if (value === "" || value === null) return;
+      const cellArgs = args.map((arg) => (Array.isArray(arg) ? arg[i][j] : arg));
+      cells.push([i, j]);
+      items.push(buildPayload.apply(null, cellArgs));
+    })
+  );
+
+  const output = range.map((row) => row.map(() => ""));
+  if (items.length === 0) return output;
+
+  const results = postBatchRequest_(batchEndpoint, items);
+  results.forEach((result, k) => {
+    const [i, j] = cells[k];
+    output[i][j] = result.error
+      ? "Error: " + result.error
+      : formatResult(result.response);
+  });
+  return output;
+}
+
+function identity_(value) {
+  return value;
+}
+
+function chatPayload_(query) {
+  return {
     query,
     model: "gpt-4o-mini",
     temperature: 0.5,
-  });
+  };
 }
 
-function WEBSEARCH(query, searchInstructions) {
-  return postRequest_("/api/websearch", {
+function websearchPayload_(query, searchInstructions) {
+  return {
     query,
     search_instructions: searchInstructions || "",
     model: "gpt-4o-mini",
-  });
+  };
 }
 
-function SCRAPE_WEB(webUrl, query) {
-  return postRequest_("/api/scrape", {
+function scrapePayload_(webUrl, query) {
+  return {
     web_url: webUrl,
     query,
     model: "gpt-4o-mini",
-  });
+  };
 }
 
+function personLookupPayload_(companyUrl, role) {
+  return {
+    company_url: companyUrl,
+    role,
+  };
+}
+
+function companyRow_(response) {
+  return [
+    response.name,
+    response.linkedin_internal_id,
+    response.website,
+    response.industry,
+    response.company_size,
+    response.company_size_on_linkedin,
+    response.hq_location,
+    response.company_type,
+    response.founded_year,
+    response.tagline,
+  ];
+}
+
+/**
+ * Accepts a single query or a range, e.g. =CHAT(A2:A2000).
+ */
+function CHAT(query) {
+  if (Array.isArray(query)) {
+    return batchOverRange_("/api/batch/chat", [query], chatPayload_, identity_);
+  }
+  return postRequest_("/api/chat", chatPayload_(query));
+}
+
+/**
+ * Accepts a single query or a range, e.g. =WEBSEARCH(A2:A2000, B2:B2000).
+ */
+function WEBSEARCH(query, searchInstructions) {
+  if (Array.isArray(query)) {
+    return batchOverRange_(
+      "/api/batch/websearch",
+      [query, searchInstructions],
+      websearchPayload_,
+      identity_
+    );
+  }
+  return postRequest_(
+    "/api/websearch",
+    websearchPayload_(query, searchInstructions)
+  );
+}
+
+/**
+ * Accepts a single URL or a range, e.g. =SCRAPE_WEB(A2:A2000, "pricing?").
+ */
+function SCRAPE_WEB(webUrl, query) {
+  if (Array.isArray(webUrl)) {
+    return batchOverRange_(
+      "/api/batch/scrape",
+      [webUrl, query],
+      scrapePayload_,
+      identity_
+    );
+  }
+  return postRequest_("/api/scrape", scrapePayload_(webUrl, query));
+}
+
+/**
+ * Accepts a single URL or a single-column range, e.g.
+ * =COMPANY_LINKEDIN(A2:A2000). Each company fills one output row.
+ */
 function COMPANY_LINKEDIN(linkedinUrl) {
+  if (Array.isArray(linkedinUrl)) {
+    const urls = linkedinUrl.map((row) => row[0]);
+    const indexes = [];
+    const items = [];
+    urls.forEach((url, i) => {
+      if (url === "" || url === null) return;
+      indexes.push(i);
+      items.push({ linkedin_url: url });
+    });
+
+    const output = urls.map(() => companyRow_({}).map(() => ""));
+    if (items.length === 0) return output;
+
+    const results = postBatchRequest_("/api/batch/company", items);
+    results.forEach((result, k) => {
+      const row = output[indexes[k]];
+      if (result.error) {
+        row[0] = "Error: " + result.error;
+      } else {
+        output[indexes[k]] = companyRow_(result.response);
+      }
+    });
+    return output;
+  }
+
   const response = postRequest_("/api/company", {
     linkedin_url: linkedinUrl,
   });
   if (typeof response === "object") {
-    return [
-      [
-        response.name,
-        response.linkedin_internal_id,
-        response.website,
-        response.industry,
-        response.company_size,
-        response.company_size_on_linkedin,
-        response.hq_location,
-        response.company_type,
-        response.founded_year,
-        response.tagline,
-      ],
-    ];
+    return [companyRow_(response)];
   }
   return ["No response or invalid data"];
 }
 
+/**
+ * Accepts single values or ranges, e.g. =PERSON_LOOKUP(A2:A2000, B2:B2000).
+ */
 function PERSON_LOOKUP(companyUrl, role) {
-  return postRequest_("/api/person-lookup", {
-    company_url: companyUrl,
-    role,
-  });
+  if (Array.isArray(companyUrl)) {
+    return batchOverRange_(
+      "/api/batch/person-lookup",
+      [companyUrl, role],
+      personLookupPayload_,
+      identity_
+    );
+  }
+  return postRequest_(
+    "/api/person-lookup",
+    personLookupPayload_(companyUrl, role)
+  );
 }
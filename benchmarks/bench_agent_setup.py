@@ -0,0 +1,43 @@
+"""
+Microbenchmark of per-request agent setup overhead.
+
+Compares compiling a fresh ReAct graph for every request (the previous
+behaviour) with fetching the precompiled graph from the AgentService cache.
+No network calls are made.
+
+Usage:
+    python -m benchmarks.bench_agent_setup --iterations 200
+"""
+
+import argparse
+import time
+
+from app.services.agent_service import AgentService
+
+
+def _time_per_call(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    service = AgentService()
+    cases = {
+        "compile websearch": lambda: service.create_websearch_agent("gpt-4o", 0),
+        "cached websearch": lambda: service.get_websearch_agent("gpt-4o", 0),
+        "compile scrape": lambda: service.create_scrape_agent("gpt-4o", 0),
+        "cached scrape": lambda: service.get_scrape_agent("gpt-4o", 0),
+    }
+    for name, func in cases.items():
+        per_call = _time_per_call(func, args.iterations)
+        print(f"{name:>18}: {per_call * 1e6:10.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark scraped-markdown reduction on saved fixture pages.
+
+For each page in `benchmarks/fixtures` reports the token count of the raw
+markdown, after boilerplate removal, and after relevance chunking against a
+query, the time `reduce_content` takes, and whether the passage answering the
+query survived.
+
+Usage:
+    python -m benchmarks.bench_content_reduction --max-tokens 800 --iterations 50
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from app.tools.content_tools import count_tokens, reduce_content, strip_boilerplate
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# fixture file -> (query, text the reduced page must still contain)
+CASES = {
+    "company_team.md": ("Who is the VP of Sales at Northwind Robotics?", "VP of Sales"),
+    "pricing.md": ("Is there a free trial or minimum contract length?", "30-day pilot"),
+    "case_study.md": ("How many picks per hour did Harborline reach?", "212 picks"),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-tokens", type=int, default=800)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'page':<18} {'raw':>6} {'clean':>6} {'reduced':>7} {'saved':>6} "
+        f"{'ms':>6}  answer kept"
+    )
+    for name, (query, answer) in CASES.items():
+        markdown = (FIXTURES_DIR / name).read_text()
+        raw = count_tokens(markdown)
+        clean = count_tokens(strip_boilerplate(markdown))
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            reduced = reduce_content(markdown, query, args.max_tokens)
+        elapsed_ms = (time.perf_counter() - start) / args.iterations * 1000
+
+        tokens = count_tokens(reduced)
+        print(
+            f"{name:<18} {raw:>6} {clean:>6} {tokens:>7} {1 - tokens / raw:>6.0%} "
+            f"{elapsed_ms:>6.2f}  {answer in reduced}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark the local corpus: indexing, search latency, recall and eviction.
+
+Indexes the fixture pages plus `--pages` synthetic pages into a fresh corpus,
+then reports the indexing rate, local search latency percentiles, whether
+each fixture question ranks its own page first, and the corpus size. A
+second corpus capped at `--max-mb` is filled with the same pages to show
+eviction and compaction keeping it (and its file) bounded.
+
+Usage:
+    python -m benchmarks.bench_corpus --pages 2000 --searches 500
+    python -m benchmarks.bench_corpus --pages 5000 --max-mb 2
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.corpus_service import LocalCorpus
+from benchmarks.bench_content_reduction import CASES, FIXTURES_DIR
+
+TTL = 24 * 60 * 60
+VOCABULARY_SIZE = 20000
+COMMON_WORDS = 50  # The synthetic text's equivalent of stopwords
+
+
+def _vocabulary(rng: random.Random) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        "".join(rng.choices(letters, k=rng.randint(3, 10)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+
+# Word frequencies follow Zipf's law, as in natural text
+_ZIPF_WEIGHTS = [1 / rank for rank in range(1, VOCABULARY_SIZE + 1)]
+
+
+def _synthetic_page(rng: random.Random, words: list, i: int) -> str:
+    paragraphs = [
+        " ".join(rng.choices(words, _ZIPF_WEIGHTS, k=rng.randint(40, 90))) + "."
+        for _ in range(rng.randint(3, 8))
+    ]
+    return f"# Page {i}\n\n" + "\n\n".join(paragraphs)
+
+
+def _fill(corpus: LocalCorpus, pages: int, seed: int = 0) -> float:
+    """Index the fixtures and the synthetic pages; returns pages per second."""
+    rng = random.Random(seed)
+    words = _vocabulary(random.Random(seed))
+    start = time.perf_counter()
+    for name in CASES:
+        corpus.add_page(
+            f"https://fixtures.test/{name}", (FIXTURES_DIR / name).read_text(), TTL
+        )
+    for i in range(pages):
+        corpus.add_page(
+            f"https://site-{i % 50}.test/page-{i}", _synthetic_page(rng, words, i), TTL
+        )
+    return (pages + len(CASES)) / (time.perf_counter() - start)
+
+
+def _file_mb(path: str) -> float:
+    return (
+        sum(os.path.getsize(p) for p in Path(path).parent.glob(Path(path).name + "*"))
+        / 2**20
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--searches", type=int, default=500)
+    parser.add_argument("--max-mb", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.sqlite3")
+        corpus = LocalCorpus(path, max_bytes=2**40)
+        rate = _fill(corpus, args.pages)
+        print(f"{'indexing':>10}: {rate:.0f} pages/s")
+
+        rng = random.Random(1)
+        words = _vocabulary(random.Random(0))
+        latencies = []
+        for _ in range(args.searches):
+            # Like real queries, mostly content words rather than the most frequent ones
+            query = " ".join(
+                rng.choices(words[COMMON_WORDS:], _ZIPF_WEIGHTS[COMMON_WORDS:], k=4)
+            )
+            start = time.perf_counter()
+            corpus.search(query, limit=5)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(
+            f"{'search':>10}: p50={statistics.median(latencies) * 1000:.2f}ms "
+            f"p95={latencies[int(len(latencies) * 0.95)] * 1000:.2f}ms "
+            f"over {corpus.stats()['documents']} documents"
+        )
+
+        for name, (query, _) in CASES.items():
+            passages = corpus.search(query, limit=5)
+            top = passages[0].url if passages else "nothing"
+            hit = top.endswith(name)
+            print(f"{'recall':>10}: {query!r} -> {'ok' if hit else 'MISS ' + top}")
+
+        stats = corpus.stats()
+        print(
+            f"{'size':>10}: {stats['bytes'] / 2**20:.1f}MB of text, file {_file_mb(path):.1f}MB"
+        )
+        corpus.close()
+
+        path = os.path.join(tmp, "capped.sqlite3")
+        corpus = LocalCorpus(path, max_bytes=int(args.max_mb * 2**20))
+        _fill(corpus, args.pages)
+        stats = corpus.stats()
+        print(
+            f"{'capped':>10}: {stats['documents']} documents, "
+            f"{stats['bytes'] / 2**20:.2f}MB of text (limit {args.max_mb}MB), "
+            f"file {_file_mb(path):.1f}MB, {stats['evictions']} evictions in "
+            f"{stats['compactions']} compactions"
+        )
+        corpus.close()
+
+
+if __name__ == "__main__":
+    main()
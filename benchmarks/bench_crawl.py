@@ -0,0 +1,62 @@
+"""
+Benchmark the scrape agent's crawl step, sequential vs concurrent.
+
+Scrapes the same set of pages through `crawl_pages` once with a concurrency
+of 1 (one page per round trip, like following links one by one) and once
+with the configured parallelism, against a fake Serper with fixed latency.
+
+Usage:
+    python -m benchmarks.bench_crawl --pages 10 --concurrency 5 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.fake_upstreams import FakeServer, create_serper_app
+
+
+async def _run_crawl(n_pages: int, concurrency: int) -> float:
+    from app.services.http_service import close_http_client
+    from app.tools.crawl_tools import CrawlFrontier, crawl_pages
+    from app.tools.search_tools import ascrape_website, get_serper_cache
+
+    get_serper_cache().clear()
+    frontier = CrawlFrontier("https://example.com", max_pages=n_pages)
+    urls = [f"https://example.com/page-{i}" for i in range(n_pages)]
+
+    async def scrape(url: str) -> str:
+        return await ascrape_website(url, "bench-key")
+
+    try:
+        start = time.perf_counter()
+        await crawl_pages(urls, frontier, scrape, concurrency)
+        return time.perf_counter() - start
+    finally:
+        await close_http_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with FakeServer(create_serper_app(latency=args.latency)) as server:
+        os.environ["SERPER_SCRAPE_URL"] = f"{server.base_url}/scrape"
+        from app.config.settings import get_settings
+
+        get_settings.cache_clear()
+
+        for name, concurrency in (("sequential", 1), ("concurrent", args.concurrency)):
+            elapsed = asyncio.run(_run_crawl(args.pages, concurrency))
+            print(
+                f"{name:>10}: {args.pages} pages in {elapsed:.2f}s "
+                f"(concurrency {concurrency})"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Chat call latency with cold vs warm OpenAI clients.
+
+Drives `LLMService.generate_response` against a local fake OpenAI server.
+Cold calls drop every pooled client and connection first (the previous
+per-request behaviour); warm calls reuse the registry entry for the key.
+
+Usage:
+    python -m benchmarks.bench_llm_clients --calls 200 --latency 0.01
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.fake_upstreams import FakeServer, create_openai_app
+
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _measure(calls: int, cold: bool) -> list:
+    from app.services.llm_service import LLMService
+
+    service = LLMService()
+    samples = []
+    for i in range(calls):
+        if cold:
+            await service.client_registry.aclose()
+        start = time.perf_counter()
+        await service.generate_response(f"Hello {i}", api_key="sk-bench")
+        samples.append(time.perf_counter() - start)
+    await service.client_registry.aclose()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with FakeServer(create_openai_app(latency=args.latency)) as server:
+        os.environ["OPENAI_BASE_URL"] = f"{server.base_url}/v1"
+        from app.config.settings import get_settings
+
+        get_settings.cache_clear()
+
+        for name, cold in (("cold", True), ("warm", False)):
+            samples = asyncio.run(_measure(args.calls, cold))
+            print(
+                f"{name}: p50={_percentile(samples, 50) * 1000:.1f}ms "
+                f"p99={_percentile(samples, 99) * 1000:.1f}ms "
+                f"mean={statistics.mean(samples) * 1000:.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
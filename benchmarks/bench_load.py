@@ -0,0 +1,391 @@
+"""
+Load test every API endpoint against local fake upstreams.
+
+Starts fake OpenAI, Serper and Proxycurl servers, then drives each endpoint of
+`app.main` in-process (through its ASGI interface, with the app's lifespan
+running) at a fixed concurrency. For every endpoint it reports throughput,
+latency percentiles, HTTP status counts, event-loop lag and process memory.
+Job endpoints are measured from submission until the job finishes.
+
+Results are written as JSON (`--output`) so runs can be compared across
+commits; `--compare` prints the change against an earlier result file.
+
+Per-client upstream rate limits are disabled unless set in the environment,
+since every simulated client shares a handful of API keys; the
+upstream-wide limits stay as configured. The Serper and response caches are
+disabled unless `--cache` is given, so every request exercises the upstream
+path (company URLs are unique per request, so Proxycurl lookups always miss).
+
+Usage:
+    python -m benchmarks.bench_load --requests 50 --concurrency 10
+    python -m benchmarks.bench_load --endpoints chat,websearch --error-rate 0.05 \\
+        --output results.json --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_upstreams import (
+    FakeServer,
+    create_openai_app,
+    create_proxycurl_app,
+    create_serper_app,
+)
+
+API_KEYS = [f"sk-load-{i}" for i in range(8)]
+JOB_POLL_INTERVAL = 0.05
+LOOP_LAG_INTERVAL = 0.01
+
+# (method, path, body factory for request i); None bodies are sent as GETs
+Scenario = Tuple[str, str, Optional[Callable[[int], dict]]]
+
+
+def _chat(i: int) -> dict:
+    return {"query": f"Summarize fact number {i}", "temperature": 0.5}
+
+
+def _websearch(i: int) -> dict:
+    return {"query": f"Who founded company {i}?", "temperature": 0.5}
+
+
+def _person_lookup(i: int) -> dict:
+    return {
+        "company_url": f"https://company-{i}.com",
+        "role": "CTO",
+        "temperature": 0.5,
+    }
+
+
+def _scrape(i: int) -> dict:
+    return {
+        "web_url": f"https://company-{i}.com",
+        "query": "What does the company sell?",
+        "temperature": 0.5,
+    }
+
+
+def _company(i: int) -> dict:
+    return {"linkedin_url": f"https://www.linkedin.com/company/company-{i}"}
+
+
+def _batch(make_item: Callable[[int], dict], size: int) -> Callable[[int], dict]:
+    return lambda i: {"items": [make_item(i * size + j) for j in range(size)]}
+
+
+def build_scenarios(batch_size: int) -> Dict[str, Scenario]:
+    return {
+        "chat": ("POST", "/api/chat", _chat),
+        "chat_stream": ("POST", "/api/chat/stream", _chat),
+        "websearch": ("POST", "/api/websearch", _websearch),
+        "websearch_stream": ("POST", "/api/websearch/stream", _websearch),
+        "person_lookup": ("POST", "/api/person-lookup", _person_lookup),
+        "scrape": ("POST", "/api/scrape", _scrape),
+        "scrape_stream": ("POST", "/api/scrape/stream", _scrape),
+        "company": ("POST", "/api/company", _company),
+        "batch_chat": ("POST", "/api/batch/chat", _batch(_chat, batch_size)),
+        "batch_websearch": (
+            "POST",
+            "/api/batch/websearch",
+            _batch(_websearch, batch_size),
+        ),
+        "batch_person_lookup": (
+            "POST",
+            "/api/batch/person-lookup",
+            _batch(_person_lookup, batch_size),
+        ),
+        "batch_scrape": ("POST", "/api/batch/scrape", _batch(_scrape, batch_size)),
+        "batch_company": (
+            "POST",
+            "/api/batch/company",
+            _batch(_company, batch_size),
+        ),
+        "job_websearch": ("POST", "/api/jobs/websearch", _websearch),
+        "job_person_lookup": ("POST", "/api/jobs/person-lookup", _person_lookup),
+        "job_scrape": ("POST", "/api/jobs/scrape", _scrape),
+        "rate_limits": ("GET", "/api/rate-limits", None),
+        "metrics": ("GET", "/metrics", None),
+        "health": ("GET", "/health", None),
+    }
+
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary_ms(samples: list) -> Dict[str, float]:
+    if not samples:
+        return {}
+    return {
+        "p50": round(_percentile(samples, 50) * 1000, 2),
+        "p95": round(_percentile(samples, 95) * 1000, 2),
+        "p99": round(_percentile(samples, 99) * 1000, 2),
+        "max": round(max(samples) * 1000, 2),
+        "mean": round(statistics.mean(samples) * 1000, 2),
+    }
+
+
+def _rss_mb() -> float:
+    # Current resident set size; falls back to the peak where /proc is missing
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and kilobytes on Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+async def _monitor_loop_lag(samples: list, stop: asyncio.Event) -> None:
+    """Record how late the event loop wakes up from a fixed short sleep."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        samples.append(max(0.0, time.perf_counter() - start - LOOP_LAG_INTERVAL))
+
+
+async def _send(
+    client: httpx.AsyncClient, scenario: Scenario, i: int
+) -> Tuple[int, Optional[str]]:
+    """Send request i of a scenario; job submissions are polled until done."""
+    method, path, make_body = scenario
+    headers = {"X-API-Key": API_KEYS[i % len(API_KEYS)]}
+    if make_body is None:
+        response = await client.request(method, path, headers=headers)
+    else:
+        response = await client.request(
+            method, path, json=make_body(i), headers=headers
+        )
+
+    if not path.startswith("/api/jobs/") or response.status_code != 202:
+        return response.status_code, None
+
+    job_id = response.json()["job_id"]
+    while True:
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        job = (await client.get(f"/api/jobs/{job_id}", headers=headers)).json()
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return response.status_code, job["status"]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int
+) -> Dict[str, Any]:
+    """
+    Send `requests` requests with `concurrency` workers and summarize them.
+
+    Returns:
+        The scenario's throughput, latency, status counts, loop lag and memory
+    """
+    latencies: list = []
+    statuses: Dict[str, int] = {}
+    lag: list = []
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                status, job_status = await _send(client, scenario, i)
+                label = job_status or str(status)
+            except Exception as e:
+                label = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[label] = statuses.get(label, 0) + 1
+
+    rss_start = _rss_mb()
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_loop_lag(lag, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+
+    ok = sum(
+        count
+        for label, count in statuses.items()
+        if label == "succeeded" or label.startswith("2")
+    )
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "ok": ok,
+        "statuses": statuses,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2),
+        "latency_ms": _summary_ms(latencies),
+        "loop_lag_ms": _summary_ms(lag),
+        "rss_mb": {
+            "start": round(rss_start, 1),
+            "end": round(_rss_mb(), 1),
+            "peak": round(_peak_rss_mb(), 1),
+        },
+    }
+
+
+async def run_load_test(
+    scenarios: Dict[str, Scenario], requests: int, concurrency: int, warmup: int = 1
+) -> Dict[str, Any]:
+    from app.main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://app", timeout=None
+        ) as client:
+            for name, scenario in scenarios.items():
+                # Unmeasured requests so one-time setup (agent graph compilation,
+                # client creation, lazy imports) does not skew the percentiles
+                for i in range(warmup):
+                    await _send(client, scenario, -1 - i)
+                results[name] = await run_scenario(
+                    client, scenario, requests, concurrency
+                )
+                print(_format_result(name, results[name]), flush=True)
+    return results
+
+
+def _format_result(name: str, result: Dict[str, Any]) -> str:
+    latency = result["latency_ms"]
+    return (
+        f"{name:>20}: {result['throughput_rps']:8.1f} req/s  "
+        f"p50={latency['p50']:.0f}ms p95={latency['p95']:.0f}ms "
+        f"p99={latency['p99']:.0f}ms  "
+        f"lag p99={result['loop_lag_ms'].get('p99', 0):.1f}ms  "
+        f"ok={result['ok']}/{result['requests']}"
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print throughput and p95 latency changes against a baseline run."""
+    print(f"\nChange vs {baseline['meta'].get('commit') or 'baseline'}:")
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        rps = result["throughput_rps"] / (before["throughput_rps"] or 1) - 1
+        p95 = result["latency_ms"]["p95"] / (before["latency_ms"]["p95"] or 1) - 1
+        print(f"{name:>20}: throughput {rps:+7.1%}  p95 latency {p95:+7.1%}")
+
+
+def main() -> None:
+    scenarios = build_scenarios(batch_size=1)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50, help="Per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--endpoints",
+        default="all",
+        help=f"Comma-separated subset of: {', '.join(scenarios)}",
+    )
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Unmeasured requests per endpoint"
+    )
+    parser.add_argument("--openai-latency", type=float, default=0.05)
+    parser.add_argument("--serper-latency", type=float, default=0.2)
+    parser.add_argument("--proxycurl-latency", type=float, default=0.5)
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of upstream 503s"
+    )
+    parser.add_argument("--cache", action="store_true", help="Keep caches enabled")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    scenarios = build_scenarios(args.batch_size)
+    if args.endpoints != "all":
+        names = args.endpoints.split(",")
+        unknown = [name for name in names if name not in scenarios]
+        if unknown:
+            parser.error(f"Unknown endpoints: {', '.join(unknown)}")
+        scenarios = {name: scenarios[name] for name in names}
+
+    with ExitStack() as stack:
+        openai = stack.enter_context(
+            FakeServer(create_openai_app(args.openai_latency, args.error_rate))
+        )
+        serper = stack.enter_context(
+            FakeServer(create_serper_app(args.serper_latency, args.error_rate))
+        )
+        proxycurl = stack.enter_context(
+            FakeServer(create_proxycurl_app(args.proxycurl_latency, args.error_rate))
+        )
+        os.environ.update(
+            OPENAI_BASE_URL=f"{openai.base_url}/v1",
+            SERPER_API_KEY="bench-key",
+            SERPER_SEARCH_URL=f"{serper.base_url}/search",
+            SERPER_SCRAPE_URL=f"{serper.base_url}/scrape",
+            PROXYCURL_API_KEY="bench-key",
+            PROXYCURL_API_URL=f"{proxycurl.base_url}/proxycurl/api/linkedin/company",
+        )
+        for upstream in ("SERPER", "PROXYCURL", "OPENAI"):
+            os.environ.setdefault(f"{upstream}_CLIENT_RATE_LIMIT", "0")
+        if not args.cache:
+            os.environ.update(
+                SERPER_CACHE_ENABLED="false",
+                RESPONSE_CACHE_ENABLED="false",
+                PROXYCURL_CACHE_SQLITE_PATH="",
+            )
+        from app.config.settings import get_settings
+
+        get_settings.cache_clear()
+
+        results = asyncio.run(
+            run_load_test(scenarios, args.requests, args.concurrency, args.warmup)
+        )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark speculative prefetching of top search results in websearch runs.
+
+Runs the websearch agent against fake OpenAI and Serper servers whose model
+searches, then scrapes the top result, then answers (the usual shape of a
+websearch run). The same runs are made with prefetching off and on, and the
+report gives the run latency of both, the prefetch hit rate and the scrape
+time the prefetches saved. Serper and response caches are disabled so every
+run reaches the upstreams.
+
+Usage:
+    python -m benchmarks.bench_prefetch --runs 20 --concurrency 5
+    python -m benchmarks.bench_prefetch --openai-latency 1.0 --serper-latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, List
+
+from benchmarks.fake_upstreams import FakeServer, create_openai_app, create_serper_app
+
+
+def _counter_values(counter) -> Dict[str, float]:
+    return {
+        ",".join(labels.values()) or "total": value
+        for _, labels, value in counter.samples()
+    }
+
+
+async def _run_batch(
+    prefetch: bool, runs: int, concurrency: int, top_n: int
+) -> Dict[str, Any]:
+    from app.config.settings import get_settings
+    from app.services.agent_service import AgentService
+    from app.services.metrics_service import (
+        SCRAPE_PREFETCHES,
+        SCRAPE_PREFETCH_SAVED_SECONDS,
+    )
+
+    os.environ["PREFETCH_ENABLED"] = str(prefetch).lower()
+    os.environ["PREFETCH_TOP_N"] = str(top_n)
+    get_settings.cache_clear()
+    service = AgentService()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def run(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await service.run_websearch_agent(
+                f"Who founded company {i}?", "sk-bench", temperature=0
+            )
+            latencies.append(time.perf_counter() - start)
+
+    # One unmeasured run compiles the agent graph and creates the clients
+    await run(-1)
+    latencies.clear()
+    before = _counter_values(SCRAPE_PREFETCHES)
+    saved_before = _counter_values(SCRAPE_PREFETCH_SAVED_SECONDS).get("total", 0.0)
+    start = time.perf_counter()
+    await asyncio.gather(*(run(i) for i in range(runs)))
+    elapsed = time.perf_counter() - start
+
+    after = _counter_values(SCRAPE_PREFETCHES)
+    outcomes = {k: after.get(k, 0) - before.get(k, 0) for k in after}
+    saved = (
+        _counter_values(SCRAPE_PREFETCH_SAVED_SECONDS).get("total", 0.0) - saved_before
+    )
+    return {
+        "elapsed": elapsed,
+        "p50": statistics.median(latencies),
+        "mean": statistics.mean(latencies),
+        "outcomes": outcomes,
+        "saved": saved,
+    }
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from app.services.lifecycle_service import (
+        close_shared_resources,
+        open_shared_resources,
+    )
+
+    open_shared_resources()
+    try:
+        results = {}
+        for name, prefetch in (("off", False), ("on", True)):
+            results[name] = await _run_batch(
+                prefetch, args.runs, args.concurrency, args.top_n
+            )
+            result = results[name]
+            print(
+                f"prefetch {name:>3}: {args.runs} runs in {result['elapsed']:.2f}s  "
+                f"p50={result['p50'] * 1000:.0f}ms mean={result['mean'] * 1000:.0f}ms"
+            )
+    finally:
+        await close_shared_resources()
+
+    outcomes = results["on"]["outcomes"]
+    hits = outcomes.get("hit", 0)
+    started = sum(outcomes.values())
+    print(
+        f"{'hit rate':>12}: {hits / (started or 1):.0%} of {started:.0f} prefetches "
+        f"({outcomes.get('unused', 0):.0f} unused, {outcomes.get('failed', 0):.0f} failed)"
+    )
+    print(
+        f"{'saved':>12}: {results['on']['saved'] / args.runs * 1000:.0f}ms of scrape "
+        f"time per run; mean run latency "
+        f"{results['on']['mean'] / results['off']['mean'] - 1:+.1%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--top-n", type=int, default=3, help="Results prefetched")
+    parser.add_argument("--openai-latency", type=float, default=0.5)
+    parser.add_argument("--serper-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        openai = stack.enter_context(
+            FakeServer(create_openai_app(args.openai_latency, use_every_tool=True))
+        )
+        serper = stack.enter_context(FakeServer(create_serper_app(args.serper_latency)))
+        os.environ.update(
+            OPENAI_BASE_URL=f"{openai.base_url}/v1",
+            SERPER_API_KEY="bench-key",
+            SERPER_SEARCH_URL=f"{serper.base_url}/search",
+            SERPER_SCRAPE_URL=f"{serper.base_url}/scrape",
+            SERPER_CACHE_ENABLED="false",
+            RESPONSE_CACHE_ENABLED="false",
+            SERPER_CLIENT_RATE_LIMIT="0",
+            OPENAI_CLIENT_RATE_LIMIT="0",
+        )
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
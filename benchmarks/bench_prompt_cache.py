@@ -0,0 +1,131 @@
+"""
+Benchmark agent prompt sizes and prompt cache hits with history compaction.
+
+Runs the websearch agent against fake OpenAI and Serper servers whose model
+alternates searches and scrapes of full-size pages for `--tool-turns` steps
+before answering. The fake OpenAI server reports cached prompt tokens the way
+OpenAI's automatic prefix caching does. The same runs are made with history
+compaction off and on, and the report gives the prompt tokens per step and
+per run and the share of them served from the cache. Serper and response
+caches are disabled so every run reaches the upstreams.
+
+Usage:
+    python -m benchmarks.bench_prompt_cache --runs 10 --tool-turns 6
+    python -m benchmarks.bench_prompt_cache --page-words 3000 --history-tokens 300
+"""
+
+import argparse
+import asyncio
+import os
+from contextlib import ExitStack
+from typing import Any, Dict
+
+from benchmarks.fake_upstreams import FakeServer, create_openai_app, create_serper_app
+
+
+def _sample_values(metric, agent: str) -> Dict[str, float]:
+    return {
+        name: value
+        for name, labels, value in metric.samples()
+        if labels.get("agent") == agent and "le" not in labels
+    }
+
+
+async def _run_batch(history_tokens: int, runs: int) -> Dict[str, Any]:
+    from app.config.settings import get_settings
+    from app.services.agent_service import AgentService
+    from app.services.metrics_service import (
+        AGENT_CACHED_PROMPT_TOKENS,
+        AGENT_STEP_PROMPT_TOKENS,
+    )
+
+    os.environ["AGENT_HISTORY_TOOL_TOKENS"] = str(history_tokens)
+    get_settings.cache_clear()
+    service = AgentService()
+
+    def totals() -> Dict[str, float]:
+        steps = _sample_values(AGENT_STEP_PROMPT_TOKENS, "websearch")
+        cached = _sample_values(AGENT_CACHED_PROMPT_TOKENS, "websearch")
+        return {
+            "prompt": steps.get("agent_step_prompt_tokens_sum", 0.0),
+            "steps": steps.get("agent_step_prompt_tokens_count", 0.0),
+            "cached": cached.get("agent_cached_prompt_tokens_total", 0.0),
+        }
+
+    before = totals()
+    for i in range(runs):
+        # Runs are sequential so each one's steps reach the cache in order
+        await service.run_websearch_agent(
+            f"Which terms describe company {i}?", "sk-bench", temperature=0
+        )
+    after = totals()
+    return {k: after[k] - before[k] for k in after}
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from app.services.lifecycle_service import (
+        close_shared_resources,
+        open_shared_resources,
+    )
+
+    open_shared_resources()
+    try:
+        results = {}
+        for name, history_tokens in (("off", 0), ("on", args.history_tokens)):
+            results[name] = result = await _run_batch(history_tokens, args.runs)
+            print(
+                f"compaction {name:>3}: "
+                f"{result['prompt'] / result['steps']:.0f} prompt tokens per step, "
+                f"{result['prompt'] / args.runs:.0f} per run, "
+                f"{result['cached'] / result['prompt']:.0%} served from the cache"
+            )
+    finally:
+        await close_shared_resources()
+
+    off, on = results["off"], results["on"]
+    print(
+        f"{'saved':>14}: {1 - on['prompt'] / off['prompt']:.0%} of prompt tokens, "
+        f"{1 - (on['prompt'] - on['cached']) / (off['prompt'] - off['cached']):.0%} "
+        "of uncached prompt tokens"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--tool-turns", type=int, default=6)
+    parser.add_argument("--page-words", type=int, default=2000)
+    parser.add_argument(
+        "--history-tokens",
+        type=int,
+        default=500,
+        help="Tokens kept of each read tool result when compaction is on",
+    )
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        openai = stack.enter_context(
+            FakeServer(
+                create_openai_app(0, tool_turns=args.tool_turns, prompt_cache=True)
+            )
+        )
+        serper = stack.enter_context(
+            FakeServer(create_serper_app(0, page_words=args.page_words))
+        )
+        os.environ.update(
+            OPENAI_BASE_URL=f"{openai.base_url}/v1",
+            SERPER_API_KEY="bench-key",
+            SERPER_SEARCH_URL=f"{serper.base_url}/search",
+            SERPER_SCRAPE_URL=f"{serper.base_url}/scrape",
+            SERPER_CACHE_ENABLED="false",
+            RESPONSE_CACHE_ENABLED="false",
+            SERPER_CLIENT_RATE_LIMIT="0",
+            OPENAI_CLIENT_RATE_LIMIT="0",
+            AGENT_MAX_STEPS=str(args.tool_turns + 2),
+            AGENT_MAX_TOOL_CALLS=str(args.tool_turns + 2),
+        )
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
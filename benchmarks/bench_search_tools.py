@@ -0,0 +1,81 @@
+"""
+Benchmark concurrent Serper tool throughput, blocking vs async.
+
+Each simulated request handler runs inside the event loop the same way the
+agent tools do. The blocking variant calls `search_google`/`scrape_website`
+directly (what the sync tools did), the async variant awaits
+`asearch_google`/`ascrape_website` on the shared connection pool. The cold
+runs start from an empty Serper cache; the warm run repeats the async run so
+every call is a cache hit.
+
+Usage:
+    python -m benchmarks.bench_search_tools --requests 50 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.fake_upstreams import FakeServer, create_serper_app
+
+
+async def _run_blocking(n_requests: int) -> float:
+    from app.tools.search_tools import search_google, scrape_website
+
+    async def handler(i: int) -> None:
+        search_google(f"query {i}", "bench-key")
+        scrape_website(f"https://example.com/{i}", "bench-key")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(n_requests)))
+    return time.perf_counter() - start
+
+
+async def _run_async(n_requests: int) -> float:
+    from app.tools.search_tools import asearch_google, ascrape_website
+    from app.services.http_service import close_http_client
+
+    async def handler(i: int) -> None:
+        await asearch_google(f"query {i}", "bench-key")
+        await ascrape_website(f"https://example.com/{i}", "bench-key")
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(handler(i) for i in range(n_requests)))
+        return time.perf_counter() - start
+    finally:
+        await close_http_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with FakeServer(create_serper_app(latency=args.latency)) as server:
+        os.environ["SERPER_SEARCH_URL"] = f"{server.base_url}/search"
+        os.environ["SERPER_SCRAPE_URL"] = f"{server.base_url}/scrape"
+        from app.config.settings import get_settings
+
+        get_settings.cache_clear()
+
+        from app.tools.search_tools import get_serper_cache
+
+        for name, runner, warm in (
+            ("blocking", _run_blocking, False),
+            ("async", _run_async, False),
+            ("cached", _run_async, True),
+        ):
+            if not warm:
+                get_serper_cache().clear()
+            elapsed = asyncio.run(runner(args.requests))
+            print(
+                f"{name:>8}: {args.requests} requests in {elapsed:.2f}s "
+                f"({args.requests / elapsed:.1f} req/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
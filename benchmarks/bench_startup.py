@@ -0,0 +1,181 @@
+"""
+Benchmark the API's cold start.
+
+Measures, each in a fresh interpreter: how long `import app.main` takes and
+which heavy libraries that import pulls in, and the time from spawning a
+uvicorn server until `/health` first answers 200. The reported figure is the
+median over `--runs` runs.
+
+Results are written as JSON (`--output`) so runs can be compared across
+commits; `--compare` prints the change against an earlier result file.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --no-warmup --output startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.bench_load import _git_commit
+
+# Libraries the API should only load once an endpoint needs them
+HEAVY_MODULES = (
+    "openai",
+    "instructor",
+    "langchain_core",
+    "langchain_openai",
+    "langgraph",
+)
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+HEALTH_POLL_INTERVAL = 0.01
+HEALTH_TIMEOUT = 60.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: Dict[str, str]) -> Dict[str, Any]:
+    """Import `app.main` in a fresh interpreter and report how long it took."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_first_healthy(env: Dict[str, str]) -> float:
+    """Start a uvicorn server and return the seconds until `/health` answers 200."""
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - start < HEALTH_TIMEOUT:
+                if server.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {server.returncode}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(HEALTH_POLL_INTERVAL)
+        raise RuntimeError(f"/health did not answer within {HEALTH_TIMEOUT}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def _format_result(name: str, summary: Dict[str, float]) -> str:
+    return (
+        f"{name:>14}: median {summary['median_ms']:.0f}ms  "
+        f"(min {summary['min_ms']:.0f}ms, max {summary['max_ms']:.0f}ms)"
+    )
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print median changes against a baseline run."""
+    print(f"\nChange vs {baseline['meta'].get('commit') or 'baseline'}:")
+    for name in ("import", "first_healthy"):
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        change = results[name]["median_ms"] / (before["median_ms"] or 1) - 1
+        print(f"{name:>14}: median {change:+7.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--no-warmup",
+        action="store_true",
+        help="Disable the background preload of the LLM and agent libraries",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [os.getcwd(), env.get("PYTHONPATH")])
+    )
+    if args.no_warmup:
+        env["WARMUP_ENABLED"] = "false"
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    healthy = [measure_first_healthy(env) for _ in range(args.runs)]
+    results = {
+        "import": _summary([run["seconds"] for run in imports]),
+        "first_healthy": _summary(healthy),
+        "heavy_modules_loaded": imports[-1]["loaded"],
+    }
+    for name in ("import", "first_healthy"):
+        print(_format_result(name, results[name]))
+    print(f"{'heavy modules':>14}: {', '.join(imports[-1]['loaded']) or 'none'}")
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Local stand-ins for the upstream APIs used by Scrapify AI.
+
+The fakes only mimic the parts of each API the app relies on and add a
+configurable artificial latency and error rate, so benchmarks measure our own
+overhead and concurrency behaviour instead of the real upstreams.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import socket
+import threading
+import time
+from typing import Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+
+def _injected_error(error_rate: float) -> Optional[JSONResponse]:
+    """Return a retryable 503 for a random `error_rate` share of requests."""
+    if error_rate and random.random() < error_rate:
+        return JSONResponse(
+            {"error": {"message": "Injected failure", "type": "server_error"}},
+            status_code=503,
+        )
+    return None
+
+
+def _linkedin_profile_results(query: str) -> list:
+    # The person lookup quotes the company and the role; the first profile
+    # matches both, the others neither
+    quoted = re.findall(r'"([^"]+)"', query)
+    company, role = quoted[:2] if len(quoted) >= 2 else ("Company", "Role")
+    return [
+        {
+            "title": (
+                f"Person {i} - {role} - {company} | LinkedIn"
+                if i == 1
+                else f"Person {i} - Engineer - Other Co {i} | LinkedIn"
+            ),
+            "link": f"https://www.linkedin.com/in/person-{i}",
+            "snippet": f"Experience: {company if i == 1 else 'Other Co'}",
+            "position": i,
+        }
+        for i in range(1, 6)
+    ]
+
+
+def _page_text(url: str, words: int) -> str:
+    """Deterministic filler paragraphs of about `words` words for a page."""
+    rng = random.Random(url)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    paragraphs = []
+    while words > 0:
+        size = min(words, rng.randint(40, 90))
+        paragraphs.append(" ".join(rng.choices(vocabulary, k=size)) + ".")
+        words -= size
+    return "\n\n".join(paragraphs)
+
+
+def create_serper_app(
+    latency: float = 0.2, error_rate: float = 0.0, page_words: int = 0
+) -> Starlette:
+    """
+    Create a fake Serper app exposing `/search` and `/scrape`.
+
+    `site:linkedin.com/in` searches return LinkedIn profile results. With
+    `page_words`, scraped pages carry that many words of filler text, like
+    real pages.
+    """
+
+    async def search(request: Request) -> JSONResponse:
+        body = await request.json()
+        await asyncio.sleep(latency)
+        error = _injected_error(error_rate)
+        if error is not None:
+            return error
+        query = body.get("q", "")
+        if "site:linkedin.com/in" in query:
+            organic = _linkedin_profile_results(query)
+        else:
+            organic = [
+                {
+                    "title": f"Result {i} for {query}",
+                    "link": f"https://example.com/{i}",
+                    "snippet": f"Snippet {i} about {query}.",
+                    "position": i,
+                }
+                for i in range(1, 6)
+            ]
+        return JSONResponse(
+            {"searchParameters": {"q": query, "type": "search"}, "organic": organic}
+        )
+
+    async def scrape(request: Request) -> JSONResponse:
+        body = await request.json()
+        await asyncio.sleep(latency)
+        error = _injected_error(error_rate)
+        if error is not None:
+            return error
+        url = body.get("url", "")
+        links = "\n".join(
+            f"- [Page {i}]({url.rstrip('/')}/page-{i})" for i in range(1, 4)
+        )
+        body_text = f"Content of {url}."
+        if page_words:
+            body_text += "\n\n" + _page_text(url, page_words)
+        return JSONResponse(
+            {
+                "text": f"Content of {url}",
+                "markdown": f"# {url}\n\n{body_text}\n\n{links}",
+            }
+        )
+
+    return Starlette(
+        routes=[
+            Route("/search", search, methods=["POST"]),
+            Route("/scrape", scrape, methods=["POST"]),
+        ]
+    )
+
+
+def create_proxycurl_app(latency: float = 0.5, error_rate: float = 0.0) -> Starlette:
+    """Create a fake Proxycurl app exposing the company profile endpoint."""
+
+    async def company(request: Request) -> JSONResponse:
+        await asyncio.sleep(latency)
+        error = _injected_error(error_rate)
+        if error is not None:
+            return error
+        slug = request.query_params.get("url", "").rstrip("/").rsplit("/", 1)[-1]
+        return JSONResponse(
+            {
+                "name": slug.title(),
+                "linkedin_internal_id": "123456",
+                "website": f"https://{slug}.com",
+                "industry": "Software Development",
+                "company_size": [11, 50],
+                "company_size_on_linkedin": 42,
+                "hq": {"city": "Jakarta", "state": "DKI Jakarta", "country": "ID"},
+                "company_type": "PRIVATELY_HELD",
+                "founded_year": 2020,
+                "tagline": f"{slug.title()} does things",
+            }
+        )
+
+    return Starlette(
+        routes=[
+            Route("/proxycurl/api/linkedin/company", company, methods=["GET"]),
+        ]
+    )
+
+
+def _fake_arguments(parameters: dict) -> dict:
+    arguments = {}
+    for name, schema in parameters.get("properties", {}).items():
+        if schema.get("type") == "array":
+            arguments[name] = ["https://example.com/1", "https://example.com/2"]
+        elif "url" in name:
+            arguments[name] = "https://example.com/1"
+        elif schema.get("type") in ("integer", "number"):
+            arguments[name] = 1
+        elif schema.get("type") == "boolean":
+            arguments[name] = True
+        else:
+            arguments[name] = "Fake answer"
+    return arguments
+
+
+class _PromptCache:
+    """
+    Mimics OpenAI's automatic prompt caching: a request's longest prefix
+    (tools, then whole messages) sent before is reported as cached, counted
+    in 128-token increments from 1024 tokens. Tokens are estimated as four
+    characters each.
+    """
+
+    MIN_TOKENS = 1024
+    INCREMENT = 128
+
+    def __init__(self):
+        self._prefixes = set()
+
+    def usage(self, body: dict) -> tuple:
+        """Return the prompt tokens of a request and how many were cached."""
+        digest = hashlib.sha256(body["model"].encode("utf-8"))
+        parts = [json.dumps(body.get("tools") or [], sort_keys=True)] + [
+            json.dumps(m, sort_keys=True) for m in body["messages"]
+        ]
+        chars = cached_chars = 0
+        prefixes = []
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            chars += len(part)
+            prefix = digest.hexdigest()
+            if prefix in self._prefixes:
+                cached_chars = chars
+            prefixes.append(prefix)
+        self._prefixes.update(prefixes)
+
+        cached = cached_chars // 4
+        cached = cached // self.INCREMENT * self.INCREMENT
+        return chars // 4, cached if cached >= self.MIN_TOKENS else 0
+
+
+def create_openai_app(
+    latency: float = 0.05,
+    error_rate: float = 0.0,
+    use_every_tool: bool = False,
+    tool_turns: int = 0,
+    prompt_cache: bool = False,
+) -> Starlette:
+    """
+    Create a fake OpenAI app exposing `/v1/chat/completions`.
+
+    Responses are scripted so ReAct loops terminate: while no tool result is in
+    the conversation the first offered tool (or the forced `tool_choice`) is
+    called with placeholder arguments, afterwards a final answer is returned.
+    With `use_every_tool`, the offered tools are instead called one per turn
+    in order (e.g. a search, then a scrape of its top result) before the
+    final answer; `tool_turns` makes that many calls, cycling through the
+    tools. With `prompt_cache`, usage reports the request's estimated prompt
+    tokens and the share a prompt cache would have served.
+    """
+    cache = _PromptCache() if prompt_cache else None
+
+    async def chat_completions(request: Request) -> JSONResponse:
+        body = await request.json()
+        await asyncio.sleep(latency)
+        error = _injected_error(error_rate)
+        if error is not None:
+            return error
+
+        messages = body["messages"]
+        tools = body.get("tools") or []
+        tool_choice = body.get("tool_choice")
+        tool_results = sum(m["role"] == "tool" for m in messages)
+        turns = tool_turns or (len(tools) if use_every_tool else 1)
+
+        message = {"role": "assistant", "content": None}
+        if tools and (isinstance(tool_choice, dict) or tool_results < turns):
+            index = tool_results % len(tools) if tool_turns else tool_results
+            function = tools[min(index, len(tools) - 1)]["function"]
+            if isinstance(tool_choice, dict):
+                forced = tool_choice["function"]["name"]
+                function = next(
+                    t["function"] for t in tools if t["function"]["name"] == forced
+                )
+            message["tool_calls"] = [
+                {
+                    "id": f"call_{len(messages)}",
+                    "type": "function",
+                    "function": {
+                        "name": function["name"],
+                        "arguments": json.dumps(
+                            _fake_arguments(function.get("parameters", {}))
+                        ),
+                    },
+                }
+            ]
+            finish_reason = "tool_calls"
+        else:
+            message["content"] = "Fake answer https://www.linkedin.com/in/fake"
+            finish_reason = "stop"
+
+        usage = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+        if cache is not None:
+            prompt_tokens, cached_tokens = cache.usage(body)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": 20,
+                "total_tokens": prompt_tokens + 20,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            }
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream_chunks(body["model"], message, finish_reason, latency),
+                media_type="text/event-stream",
+            )
+
+        return JSONResponse(
+            {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [
+                    {"index": 0, "message": message, "finish_reason": finish_reason}
+                ],
+                "usage": usage,
+            }
+        )
+
+    return Starlette(
+        routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])]
+    )
+
+
+async def _stream_chunks(model: str, message: dict, finish_reason: str, latency: float):
+    def chunk(delta: dict, finish: str = None) -> str:
+        payload = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    if message.get("tool_calls"):
+        for index, tool_call in enumerate(message["tool_calls"]):
+            yield chunk({"tool_calls": [{"index": index, **tool_call}]})
+    else:
+        words = message["content"].split(" ")
+        for i, word in enumerate(words):
+            # Spread the generation time over the tokens like a real model
+            await asyncio.sleep(latency / len(words))
+            yield chunk({"content": word if i == 0 else " " + word})
+    yield chunk({}, finish_reason)
+    yield "data: [DONE]\n\n"
+
+
+class FakeServer:
+    """Run an ASGI app with uvicorn on a free local port in a background thread."""
+
+    def __init__(self, app):
+        self.app = app
+        self.port = _free_port()
+        self.server = None
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "FakeServer":
+        config = uvicorn.Config(
+            self.app, host="127.0.0.1", port=self.port, log_level="warning"
+        )
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
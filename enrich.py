@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import logging
+import os
+
+from app.config.settings import get_settings
+from app.services.enrichment_service import ENRICHMENT_TASKS, BulkEnricher
+from app.services.lifecycle_service import (
+    close_shared_resources,
+    open_shared_resources,
+)
+from app.services.linkedin_scraper_service import LinkedInScraperService
+
+
+async def enrich(args: argparse.Namespace) -> None:
+    open_shared_resources()
+    linkedin_scraper_service = LinkedInScraperService()
+    agent_service = None
+    if args.task != "company":
+        from app.services.agent_service import AgentService
+
+        agent_service = AgentService()
+    try:
+        enricher = BulkEnricher(
+            args.task,
+            args.api_key,
+            args.concurrency or get_settings().batch_max_concurrency,
+            linkedin_scraper_service=linkedin_scraper_service,
+            agent_service=agent_service,
+            use_cache=not args.no_cache,
+        )
+        checkpoint = await enricher.run(
+            args.input,
+            args.output,
+            args.checkpoint or f"{args.output}.checkpoint",
+            args.checkpoint_every,
+        )
+        logging.info(
+            "Done: %d rows succeeded, %d failed",
+            checkpoint.succeeded,
+            checkpoint.failed,
+        )
+    finally:
+        linkedin_scraper_service.cache.close()
+        await close_shared_resources()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Enrich a CSV or JSONL file of companies, people or queries in bulk"
+    )
+    parser.add_argument("task", choices=sorted(ENRICHMENT_TASKS))
+    parser.add_argument(
+        "input",
+        help="CSV (with a header row) or JSONL file whose rows have the fields of the task's API request",
+    )
+    parser.add_argument("output", help="NDJSON file receiving one result per row")
+    parser.add_argument(
+        "--checkpoint",
+        help="Progress file used to resume an interrupted run (default: OUTPUT.checkpoint)",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=50,
+        help="Rows completed between checkpoints (default: 50)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Rows processed at a time (default: BATCH_MAX_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--api-key",
+        default=os.environ.get("OPENAI_API_KEY"),
+        help="OpenAI API key for the agent tasks (default: OPENAI_API_KEY)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Skip the response cache lookup and get fresh answers",
+    )
+    args = parser.parse_args()
+    if args.task != "company" and not args.api_key:
+        parser.error(f"{args.task} needs --api-key or OPENAI_API_KEY")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    # One line per upstream call would drown the progress lines
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    try:
+        asyncio.run(enrich(args))
+    except KeyboardInterrupt:
+        logging.info("Interrupted: run the same command again to resume")
+
+
+if __name__ == "__main__":
+    main()
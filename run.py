@@ -1,4 +1,51 @@
+import argparse
+import logging
+import os
+
 import uvicorn
 
+from app.config.settings import get_settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Scrapify AI server")
+    parser.add_argument(
+        "--prod",
+        action="store_true",
+        help="Run worker processes without auto-reload (default: dev server)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes in --prod mode (default: SERVER_WORKERS or one per core)",
+    )
+    args = parser.parse_args()
+    settings = get_settings()
+
+    if not args.prod:
+        uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+        return
+
+    workers = args.workers or settings.server_workers or os.cpu_count() or 1
+    if workers > 1 and not settings.job_store_path:
+        logging.warning(
+            "Running %d workers without JOB_STORE_PATH: a job can only be polled "
+            "through the worker that accepted it",
+            workers,
+        )
+    uvicorn.run(
+        "app.main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        # uvloop and httptools are picked when installed
+        loop="auto",
+        http="auto",
+        # On SIGTERM, stop accepting connections and let open requests finish
+        timeout_graceful_shutdown=settings.server_shutdown_timeout,
+        proxy_headers=True,
+    )
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    main()
@@ -0,0 +1,26 @@
+import pytest
+
+from app.config.settings import get_settings
+from app.services import lifecycle_service
+
+
+@pytest.fixture(autouse=True)
+def fresh_settings(monkeypatch):
+    """Give every test settings read from its own environment and fresh shared resources."""
+    # Disk-backed stores stay off unless a test points them at a temporary file
+    for name in (
+        "SERPER_CACHE_SQLITE_PATH",
+        "RESPONSE_CACHE_SQLITE_PATH",
+        "PROXYCURL_CACHE_SQLITE_PATH",
+        "RATE_LIMIT_STORE_PATH",
+        "CORPUS_SQLITE_PATH",
+        "JOB_STORE_PATH",
+    ):
+        monkeypatch.setenv(name, "")
+    get_settings.cache_clear()
+    for accessor in lifecycle_service._ACCESSORS:
+        accessor.cache_clear()
+    yield
+    get_settings.cache_clear()
+    for accessor in lifecycle_service._ACCESSORS:
+        accessor.cache_clear()
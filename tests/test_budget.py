@@ -0,0 +1,150 @@
+import asyncio
+import json
+import time
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.services.agent_service import AgentService
+from app.services.callback_service import (
+    CASCADE_DRAFT_TAG,
+    BudgetHandler,
+    RunMetricsHandler,
+)
+from app.services.openai_client_service import get_openai_client_registry
+from app.tools import search_tools
+
+
+def _model_call(handler, tags):
+    handler.on_chat_model_start({}, [[]], run_id=uuid4(), tags=tags)
+
+
+@pytest.mark.parametrize(
+    "make_handler",
+    [lambda: BudgetHandler(10, 10, 10000), lambda: RunMetricsHandler("websearch")],
+)
+def test_escalated_draft_and_its_retry_count_as_one_step(make_handler):
+    handler = make_handler()
+    # Step 1: the small model's draft is accepted and its tool call runs
+    _model_call(handler, [CASCADE_DRAFT_TAG])
+    handler.on_tool_start({"name": "google_search"}, "query", run_id=uuid4())
+    # Step 2: the draft is escalated and the large model redoes the step
+    _model_call(handler, [CASCADE_DRAFT_TAG])
+    _model_call(handler, [])
+    # Step 3: a step the large model answers directly
+    _model_call(handler, [])
+    assert handler.steps == 3
+
+
+def _completion(message: dict) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": 100,
+                "completion_tokens": 20,
+                "total_tokens": 120,
+            },
+        },
+    )
+
+
+def test_step_budget_ends_run_with_partial_answer(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SERPER_CACHE_ENABLED", "false")
+    requests = []
+
+    def openai(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append(body)
+        if "tools" not in body:
+            return _completion(
+                {"role": "assistant", "content": "Partial: founded in 1999"}
+            )
+        # A model that never stops searching
+        call = {
+            "id": f"call_{len(requests)}",
+            "type": "function",
+            "function": {
+                "name": "google_search",
+                "arguments": json.dumps({"query": f"acme {len(requests)}"}),
+            },
+        }
+        return _completion({"role": "assistant", "content": None, "tool_calls": [call]})
+
+    def serper(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, json={"organic": [{"snippet": "Acme was founded in 1999"}]}
+        )
+
+    monkeypatch.setattr(
+        search_tools,
+        "get_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(serper)),
+    )
+    get_openai_client_registry()._http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(openai)
+    )
+    service = AgentService()
+
+    result = asyncio.run(
+        service.run_websearch_agent(
+            "When was Acme founded?",
+            "sk-test",
+            temperature=0,
+            budget=service.make_budget(max_steps=2),
+        )
+    )
+
+    assert result.budget_exceeded == "steps"
+    assert result.response == "Partial: founded in 1999"
+    # Two agent steps, then one call without tools to write the answer
+    assert ["tools" in body for body in requests] == [True, True, False]
+    final_prompt = json.dumps(requests[-1]["messages"])
+    assert "When was Acme founded?" in final_prompt
+    assert "Acme was founded in 1999" in final_prompt
+
+
+def test_timeout_covers_the_partial_answer(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SERPER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("AGENT_FINALIZE_TIMEOUT", "0.4")
+    finalize_started = []
+
+    async def openai(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if "tools" in body:
+            # A step that outlasts the whole run
+            await asyncio.sleep(5)
+        finalize_started.append(time.monotonic())
+        await asyncio.sleep(5)
+        return _completion({"role": "assistant", "content": "Too late"})
+
+    get_openai_client_registry()._http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(openai)
+    )
+    service = AgentService()
+    # Compiled up front so the run's clock starts with the measurement
+    service.get_websearch_agent("gpt-4o", 0)
+
+    start = time.monotonic()
+    result = asyncio.run(
+        service.run_websearch_agent(
+            "When was Acme founded?",
+            "sk-test",
+            temperature=0,
+            budget=service.make_budget(timeout=1.0),
+        )
+    )
+    elapsed = time.monotonic() - start
+
+    assert result.budget_exceeded == "time"
+    # The graph stopped with the finalize time still left
+    assert 0.55 < finalize_started[0] - start < 0.75
+    assert elapsed < 1.15
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+
+from app.services import linkedin_scraper_service
+from app.services.cache_service import MemoryCache, SQLiteCache, TieredCache
+from app.tools import search_tools
+
+
+def test_memory_entries_expire_after_their_ttl():
+    cache = MemoryCache()
+    cache.set("short", "value", ttl=0.05)
+    cache.set("long", "value", ttl=60)
+    assert cache.get("short") == "value"
+    time.sleep(0.06)
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+    assert cache.stats.expirations == 1
+    assert len(cache) == 1
+
+
+def test_disk_hit_is_promoted_with_its_remaining_ttl(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    try:
+        disk.set("key", {"answer": 42}, ttl=0.2)
+        cache = TieredCache(MemoryCache(), disk)
+        assert cache.get("key") == {"answer": 42}
+        assert cache.get("key") == {"answer": 42}
+        # The second lookup was served from memory
+        assert (disk.stats.hits, cache.memory.stats.hits) == (1, 1)
+
+        time.sleep(0.25)
+        # The promoted entry expires with the disk entry instead of living on
+        assert cache.get("key") is None
+        assert cache.memory.stats.expirations == 1
+    finally:
+        disk.close()
+
+
+def test_disk_tier_outlives_the_memory_tier(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = TieredCache(MemoryCache(), SQLiteCache(path))
+    first.set("key", "value", ttl=60)
+    first.close()
+
+    # A restarted worker starts with an empty memory tier
+    second = TieredCache(MemoryCache(), SQLiteCache(path))
+    try:
+        assert second.get("key") == "value"
+        assert len(second.memory) == 1
+    finally:
+        second.close()
+
+
+def test_async_scrape_is_served_from_the_disk_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("SERPER_CACHE_SQLITE_PATH", str(tmp_path / "serper.sqlite3"))
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, text=json.dumps({"markdown": "# Example"}))
+
+    monkeypatch.setattr(
+        search_tools,
+        "get_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+    async def scrape_twice():
+        first = await search_tools.ascrape_website("https://example.com/", "key")
+        # Only the disk tier still holds the page
+        search_tools.get_serper_cache().memory.clear()
+        second = await search_tools.ascrape_website("https://example.com", "key")
+        return first, second
+
+    assert asyncio.run(scrape_twice()) == ("# Example", "# Example")
+    assert len(requests) == 1
+    search_tools.get_serper_cache().close()
+
+
+def test_proxycurl_cache_reads_and_writes_disk_off_the_event_loop(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setenv(
+        "PROXYCURL_CACHE_SQLITE_PATH", str(tmp_path / "proxycurl.sqlite3")
+    )
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"name": "Acme"})
+
+    monkeypatch.setattr(
+        linkedin_scraper_service,
+        "get_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    service = linkedin_scraper_service.LinkedInScraperService()
+    disk = service.cache.disk
+    disk_threads = []
+    for name in ("get_with_expiry", "set"):
+        method = getattr(disk, name)
+
+        def record(*args, _method=method, **kwargs):
+            disk_threads.append(threading.current_thread())
+            return _method(*args, **kwargs)
+
+        monkeypatch.setattr(disk, name, record)
+
+    async def scrape_twice():
+        url = "https://www.linkedin.com/company/acme"
+        first = await service.scrape_company(url)
+        # Only the disk tier still holds the profile
+        service.cache.memory.clear()
+        return first, await service.scrape_company(url)
+
+    try:
+        assert asyncio.run(scrape_twice()) == ({"name": "Acme"}, {"name": "Acme"})
+    finally:
+        service.cache.close()
+    assert len(requests) == 1
+    # A miss, a store and a hit, none of them on the event loop's thread
+    assert len(disk_threads) == 3
+    assert threading.main_thread() not in disk_threads
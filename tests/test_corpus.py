@@ -0,0 +1,91 @@
+import time
+
+from app.services.corpus_service import LocalCorpus
+
+
+def _page(topic: str) -> str:
+    return f"# {topic.title()}\n\n" + " ".join(
+        f"The {topic} team ships {topic} widgets every quarter." for _ in range(8)
+    )
+
+
+def _urls(passages) -> set:
+    return {p.url for p in passages}
+
+
+def _page_bytes(tmp_path) -> int:
+    probe = LocalCorpus(str(tmp_path / "probe.sqlite3"), max_bytes=10**6)
+    try:
+        probe.add_page("https://example.com/probe", _page("probe"), ttl=60)
+        return probe.total_bytes
+    finally:
+        probe.close()
+
+
+def test_stale_documents_are_not_returned(tmp_path):
+    corpus = LocalCorpus(str(tmp_path / "corpus.sqlite3"), max_bytes=10**6)
+    try:
+        corpus.add_page("https://example.com/pricing", _page("pricing"), ttl=0.05)
+        assert _urls(corpus.search("pricing widgets")) == {
+            "https://example.com/pricing"
+        }
+        time.sleep(0.06)
+        assert corpus.search("pricing widgets") == []
+        assert (corpus.hits, corpus.misses) == (1, 1)
+    finally:
+        corpus.close()
+
+
+def test_snippet_only_replaces_a_stale_page(tmp_path):
+    corpus = LocalCorpus(str(tmp_path / "corpus.sqlite3"), max_bytes=10**6)
+    results = {
+        "organic": [
+            {"link": "https://example.com/fresh", "snippet": "Fresh snippet"},
+            {"link": "https://example.com/stale", "snippet": "Stale snippet"},
+        ]
+    }
+    try:
+        corpus.add_page("https://example.com/fresh", _page("fresh"), ttl=60)
+        corpus.add_page("https://example.com/stale", _page("stale"), ttl=0.01)
+        time.sleep(0.02)
+        corpus.add_search_results(results, ttl=60)
+        assert [p.kind for p in corpus.search("fresh")] == ["page"]
+        assert [p.kind for p in corpus.search("stale")] == ["snippet"]
+        assert corpus.snippets_indexed == 1
+    finally:
+        corpus.close()
+
+
+def test_eviction_drops_stale_then_least_recently_fetched(tmp_path):
+    size = _page_bytes(tmp_path)
+    path = str(tmp_path / "corpus.sqlite3")
+    # Room for three pages: a fourth triggers an eviction down to 90%
+    corpus = LocalCorpus(path, max_bytes=int(size * 3.5))
+    try:
+        corpus.add_page("https://example.com/stale", _page("stale"), ttl=0.01)
+        time.sleep(0.02)
+        for topic in ("alpha", "beta", "gamma"):
+            corpus.add_page(f"https://example.com/{topic}", _page(topic), ttl=60)
+        assert corpus.evictions == 1
+        assert corpus.search("stale") == []
+        # With no stale page left, the least recently fetched page goes next
+        corpus.add_page("https://example.com/delta", _page("delta"), ttl=60)
+        assert corpus.evictions == 2
+        assert corpus.search("alpha") == []
+        assert _urls(corpus.search("beta gamma delta", limit=10)) == {
+            "https://example.com/beta",
+            "https://example.com/gamma",
+            "https://example.com/delta",
+        }
+        assert corpus.stats()["documents"] == 3
+        assert corpus.compactions == 2
+        stored = corpus.total_bytes
+    finally:
+        corpus.close()
+
+    # Another worker opening the file sees the same size and documents
+    reopened = LocalCorpus(path, max_bytes=int(size * 3.5))
+    try:
+        assert reopened.total_bytes == stored
+    finally:
+        reopened.close()
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from app.services.rate_limit_service import RateLimitExceeded, UpstreamError
+from app.tools.crawl_tools import CrawlFrontier, crawl_pages
+
+
+def test_failed_page_can_be_requested_again():
+    frontier = CrawlFrontier("https://example.com", max_pages=2)
+    attempts = []
+
+    async def scrape(url: str) -> str:
+        attempts.append(url)
+        if len(attempts) == 1:
+            raise UpstreamError("serper", 502, "Bad gateway")
+        return "# About us"
+
+    first = asyncio.run(crawl_pages(["https://example.com/about"], frontier, scrape))
+    assert "Error: serper failed with status 502" in first
+    assert frontier.pages_left == 2
+
+    second = asyncio.run(crawl_pages(["https://example.com/about"], frontier, scrape))
+    assert "# About us" in second and "already scraped" not in second
+    assert frontier.pages_left == 1
+
+
+def test_rate_limited_batch_is_released():
+    frontier = CrawlFrontier("https://example.com")
+
+    async def scrape(url: str) -> str:
+        if url.endswith("/b"):
+            raise RateLimitExceeded("serper", 2)
+        return "# Page"
+
+    urls = ["https://example.com/a", "https://example.com/b"]
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(crawl_pages(urls, frontier, scrape))
+    assert not frontier.visited
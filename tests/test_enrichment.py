@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+
+from app.services.enrichment_service import BulkEnricher, EnrichmentCheckpoint
+
+ROWS = 60
+
+
+class FakeScraper:
+    """Stands in for `LinkedInScraperService`, failing every seventh company."""
+
+    def __init__(self, started_before_crash: int = 0):
+        self.calls = 0
+        self.started_before_crash = started_before_crash
+        self.crash = asyncio.Event()
+
+    async def scrape_company(self, linkedin_url: str) -> dict:
+        self.calls += 1
+        if self.calls == self.started_before_crash:
+            self.crash.set()
+        await asyncio.sleep(0.001 * (self.calls % 5))
+        number = int(linkedin_url.rsplit("c", 1)[1])
+        if number % 7 == 0:
+            raise ValueError(f"No profile for {linkedin_url}")
+        return {
+            "name": f"Company {number}",
+            "linkedin_internal_id": str(number),
+            "website": f"https://c{number}.example",
+            "industry": "Software",
+            "company_size": [11, 50],
+            "company_size_on_linkedin": 30,
+            "hq": {"city": "Berlin", "state": "BE", "country": "DE"},
+            "company_type": "Privately Held",
+            "founded_year": 2010,
+            "tagline": "Example",
+        }
+
+
+def _write_input(tmp_path) -> str:
+    path = str(tmp_path / "companies.csv")
+    with open(path, "w") as f:
+        f.write("linkedin_url\n")
+        for i in range(ROWS):
+            f.write(f"https://www.linkedin.com/company/c{i}\n")
+    return path
+
+
+def _run(scraper: FakeScraper, input_path: str, output_path: str):
+    enricher = BulkEnricher(
+        "company", "", max_concurrency=4, linkedin_scraper_service=scraper
+    )
+    return enricher.run(
+        input_path, output_path, f"{output_path}.checkpoint", checkpoint_every=5
+    )
+
+
+async def _run_until_crash(scraper: FakeScraper, input_path: str, output_path: str):
+    run = asyncio.create_task(_run(scraper, input_path, output_path))
+    await scraper.crash.wait()
+    run.cancel()
+    try:
+        await run
+    except asyncio.CancelledError:
+        pass
+
+
+def _output_rows(output_path: str) -> list:
+    with open(output_path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resumed_run_writes_each_row_exactly_once(tmp_path):
+    input_path = _write_input(tmp_path)
+    output_path = str(tmp_path / "out.ndjson")
+
+    asyncio.run(_run_until_crash(FakeScraper(25), input_path, output_path))
+    checkpoint = EnrichmentCheckpoint.load(f"{output_path}.checkpoint")
+    assert 0 < checkpoint.next_row < ROWS
+    # A result written after the last checkpoint, as if the process died
+    # before saving again, is dropped on resume
+    with open(output_path, "a") as f:
+        f.write('{"row": 0, "torn": tr')
+
+    scraper = FakeScraper()
+    checkpoint = asyncio.run(_run(scraper, input_path, output_path))
+
+    rows = _output_rows(output_path)
+    assert sorted(row["row"] for row in rows) == list(range(ROWS))
+    assert scraper.calls < ROWS
+    failed = sorted(row["row"] for row in rows if row["error"])
+    assert failed == list(range(0, ROWS, 7))
+    assert (checkpoint.succeeded, checkpoint.failed) == (ROWS - 9, 9)
+    assert rows[1]["response"]["hq_location"] == "Berlin, BE, DE"
+
+
+def test_checkpoint_without_output_starts_over(tmp_path):
+    input_path = _write_input(tmp_path)
+    output_path = str(tmp_path / "out.ndjson")
+
+    asyncio.run(_run_until_crash(FakeScraper(25), input_path, output_path))
+    os.remove(output_path)
+
+    scraper = FakeScraper()
+    asyncio.run(_run(scraper, input_path, output_path))
+    assert scraper.calls == ROWS
+    assert sorted(row["row"] for row in _output_rows(output_path)) == list(range(ROWS))
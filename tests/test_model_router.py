@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from pydantic import BaseModel
+
+from app.services.llm_service import LLMService
+from app.services.metrics_service import MODEL_ROUTES
+from app.services.openai_client_service import get_openai_client_registry
+
+
+class Founded(BaseModel):
+    year: int
+
+
+def _tool_call(arguments: dict) -> httpx.Response:
+    call = {
+        "id": "call_1",
+        "type": "function",
+        "function": {"name": "Founded", "arguments": json.dumps(arguments)},
+    }
+    return httpx.Response(
+        200,
+        json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "tool_calls": [call],
+                    },
+                    "finish_reason": "tool_calls",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 100,
+                "completion_tokens": 20,
+                "total_tokens": 120,
+            },
+        },
+    )
+
+
+def _run(monkeypatch, small_model_response: httpx.Response, endpoint: str):
+    monkeypatch.setenv("AUTO_SMALL_MODEL", "gpt-4o-mini")
+    monkeypatch.setenv("AUTO_LARGE_MODEL", "gpt-4o")
+    models = []
+
+    def openai(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        models.append(model)
+        if model == "gpt-4o-mini":
+            return small_model_response
+        return _tool_call({"year": 1999})
+
+    get_openai_client_registry()._http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(openai)
+    )
+    result = asyncio.run(
+        LLMService().generate_response(
+            "When was Acme founded?",
+            "sk-test",
+            model="auto",
+            temperature=0,
+            response_model=Founded,
+            endpoint=endpoint,
+        )
+    )
+    return result, models
+
+
+def test_invalid_small_model_reply_is_escalated(monkeypatch):
+    result, models = _run(
+        monkeypatch, _tool_call({"year": "long ago"}), "test_invalid_reply"
+    )
+    assert result.year == 1999
+    # instructor re-asks the small model before giving up on it
+    assert set(models[:-1]) == {"gpt-4o-mini"}
+    assert models[-1] == "gpt-4o"
+    assert MODEL_ROUTES._values[("test_invalid_reply", "gpt-4o", "validation_failed")]
+
+
+def test_small_model_api_error_is_not_escalated(monkeypatch):
+    error = httpx.Response(400, json={"error": {"message": "Bad request"}})
+    with pytest.raises(Exception, match="Bad request"):
+        _run(monkeypatch, error, "test_api_error")
+    assert not any(labels[0] == "test_api_error" for labels in MODEL_ROUTES._values)
@@ -0,0 +1,70 @@
+from app.tools.person_search_tools import (
+    canonicalize_profile_url,
+    confident_match,
+    merge_candidates,
+    rank_profiles,
+)
+
+
+def test_profile_url_drops_country_subdomain():
+    assert (
+        canonicalize_profile_url("https://id.linkedin.com/in/Jane-Doe/?trk=x")
+        == "https://www.linkedin.com/in/jane-doe"
+    )
+    assert canonicalize_profile_url("https://www.linkedin.com/company/acme") is None
+
+
+def test_same_profile_on_two_subdomains_is_one_confident_match():
+    results = {
+        "organic": [
+            {
+                "link": "https://id.linkedin.com/in/jane-doe",
+                "title": "Jane Doe - Chief Executive Officer - Acme Robotics",
+                "snippet": "Jane leads Acme Robotics.",
+            },
+            {
+                "link": "https://www.linkedin.com/in/jane-doe",
+                "title": "Jane Doe - CEO - Acme Robotics | LinkedIn",
+                "snippet": "CEO at Acme Robotics since 2019.",
+            },
+            {
+                "link": "https://www.linkedin.com/in/john-roe",
+                "title": "John Roe - Engineer - Acme Robotics",
+                "snippet": "Engineer at Acme Robotics.",
+            },
+        ]
+    }
+    candidates = rank_profiles(results, "Acme Robotics", "CEO")
+
+    assert [c.url for c in candidates] == [
+        "https://www.linkedin.com/in/jane-doe",
+        "https://www.linkedin.com/in/john-roe",
+    ]
+    assert "since 2019" in candidates[0].snippet
+    assert "leads Acme" in candidates[0].snippet
+    match = confident_match(candidates, 0.75, 0.1)
+    assert match is not None and match.url == "https://www.linkedin.com/in/jane-doe"
+
+
+def test_rankings_from_several_searches_merge_per_person():
+    first = rank_profiles(
+        {"organic": [{"link": "https://uk.linkedin.com/in/jane-doe", "title": "Jane"}]},
+        "Acme",
+        "CEO",
+    )
+    second = rank_profiles(
+        {
+            "organic": [
+                {
+                    "link": "https://www.linkedin.com/in/JANE-DOE",
+                    "title": "Jane Doe - CEO - Acme",
+                }
+            ]
+        },
+        "Acme",
+        "CEO",
+    )
+    merged = merge_candidates(first, second)
+    assert len(merged) == 1
+    assert merged[0].score == max(first[0].score, second[0].score)
+    assert merged[0].title == "Jane Doe - CEO - Acme"
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.services.rate_limit_service import (
+    RateLimiter,
+    RateLimitExceeded,
+    SharedTokenBucket,
+    SQLiteBucketStore,
+    TokenBucket,
+)
+
+
+async def _take(limiter: RateLimiter, client_key: str = None) -> None:
+    async with limiter.acquire(client_key):
+        pass
+
+
+def test_token_bucket_refills_at_rate_up_to_burst():
+    bucket = TokenBucket(rate=2, burst=3)
+    now = bucket.updated
+    for _ in range(3):
+        assert bucket.delay(now) == 0
+        bucket.reserve()
+    assert bucket.delay(now) == pytest.approx(0.5)
+    assert bucket.delay(now + 0.5) == 0
+    # A long idle spell refills no more than the burst
+    assert bucket.delay(now + 60) == 0
+    assert bucket.tokens == 3
+
+
+def test_limiter_sheds_with_retry_after_once_queue_is_too_long():
+    limiter = RateLimiter("test", rate=10, burst=1, max_wait=0.15)
+
+    async def run():
+        await _take(limiter)
+        # The second call waits 0.1s for its token; a third would wait 0.2s
+        second = asyncio.create_task(_take(limiter))
+        await asyncio.sleep(0)
+        with pytest.raises(RateLimitExceeded) as info:
+            await _take(limiter)
+        await second
+        return info.value
+
+    error = asyncio.run(run())
+    assert error.retry_after == pytest.approx(0.2, abs=0.02)
+    assert (limiter.acquired, limiter.shed) == (2, 1)
+    # A shed call takes no token
+    assert limiter.bucket.tokens > -1.5
+
+
+def test_client_bucket_shed_takes_no_upstream_token():
+    limiter = RateLimiter(
+        "test", rate=10, burst=5, client_rate=1, client_burst=1, max_wait=0.1
+    )
+
+    async def run():
+        await _take(limiter, "a")
+        with pytest.raises(RateLimitExceeded):
+            await _take(limiter, "a")
+        await _take(limiter, "b")
+
+    asyncio.run(run())
+    assert limiter.bucket.tokens == pytest.approx(3, abs=0.1)
+
+
+def test_shared_store_reserves_all_or_nothing(tmp_path):
+    store = SQLiteBucketStore(str(tmp_path / "buckets.sqlite3"))
+    upstream = SharedTokenBucket(store, "up", rate=1, burst=2)
+    client = SharedTokenBucket(store, "up:a", rate=1, burst=1)
+    try:
+        assert store.reserve([upstream, client], max_wait=0) == 0
+        # The client bucket is empty, so neither bucket gives a token
+        assert store.reserve([upstream, client], max_wait=0.5) == pytest.approx(
+            1, abs=0.05
+        )
+        assert store.reserve([upstream], max_wait=0) == 0
+        assert store.reserve([upstream], max_wait=0) == pytest.approx(1, abs=0.05)
+        store.refund([upstream])
+        assert store.reserve([upstream], max_wait=0) == 0
+    finally:
+        store.close()
+
+
+def test_limiters_sharing_a_store_share_the_rate(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    # Two workers of the same upstream, each with its own connection
+    first, second = (
+        RateLimiter("test", rate=1, burst=2, max_wait=0, store=SQLiteBucketStore(path))
+        for _ in range(2)
+    )
+
+    async def run():
+        await _take(first)
+        await _take(second)
+        with pytest.raises(RateLimitExceeded) as info:
+            await _take(first)
+        return info.value
+
+    try:
+        assert asyncio.run(run()).retry_after == pytest.approx(1, abs=0.05)
+    finally:
+        first.store.close()
+        second.store.close()
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from app.services.agent_service import AgentResult, AgentService
+from app.services.singleflight_service import SingleFlight
+
+
+async def _started(flight: SingleFlight, key: str, fn) -> asyncio.Task:
+    task = asyncio.create_task(flight.do(key, fn))
+    await asyncio.sleep(0)
+    return task
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    async def run():
+        flight = SingleFlight(cancel_abandoned=True)
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = await _started(flight, "k", work)
+        second = await _started(flight, "k", work)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, flight.stats()
+
+    result, stats = asyncio.run(run())
+    assert result == "done"
+    assert (stats["executions"], stats["collapsed"], stats["in_flight"]) == (1, 1, 0)
+
+
+@pytest.mark.parametrize("cancel_abandoned", [True, False])
+def test_abandoned_work_is_cancelled_only_when_asked(cancel_abandoned):
+    async def run():
+        flight = SingleFlight(cancel_abandoned=cancel_abandoned)
+        finished = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            finished.set()
+
+        callers = [await _started(flight, "k", work) for _ in range(2)]
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.1)
+        return finished.is_set(), len(flight)
+
+    finished, in_flight = asyncio.run(run())
+    assert finished is not cancel_abandoned
+    assert in_flight == 0
+
+
+def test_failure_is_shared_and_next_call_runs_again():
+    async def run():
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        callers = [await _started(flight, "k", work) for _ in range(3)]
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await flight.do("k", work)
+        return results, calls
+
+    results, calls = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert calls == 2
+
+
+def test_agent_runs_with_callbacks_each_report_to_their_own(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    service = AgentService()
+    executions = []
+
+    async def fake_run_agent(
+        agent, name, query, configurable, budget, model, temperature, callbacks
+    ):
+        executions.append(callbacks)
+        await asyncio.sleep(0.01)
+        return AgentResult("answer")
+
+    monkeypatch.setattr(service, "get_websearch_agent", lambda *args: None)
+    monkeypatch.setattr(service, "_run_agent", fake_run_agent)
+
+    async def run(callbacks):
+        return await asyncio.gather(
+            *(
+                service.run_websearch_agent(
+                    "query", "sk-test", callbacks=callbacks and [callbacks(i)]
+                )
+                for i in range(3)
+            )
+        )
+
+    asyncio.run(run(None))
+    # Identical runs without callbacks share one execution
+    assert executions == [None]
+
+    executions.clear()
+    results = asyncio.run(run(lambda i: f"job-{i}"))
+    assert [r.response for r in results] == ["answer"] * 3
+    assert sorted(executions) == [["job-0"], ["job-1"], ["job-2"]]
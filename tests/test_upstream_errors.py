@@ -0,0 +1,108 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import http_error
+from app.services import linkedin_scraper_service
+from app.services.rate_limit_service import RateLimitExceeded, UpstreamError
+from app.tools import search_tools
+
+
+def _mock_client(status_code: int, text: str, headers: dict = None):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_code, text=text, headers=headers or {})
+
+    return lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture(autouse=True)
+def no_retries(monkeypatch):
+    monkeypatch.setenv("UPSTREAM_MAX_RETRIES", "0")
+    monkeypatch.setenv("SERPER_CACHE_ENABLED", "false")
+
+
+def test_search_html_error_raises_upstream_error(monkeypatch):
+    monkeypatch.setattr(
+        search_tools, "get_http_client", _mock_client(502, "<html>Bad gateway</html>")
+    )
+    with pytest.raises(UpstreamError) as info:
+        asyncio.run(search_tools.asearch_google("query", "key"))
+    assert info.value.status_code == 502
+    assert http_error(info.value).status_code == 502
+
+
+def test_scrape_429_raises_rate_limit_with_retry_after(monkeypatch):
+    monkeypatch.setattr(
+        search_tools,
+        "get_http_client",
+        _mock_client(429, '{"message": "Too many requests"}', {"Retry-After": "7"}),
+    )
+    with pytest.raises(RateLimitExceeded) as info:
+        asyncio.run(search_tools.ascrape_website("https://example.com", "key"))
+    assert info.value.retry_after == 7
+    error = http_error(info.value)
+    assert error.status_code == 429
+    assert error.headers["Retry-After"] == "7"
+
+
+def test_proxycurl_unavailable_maps_to_503(monkeypatch):
+    monkeypatch.setattr(
+        linkedin_scraper_service,
+        "get_http_client",
+        _mock_client(503, "Service unavailable"),
+    )
+    service = linkedin_scraper_service.LinkedInScraperService()
+    with pytest.raises(UpstreamError) as info:
+        asyncio.run(service.scrape_company("https://www.linkedin.com/company/example"))
+    assert http_error(info.value).status_code == 503
+
+
+def test_agent_tools_report_upstream_errors_as_failed_calls():
+    from app.services.agent_service import handle_tool_error
+
+    message = handle_tool_error(UpstreamError("serper", 502, "Bad gateway"))
+    assert "serper failed with status 502" in message
+    with pytest.raises(RateLimitExceeded):
+        handle_tool_error(RateLimitExceeded("serper", 3))
+
+
+def test_transport_errors_are_retried_then_reported_as_unavailable(monkeypatch):
+    monkeypatch.setenv("UPSTREAM_MAX_RETRIES", "2")
+    monkeypatch.setenv("UPSTREAM_RETRY_BASE_DELAY", "0")
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    monkeypatch.setattr(
+        search_tools,
+        "get_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    with pytest.raises(UpstreamError) as info:
+        asyncio.run(search_tools.asearch_google("query", "key"))
+    assert len(attempts) == 3
+    assert "ReadTimeout" in str(info.value)
+    assert http_error(info.value).status_code == 503
+
+
+def test_transport_error_recovers_on_retry(monkeypatch):
+    monkeypatch.setenv("UPSTREAM_MAX_RETRIES", "2")
+    monkeypatch.setenv("UPSTREAM_RETRY_BASE_DELAY", "0")
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"organic": []})
+
+    monkeypatch.setattr(
+        search_tools,
+        "get_http_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    assert asyncio.run(search_tools.asearch_google("query", "key")) == {"organic": []}
+    assert len(attempts) == 2